@@ -0,0 +1,178 @@
+"""
+Load test for the node proxy server.
+
+Starts a stand-in for the central server that answers every request after a fixed
+delay, starts the node proxy server in front of it, and sends requests to the proxy
+from many concurrent clients, as algorithm containers would. Reports the number of
+requests per second and the latency percentiles.
+
+Example:
+
+    python tools/proxy-load-test.py --requests 2000 --concurrency 50 --latency-ms 100
+
+Use `--server gevent` to run the same load against the gevent WSGI server that the
+proxy server used before, for comparison.
+"""
+
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import click
+import requests
+
+from vantage6.common.http_session import get_session
+from vantage6.node import proxy_server
+from vantage6.node.proxy_wsgi_server import ProxyWSGIServer
+
+
+def start_stand_in_server(latency: float, body_size: int) -> int:
+    """
+    Start a stand-in central server that responds to every request with a JSON
+    body after a delay.
+
+    Parameters
+    ----------
+    latency : float
+        Seconds to wait before responding
+    body_size : int
+        Approximate size of the response body in bytes
+
+    Returns
+    -------
+    int
+        Port the stand-in server listens on
+    """
+    body = json.dumps({"data": "x" * body_size}).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def _respond(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                self.rfile.read(length)
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _respond
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_address[1]
+
+
+def start_proxy_server(server_port: int, server_type: str, workers: int) -> int:
+    """
+    Start the node proxy server in front of the stand-in server.
+
+    Parameters
+    ----------
+    server_port : int
+        Port of the stand-in central server
+    server_type : str
+        WSGI server to use: "threaded" or "gevent"
+    workers : int
+        Number of worker threads of the threaded server
+
+    Returns
+    -------
+    int
+        Port the proxy server listens on
+    """
+    proxy_server.server_url = f"http://127.0.0.1:{server_port}"
+    if server_type == "gevent":
+        from gevent.pywsgi import WSGIServer
+
+        started = threading.Event()
+        port = {}
+
+        def serve():
+            server = WSGIServer(("127.0.0.1", 0), proxy_server.app, log=None)
+            server.start()
+            port["port"] = server.server_port
+            started.set()
+            server.serve_forever()
+
+        threading.Thread(target=serve, daemon=True).start()
+        started.wait()
+        return port["port"]
+
+    get_session("proxy").configure(pool_maxsize=workers)
+    server = ProxyWSGIServer("127.0.0.1", 0, proxy_server.app, workers=workers)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_port
+
+
+@click.command()
+@click.option("--requests", "num_requests", default=1000, help="Number of requests")
+@click.option("--concurrency", default=50, help="Number of concurrent clients")
+@click.option(
+    "--latency-ms", default=50, help="Response delay of the stand-in central server"
+)
+@click.option("--body-size", default=1024, help="Response body size in bytes")
+@click.option(
+    "--server",
+    "server_type",
+    type=click.Choice(["threaded", "gevent"]),
+    default="threaded",
+    help="WSGI server used for the proxy server",
+)
+@click.option("--workers", default=32, help="Worker threads of the threaded server")
+def cli_load_test(
+    num_requests: int,
+    concurrency: int,
+    latency_ms: int,
+    body_size: int,
+    server_type: str,
+    workers: int,
+) -> None:
+    """Run the load test and print the results."""
+    server_port = start_stand_in_server(latency_ms / 1000, body_size)
+    proxy_port = start_proxy_server(server_port, server_type, workers)
+    url = f"http://127.0.0.1:{proxy_port}/organization"
+
+    local = threading.local()
+
+    def send_request(_) -> tuple[float, bool]:
+        # every client thread keeps its connection open, as the algorithm client
+        # does
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            ok = local.session.get(url, timeout=60).status_code == 200
+        except requests.RequestException:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(send_request, range(num_requests)))
+    duration = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    failures = sum(1 for _, ok in results if not ok)
+    percentiles = statistics.quantiles(latencies, n=100)
+    click.echo(f"server:       {server_type}")
+    click.echo(f"requests:     {num_requests} ({failures} failed)")
+    click.echo(f"concurrency:  {concurrency}")
+    click.echo(f"requests/s:   {num_requests / duration:.1f}")
+    click.echo(f"p50 latency:  {percentiles[49] * 1000:.1f} ms")
+    click.echo(f"p99 latency:  {percentiles[98] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    cli_load_test()
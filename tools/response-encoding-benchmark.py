@@ -0,0 +1,193 @@
+"""
+Benchmark for encoding and compressing responses of the vantage6 REST API.
+
+Builds list pages that are shaped like the responses of the server and the
+algorithm store: runs with their input, tasks with their results, and algorithms.
+Reports, per page, the time to encode it as JSON with the standard library and
+with orjson, and the time and number of bytes on the wire without compression
+and with each of the compressions that responses are negotiated with.
+
+Example:
+
+    python tools/response-encoding-benchmark.py --per-page 10,100 --input-size 1000
+
+Inputs and results of runs are base64 encoded. Use `--encrypted` to fill them
+with random bytes, as in encrypted collaborations, which do not compress.
+"""
+
+import base64
+import json
+import os
+import statistics
+import time
+from typing import Callable
+
+import click
+
+from vantage6.backend.common.json_response import COMPRESSORS, dumps
+
+
+def link(resource: str, id_: int) -> dict:
+    """Create a HATEOAS link as included in responses"""
+    return {"id": id_, "link": f"/api/{resource}/{id_}", "methods": ["GET", "PATCH"]}
+
+
+def payload(size: int, encrypted: bool) -> str:
+    """Create a base64 encoded input or result of a run"""
+    if encrypted:
+        return base64.b64encode(os.urandom(size)).decode()
+    data = json.dumps({"method": "average", "kwargs": {"column": "age"}})
+    return base64.b64encode((data * (size // len(data) + 1))[:size].encode()).decode()
+
+
+def run_page(per_page: int, input_size: int, encrypted: bool) -> dict:
+    """Create a page of runs, including their input"""
+    return {
+        "data": [
+            {
+                "id": id_,
+                "input": payload(input_size, encrypted),
+                "status": "completed",
+                "assigned_at": "2024-05-01T12:00:00.000000",
+                "started_at": "2024-05-01T12:00:01.000000",
+                "finished_at": "2024-05-01T12:00:05.000000",
+                "cleanup_at": None,
+                "log_size": 0,
+                "blob_storage_used": False,
+                "task": link("task", id_ // 10),
+                "organization": link("organization", id_ % 10),
+                "node": {
+                    "id": id_ % 10,
+                    "name": f"node {id_ % 10}",
+                    "status": "online",
+                },
+                "ports": [],
+                "results": link("result", id_),
+            }
+            for id_ in range(1, per_page + 1)
+        ],
+        "links": {"first": "/api/run?page=1", "self": "/api/run?page=1"},
+    }
+
+
+def task_page(per_page: int, input_size: int, encrypted: bool) -> dict:
+    """Create a page of tasks, including the results of their runs"""
+    return {
+        "data": [
+            {
+                "id": id_,
+                "name": f"task {id_}",
+                "description": "average age",
+                "image": "harbor2.vantage6.ai/demo/average",
+                "status": "completed",
+                "job_id": id_,
+                "created_at": "2024-05-01T12:00:00.000000",
+                "finished_at": "2024-05-01T12:00:05.000000",
+                "collaboration": link("collaboration", 1),
+                "init_org": link("organization", 1),
+                "init_user": link("user", 1),
+                "parent": None,
+                "databases": [{"label": "default", "parameters": None}],
+                "runs": f"/api/run?task_id={id_}",
+                "results": [
+                    {
+                        "id": id_ * 10 + org,
+                        "result": payload(input_size, encrypted),
+                        "blob_storage_used": False,
+                        "task": link("task", id_),
+                        "run": link("run", id_ * 10 + org),
+                    }
+                    for org in range(3)
+                ],
+            }
+            for id_ in range(1, per_page + 1)
+        ],
+        "links": {"first": "/api/task?page=1", "self": "/api/task?page=1"},
+    }
+
+
+def algorithm_page(per_page: int, input_size: int, encrypted: bool) -> dict:
+    """Create a page of algorithms of the algorithm store"""
+    return {
+        "data": [
+            {
+                "id": id_,
+                "name": f"algorithm {id_}",
+                "description": "Compute the average of a column",
+                "image": f"harbor2.vantage6.ai/demo/algorithm-{id_}",
+                "status": "approved",
+                "code_url": f"https://github.com/vantage6/algorithm-{id_}",
+                "documentation_url": None,
+                "partitioning": "horizontal",
+                "vantage6_version": "4.0",
+                "functions": [
+                    {
+                        "id": id_ * 10 + function,
+                        "name": f"function_{function}",
+                        "description": "Partial computation of the average",
+                        "type": "federated",
+                        "arguments": [
+                            {"name": "column", "type": "column", "description": ""}
+                        ],
+                        "databases": [{"name": "default", "description": ""}],
+                        "ui_visualizations": [],
+                    }
+                    for function in range(3)
+                ],
+            }
+            for id_ in range(1, per_page + 1)
+        ],
+        "links": {"first": "/api/algorithm?page=1", "self": "/api/algorithm?page=1"},
+    }
+
+
+def timed(func: Callable, repeats: int) -> tuple[float, object]:
+    """Return the mean duration in milliseconds of a function and its result"""
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        durations.append(time.perf_counter() - start)
+    return statistics.mean(durations) * 1000, result
+
+
+@click.command()
+@click.option(
+    "--per-page",
+    default="10,100",
+    help="Comma-separated numbers of items per page",
+)
+@click.option(
+    "--input-size",
+    default=1000,
+    help="Size in bytes of the input and results of runs, before base64 encoding",
+)
+@click.option("--encrypted", is_flag=True, help="Use random bytes as input and results")
+@click.option("--repeats", default=20, help="Number of times each step is timed")
+def cli_benchmark(per_page: str, input_size: int, encrypted: bool, repeats: int):
+    """Run the benchmark and print the results."""
+    header = (
+        f"{'page':>10} {'items':>6} {'json (ms)':>10} {'orjson (ms)':>12} "
+        f"{'bytes':>10}"
+    )
+    for encoding in COMPRESSORS:
+        header += f" {encoding + ' (ms)':>10} {encoding + ' bytes':>10}"
+    click.echo(header)
+    pages = {"run": run_page, "task": task_page, "algorithm": algorithm_page}
+    for name, create_page in pages.items():
+        for num_items in [int(num) for num in per_page.split(",")]:
+            page = create_page(num_items, input_size, encrypted)
+            json_ms, _ = timed(lambda: json.dumps(page).encode(), repeats)
+            orjson_ms, body = timed(lambda: dumps(page), repeats)
+            line = (
+                f"{name:>10} {num_items:>6} {json_ms:>10.2f} {orjson_ms:>12.2f} "
+                f"{len(body):>10}"
+            )
+            for compress in COMPRESSORS.values():
+                compress_ms, compressed = timed(lambda: compress(body), repeats)
+                line += f" {compress_ms:>10.2f} {len(compressed):>10}"
+            click.echo(line)
+
+
+if __name__ == "__main__":
+    cli_benchmark()
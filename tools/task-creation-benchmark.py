@@ -0,0 +1,159 @@
+"""
+Benchmark for creating tasks at the vantage6 server.
+
+Starts a server with an in-memory database, creates a collaboration with the
+requested numbers of organizations (each with a node), and creates tasks for all
+organizations in the collaboration. Reports the latency of creating a task and the
+number of SQL statements and commits that it takes, per number of organizations.
+
+Example:
+
+    python tools/task-creation-benchmark.py --organizations 1,10,100,200 --tasks 10
+
+Use `--database` to benchmark against another database, e.g. a PostgreSQL
+database, which is more representative of the round trips in a deployment.
+"""
+
+import statistics
+import time
+from unittest.mock import patch
+
+import click
+from flask_socketio import SocketIO
+from sqlalchemy import event
+
+from vantage6.backend.common import test_context
+from vantage6.common import bytes_to_base64s
+from vantage6.common.globals import InstanceType
+from vantage6.common.serialization import serialize
+from vantage6.server import ServerApp
+from vantage6.server.globals import PACKAGE_FOLDER
+from vantage6.server.model import Collaboration, Node, Organization, User
+from vantage6.server.model.base import Database, DatabaseSessionManager
+
+
+class StatementCounter:
+    """Count the SQL statements and commits that are sent to the database"""
+
+    def __init__(self, engine) -> None:
+        self.statements = 0
+        self.commits = 0
+        event.listen(engine, "before_cursor_execute", self._on_statement)
+        event.listen(engine, "commit", self._on_commit)
+
+    def _on_statement(self, *args) -> None:
+        self.statements += 1
+
+    def _on_commit(self, *args) -> None:
+        self.commits += 1
+
+    def reset(self) -> None:
+        self.statements = 0
+        self.commits = 0
+
+
+def create_collaboration(
+    num_organizations: int, init_org: Organization
+) -> tuple[Collaboration, list[Organization]]:
+    """
+    Create an unencrypted collaboration with organizations that each have a node.
+
+    Parameters
+    ----------
+    num_organizations : int
+        Number of organizations with a node in the collaboration
+    init_org : Organization
+        Organization that creates the tasks, which is added to the collaboration
+        as well
+
+    Returns
+    -------
+    Collaboration
+        The created collaboration
+    list[Organization]
+        The organizations with a node
+    """
+    organizations = [Organization() for _ in range(num_organizations)]
+    collaboration = Collaboration(
+        organizations=organizations + [init_org], encrypted=False
+    )
+    collaboration.save()
+    for organization in organizations:
+        Node(organization=organization, collaboration=collaboration).save()
+    return collaboration, organizations
+
+
+@click.command()
+@click.option(
+    "--organizations",
+    default="1,10,50,100,200",
+    help="Comma-separated numbers of organizations to create tasks for",
+)
+@click.option("--tasks", default=10, help="Number of tasks per number of organizations")
+@click.option("--database", default="sqlite://", help="Database URI to use")
+def cli_benchmark(organizations: str, tasks: int, database: str) -> None:
+    """Run the benchmark and print the results."""
+    Database().connect(database, allow_drop_all=True)
+    ctx = test_context.TestContext.from_external_config_file(
+        PACKAGE_FOLDER, InstanceType.SERVER
+    )
+    with patch.object(SocketIO, "start_background_task"):
+        server = ServerApp(ctx).start()
+    client = server.app.test_client()
+    counter = StatementCounter(Database().engine)
+
+    tokens = client.post(
+        "/api/token/user", json={"username": "root", "password": "root"}
+    ).json
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    input_ = bytes_to_base64s(serialize({"method": "benchmark"}))
+
+    click.echo(
+        f"{'organizations':>13} {'mean (ms)':>10} {'p95 (ms)':>10} "
+        f"{'statements':>10} {'commits':>8}"
+    )
+    for num_organizations in [int(num) for num in organizations.split(",")]:
+        DatabaseSessionManager.get_session()
+        collaboration, participants = create_collaboration(
+            num_organizations, User.get_by_username("root").organization
+        )
+        task_json = {
+            "collaboration_id": collaboration.id,
+            "organizations": [
+                {"id": organization.id, "input": input_}
+                for organization in participants
+            ],
+            "image": "benchmark-image",
+        }
+        DatabaseSessionManager.clear_session()
+
+        latencies = []
+        statements = []
+        commits = []
+        with patch.object(server.socketio, "emit"):
+            for _ in range(tasks):
+                counter.reset()
+                start = time.perf_counter()
+                response = client.post("/api/task", headers=headers, json=task_json)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 201:
+                    raise click.ClickException(
+                        f"Creating task failed: {response.get_data(as_text=True)}"
+                    )
+                statements.append(counter.statements)
+                commits.append(counter.commits)
+
+        p95 = (
+            statistics.quantiles(latencies, n=20)[18]
+            if len(latencies) > 1
+            else latencies[0]
+        )
+        click.echo(
+            f"{num_organizations:>13} {statistics.mean(latencies) * 1000:>10.1f} "
+            f"{p95 * 1000:>10.1f} {statistics.mean(statements):>10.0f} "
+            f"{statistics.mean(commits):>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    cli_benchmark()
@@ -19,13 +19,12 @@ if not os.environ.get("READTHEDOCS"):
 # pylint: disable=C0413, C0411
 import importlib
 import logging
-import json
 import traceback
 import datetime
 
 from http import HTTPStatus
 from werkzeug.exceptions import HTTPException
-from flask import Flask, make_response, request, send_from_directory, Request, Response
+from flask import Flask, request, send_from_directory, Request, Response
 from flask_cors import CORS
 from flask_marshmallow import Marshmallow
 from flask_restful import Api
@@ -39,9 +38,11 @@ from vantage6.common.enum import AlgorithmViewPolicies, StorePolicies
 from vantage6.backend.common.resource.output_schema import BaseHATEOASModelSchema
 from vantage6.backend.common.globals import (
     HOST_URI_ENV,
+    DEFAULT_COMPRESSION_MIN_SIZE,
     DEFAULT_SUPPORT_EMAIL_ADDRESS,
 )
 from vantage6.backend.common.jsonable import jsonable
+from vantage6.backend.common.json_response import make_json_response
 from vantage6.backend.common.mail_service import MailService
 
 # TODO move this to common, then remove dependency on CLI in algorithm store
@@ -245,6 +246,11 @@ class AlgorithmStoreApp:
         # helper to create HATEOAS schemas
         BaseHATEOASModelSchema.api = self.api
 
+        # responses larger than this are compressed, if the client accepts it
+        compression_min_size = self.ctx.config.get(
+            "compression_min_size", DEFAULT_COMPRESSION_MIN_SIZE
+        )
+
         # whatever you get try to json it
         @self.api.representation("application/json")
         # pylint: disable=unused-argument
@@ -269,9 +275,7 @@ class AlgorithmStoreApp:
             elif isinstance(data, list) and len(data) and isinstance(data[0], Base):
                 data = jsonable(data)
 
-            resp = make_response(json.dumps(data), code)
-            resp.headers.extend(headers or {})
-            return resp
+            return make_json_response(data, code, headers, compression_min_size)
 
     def load_resources(self) -> None:
         """Import the modules containing API resources."""
@@ -175,7 +175,10 @@ class Roles(AlgorithmStoreResources):
             validate_user_exists(db, args["user_id"])
             query = apply_user_filter(db, query, args["user_id"])
 
-        page = Pagination.from_query(query, request, db.Role)
+        try:
+            page = Pagination.from_query(query, request, db.Role)
+        except (ValueError, AttributeError) as e:
+            return {"msg": str(e)}, HTTPStatus.BAD_REQUEST
 
         return self.response(page, role_output_schema)
 
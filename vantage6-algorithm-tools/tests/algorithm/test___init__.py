@@ -47,8 +47,8 @@ class TestAlgorithmClient(unittest.TestCase):
         ]
         self.client.log = MagicMock()
 
-    @patch("requests.get")
-    @patch("requests.post")
+    @patch("requests.Session.get")
+    @patch("requests.Session.post")
     @patch("vantage6.algorithm.client.serialize", return_value=b"serialized_input")
     def test_create_task(self, mock_serialize, mock_requests_post, mock_requests_get):
         mock_response = MagicMock()
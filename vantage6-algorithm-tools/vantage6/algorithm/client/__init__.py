@@ -3,12 +3,13 @@
 import jwt
 import json
 
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from vantage6.common.client.client_base import ClientBase
 from vantage6.common import base64s_to_bytes, bytes_to_base64s
 from vantage6.common.serialization import serialize
-from vantage6.common.globals import STRING_ENCODING
+from vantage6.common.globals import MAX_CONCURRENT_RESULT_DOWNLOADS, STRING_ENCODING
 
 # make sure the version is available
 from vantage6.algorithm.client._version import __version__  # noqa: F401
@@ -147,41 +148,6 @@ class AlgorithmClient(ClientBase):
 
         return self.result.from_task(task_id)
 
-    def _multi_page_request(self, endpoint: str, params: dict = None) -> dict:
-        """
-        Make multiple requests to the central server to get all pages of a list
-        of results.
-
-        Parameters
-        ----------
-        endpoint: str
-            Endpoint to which the request should be made.
-        params: dict
-            Parameters to be passed to the request. If 'page' is present, it
-            will be ignored.
-
-        Returns
-        -------
-        dict
-            Response from the central server.
-        """
-        if params is None:
-            params = {}
-        # get first page
-        page = 1
-        response = self.request(endpoint, params={**params, "page": page})
-        data = response["data"]
-
-        # append next pages (if any)
-        links = response.get("links")
-        while links and links.get("next"):
-            page += 1
-            response = self.request(endpoint, params={**params, "page": page})
-            data += response["data"]
-            links = response.get("links")
-
-        return data
-
     class Run(ClientBase.SubClient):
         """
         Algorithm Run client for the algorithm container.
@@ -231,7 +197,9 @@ class AlgorithmClient(ClientBase):
             # TODO do we need this function? It may be used to collect data
             # on subtasks but usually only the results are accessed, which is
             # done with the function below.
-            return self.parent._multi_page_request("run", params={"task_id": task_id})
+            return self.parent._multi_page_request(
+                "run", params={"task_id": task_id, "sort": "-id"}
+            )
 
     class Result(ClientBase.SubClient):
         """
@@ -316,11 +284,16 @@ class AlgorithmClient(ClientBase):
                     return None
 
             results = self.parent._multi_page_request(
-                "result", params={"task_id": task_id}
+                "result", params={"task_id": task_id, "sort": "-id"}
             )
             # Encryption is not done at the client level for the container. The
             # algorithm developer is responsible for decrypting the results.
-            return [decode_result(run) for run in results if run.get("result")]
+            # Results stored in the blob store are downloaded concurrently.
+            runs = [run for run in results if run.get("result")]
+            with ThreadPoolExecutor(
+                max_workers=MAX_CONCURRENT_RESULT_DOWNLOADS
+            ) as executor:
+                return list(executor.map(decode_result, runs))
 
     class Task(ClientBase.SubClient):
         """
@@ -31,11 +31,13 @@ setup(
     packages=find_namespace_packages(),
     python_requires=">=3.10",
     install_requires=[
+        "Brotli==1.1.0",
         "flask==3.1.1",
         "flask-mail==0.9.1",
         "Flask-RESTful==0.3.10",
         "marshmallow==3.26.2",
         "marshmallow-sqlalchemy==0.29.0",
+        "orjson==3.10.18",
         "SQLAlchemy==1.4.46",
         "prometheus-client==0.21.1",
         f"vantage6-common == {version_ns['__version__']}",
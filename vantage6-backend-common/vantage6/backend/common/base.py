@@ -240,6 +240,13 @@ class BaseDatabase:
             'ALTER TABLE "%s" ADD COLUMN %s %s' % (tab_name, col_name, col_type)
         )
 
+        # create the indexes on the new column, as these are otherwise only created
+        # together with the table
+        for index in column.table.indexes:
+            if column in index.columns.values():
+                log.warn("Adding index '%s' to table '%s'", index.name, tab_name)
+                index.create(self.engine, checkfirst=True)
+
     @staticmethod
     def is_column_missing(
         column: Column, column_names: list[str], table_name: str
@@ -14,3 +14,6 @@ DEFAULT_SUPPORT_EMAIL_ADDRESS = "support@vantage6.ai"
 
 # default email address used in 'from' header
 DEFAULT_EMAIL_FROM_ADDRESS = "noreply@vantage6.ai"
+
+# minimum size in bytes of API responses that are compressed
+DEFAULT_COMPRESSION_MIN_SIZE = 1024
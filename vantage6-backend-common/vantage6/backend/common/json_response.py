@@ -0,0 +1,139 @@
+import gzip
+import hashlib
+import json
+from http import HTTPStatus
+from typing import Any
+
+import brotli
+import orjson
+from flask import Response, make_response, request
+
+# Compression levels for responses. These favour speed over size, as responses
+# are compressed on every request.
+GZIP_COMPRESS_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Encodings with which responses can be compressed, in order of preference
+COMPRESSORS = {
+    "br": lambda body: brotli.compress(body, quality=BROTLI_QUALITY),
+    "gzip": lambda body: gzip.compress(body, compresslevel=GZIP_COMPRESS_LEVEL),
+}
+
+
+def dumps(data: Any) -> bytes:
+    """
+    Encode data as JSON.
+
+    orjson is used, as it is much faster than the standard library. Data that
+    orjson cannot encode, such as integers that do not fit in 64 bits, is
+    encoded with the standard library.
+
+    Parameters
+    ----------
+    data : Any
+        Data to encode
+
+    Returns
+    -------
+    bytes
+        JSON encoded data
+    """
+    try:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    except TypeError:
+        return json.dumps(data).encode()
+
+
+def compress_response(response: Response, min_size: int | None) -> Response:
+    """
+    Compress the body of a response with the best encoding that the client
+    accepts.
+
+    Parameters
+    ----------
+    response : Response
+        Response to compress
+    min_size : int | None
+        Minimum size in bytes of the body to compress it. If None, responses are
+        not compressed.
+
+    Returns
+    -------
+    Response
+        The response, compressed if it is large enough and the client accepts
+        one of the encodings in `COMPRESSORS`
+    """
+    if (
+        min_size is None
+        or response.status_code == HTTPStatus.NOT_MODIFIED
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+    body = response.get_data()
+    if len(body) < min_size:
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = request.accept_encodings.best_match(COMPRESSORS)
+    if encoding:
+        response.set_data(COMPRESSORS[encoding](body))
+        response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def make_conditional_response(response: Response) -> Response:
+    """
+    Add an ETag to a successful response to a GET request, and turn it into a
+    '304 Not Modified' response without body if the client already has it.
+
+    The ETag is a hash of the body before compression. It is weak, as the body
+    may be sent compressed or not.
+
+    Parameters
+    ----------
+    response : Response
+        Response to a request
+
+    Returns
+    -------
+    Response
+        The response with an ETag, or a response with status 304 if the ETag
+        matches one in the `If-None-Match` header of the request
+    """
+    if request.method != "GET" or response.status_code != HTTPStatus.OK:
+        return response
+    digest = hashlib.blake2b(response.get_data(), digest_size=16).hexdigest()
+    response.set_etag(digest, weak=True)
+    return response.make_conditional(request)
+
+
+def make_json_response(
+    data: Any, code: HTTPStatus, headers: dict = None, min_compress_size: int = None
+) -> Response:
+    """
+    Create a response with the JSON encoded data. Responses to GET requests get
+    an ETag, so that clients can make conditional requests. The response is
+    compressed if it is large enough and the client accepts it.
+
+    Parameters
+    ----------
+    data : Any
+        Data to encode
+    code : HTTPStatus
+        The HTTP status code of the response
+    headers : dict, optional
+        Additional headers to be added to the response
+    min_compress_size : int, optional
+        Minimum size in bytes of the body to compress it. If None, the response
+        is not compressed.
+
+    Returns
+    -------
+    Response
+        Response with the JSON encoded data
+    """
+    resp = make_response(dumps(data), code)
+    resp.headers.extend(headers or {})
+    resp = make_conditional_response(resp)
+    return compress_response(resp, min_compress_size)
@@ -54,6 +54,29 @@ class Metrics:
             Metric("gpu_memory_used", int, "GPU memory used"),
             Metric("gpu_memory_free", int, "GPU memory free"),
             Metric("gpu_temperature", float, "GPU temperature"),
+            Metric(
+                "result_upload_pending", int, "Number of results waiting for upload"
+            ),
+            Metric("result_upload_count", int, "Number of uploaded results"),
+            Metric(
+                "result_upload_failures", int, "Number of results that were discarded"
+            ),
+            Metric(
+                "result_upload_bytes_per_second",
+                float,
+                "Result upload throughput in bytes per second",
+            ),
+            Metric("http_requests", int, "Number of requests sent to the server"),
+            Metric(
+                "http_connections_created",
+                int,
+                "Number of connections opened to the server",
+            ),
+            Metric(
+                "http_idle_connections",
+                int,
+                "Number of open connections to the server that are idle",
+            ),
         ]
 
         for metric in metrics:
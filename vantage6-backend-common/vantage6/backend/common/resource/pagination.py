@@ -192,6 +192,10 @@ class Pagination:
         Pagination
             Pagination object
         """
+        # cursor pagination is used if the client asks for it
+        if paginate and "cursor" in request.args:
+            return CursorPagination.from_query(query, request, resource_model)
+
         # We remove the ordering of the query since it doesn't matter for
         # getting a count and might have performance implications as discussed
         # on this Flask-SqlAlchemy issue
@@ -313,3 +317,203 @@ class Pagination:
             else:
                 query = query.order_by(sqlalchemy.desc(sorter))
         return query
+
+
+class CursorPage:
+    """
+    Page of items that is obtained with cursor pagination.
+
+    Parameters
+    ----------
+    items : list[DeclarativeMeta]
+        List of database resources on this page
+    cursor : str
+        Cursor with which this page was requested
+    next_cursor : str | None
+        Cursor to request the next page with, None if this is the last page
+    total : int | None
+        Total number of items, None if it was not requested
+
+    Attributes
+    ----------
+    items : list[DeclarativeMeta]
+        List of resources on the current page
+    cursor : str
+        Cursor with which this page was requested
+    next_cursor : str | None
+        Cursor of the next page
+    has_next : bool
+        True if there is a next page, False otherwise
+    total : int | None
+        Total number of items
+    """
+
+    def __init__(
+        self,
+        items: list[DeclarativeMeta],
+        cursor: str,
+        next_cursor: str | None,
+        total: int | None,
+    ) -> None:
+        self.items = items
+        self.cursor = cursor
+        self.next_cursor = next_cursor
+        self.has_next = next_cursor is not None
+        self.total = total
+
+
+class CursorPagination(Pagination):
+    """
+    Pagination based on the ID of the resources rather than on page numbers.
+
+    Each page continues after the ID of the last item of the previous page, which
+    is passed as the `cursor` request parameter. Contrary to page numbers, the
+    database does not have to skip the items of all previous pages, so deep pages
+    are as fast as the first one. Also, the total number of items is only counted
+    if the `total` request parameter is true. Pass an empty `cursor` to get the
+    first page, and follow the `next` link to get the next pages.
+
+    Items are sorted by ID, in ascending order by default or in descending order
+    if `sort=-id` is passed.
+
+    Parameters
+    ----------
+    page : CursorPage
+        Page of items
+    request : flask.Request
+        Request object
+    """
+
+    def __init__(self, page: CursorPage, request: flask.Request) -> None:
+        self.page = page
+        self.request = request
+
+    @property
+    def headers(self) -> dict:
+        """
+        Set the headers for the response.
+
+        Returns
+        -------
+        dict
+            Response headers
+        """
+        if self.page.total is None:
+            return {
+                "Link": self.link_header,
+                "access-control-expose-headers": "Link",
+            }
+        return super().headers
+
+    @property
+    def metadata_links(self) -> dict:
+        """
+        Construct links to the first, current and next page.
+
+        Returns
+        -------
+        dict
+            Links to other pages
+        """
+        url = self.request.path
+        args = self.request.args.copy()
+
+        navs = [
+            {"rel": "first", "cursor": ""},
+            {"rel": "self", "cursor": self.page.cursor},
+            {"rel": "next", "cursor": self.page.next_cursor},
+        ]
+
+        links = {}
+        for nav in navs:
+            if nav["cursor"] is not None:
+                args["cursor"] = nav["cursor"]
+                links[nav["rel"]] = f"{url}?{urlencode(args)}"
+
+        return links
+
+    @classmethod
+    def from_query(
+        cls,
+        query: sqlalchemy.orm.query,
+        request: flask.Request,
+        resource_model: DeclarativeMeta,
+    ) -> CursorPagination:
+        """
+        Create a CursorPagination object from a query.
+
+        Parameters
+        ----------
+        query : sqlalchemy.orm.query
+            Query to paginate
+        request : flask.Request
+            Request object
+        resource_model : DeclarativeMeta
+            SQLAlchemy model of the resource whose endpoint is being called
+
+        Returns
+        -------
+        CursorPagination
+            CursorPagination object
+
+        Raises
+        ------
+        ValueError
+            If the cursor, page size or sorting is not valid
+        """
+        cursor = request.args.get("cursor", "")
+        per_page = cls._get_per_page(request)
+        descending = cls._is_sorted_descending(request.args.get("sort"))
+
+        total = None
+        if request.args.get("total", "").lower() in ("true", "1"):
+            total = query.distinct().order_by(None).count()
+
+        query = query.order_by(None)
+        if cursor:
+            try:
+                last_id = int(cursor)
+            except ValueError:
+                raise ValueError("The 'cursor' parameter should be an integer")
+            if descending:
+                query = query.filter(resource_model.id < last_id)
+            else:
+                query = query.filter(resource_model.id > last_id)
+        query = query.order_by(
+            sqlalchemy.desc(resource_model.id) if descending else resource_model.id
+        )
+
+        # get one item more than requested to find out if there is a next page
+        items = query.distinct().limit(per_page + 1).all()
+        next_cursor = None
+        if len(items) > per_page:
+            items = items[:per_page]
+            next_cursor = str(items[-1].id)
+
+        return cls(CursorPage(items, cursor, next_cursor, total), request)
+
+    @staticmethod
+    def _is_sorted_descending(sort_string: str | None) -> bool:
+        """
+        Check the sorting that is requested in cursor pagination mode.
+
+        Parameters
+        ----------
+        sort_string : str | None
+            Value of the `sort` request parameter
+
+        Returns
+        -------
+        bool
+            True if the items should be sorted by descending ID
+
+        Raises
+        ------
+        ValueError
+            If sorting on something else than the ID is requested
+        """
+        if not sort_string or sort_string.strip() in ("id", "+id"):
+            return False
+        if sort_string.strip() == "-id":
+            return True
+        raise ValueError("With a 'cursor', results can only be sorted by 'id'")
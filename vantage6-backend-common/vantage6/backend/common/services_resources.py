@@ -1,3 +1,4 @@
+from functools import lru_cache
 from http import HTTPStatus
 from flask import request
 from flask_mail import Mail
@@ -53,9 +54,48 @@ class BaseServicesResources(Resource):
             val for item in request.args.getlist("include") for val in item.split(",")
         ]
 
+    @staticmethod
+    def select_fields(schema: BaseHATEOASModelSchema) -> BaseHATEOASModelSchema:
+        """
+        Limit a schema to the fields in the `fields` request argument.
+
+        Fields that are left out are never serialized, so the related objects
+        and links they contain are not computed. Fields that are not part of the
+        schema are ignored. If none of the requested fields are part of the
+        schema, the given schema is used.
+
+        Parameters
+        ----------
+        schema : BaseHATEOASModelSchema
+            Schema to limit
+
+        Returns
+        -------
+        BaseHATEOASModelSchema
+            Schema with only the requested fields, or the given schema if no
+            (known) fields are requested
+        """
+        # like `include`, find 'x' both in 'fields=y&fields=x' and 'fields=x,y'
+        requested = {
+            val for item in request.args.getlist("fields") for val in item.split(",")
+        }
+        only = tuple(field for field in schema.fields if field in requested)
+        if not only:
+            return schema
+
+        exclude = tuple(sorted(schema.exclude))
+        options = _schema_options(schema)
+        if schema.context:
+            # the context may differ per request, so the schema is not cached
+            return type(schema)(
+                only=only, exclude=exclude, context=schema.context, **dict(options)
+            )
+        return _limit_schema(type(schema), only, exclude, options)
+
     def dump(self, page: Page, schema: BaseHATEOASModelSchema) -> dict:
         """
-        Dump based on the request context (to paginate or not)
+        Dump based on the request context (to paginate or not). Only the fields
+        in the `fields` request argument are dumped, if it is given.
 
         Parameters
         ----------
@@ -69,7 +109,7 @@ class BaseServicesResources(Resource):
         dict
             Dumped page
         """
-        return schema.meta_dump(page)
+        return self.select_fields(schema).meta_dump(page)
 
     def response(self, page: Page, schema: BaseHATEOASModelSchema):
         """
@@ -88,3 +128,61 @@ class BaseServicesResources(Resource):
             Tuple of (dumped page, HTTPStatus.OK, headers of the page)
         """
         return self.dump(page, schema), HTTPStatus.OK, page.headers
+
+
+def _schema_options(schema: BaseHATEOASModelSchema) -> tuple:
+    """
+    Get the options with which a schema was created, other than the fields it
+    contains and its context, in a form that can be used as cache key.
+
+    Parameters
+    ----------
+    schema : BaseHATEOASModelSchema
+        Schema of which to get the options
+
+    Returns
+    -------
+    tuple
+        Pairs of option name and value
+    """
+    partial = schema.partial
+    if not isinstance(partial, bool) and partial is not None:
+        partial = tuple(sorted(partial))
+    return (
+        ("many", schema.many),
+        ("load_only", tuple(sorted(schema.load_only))),
+        ("dump_only", tuple(sorted(schema.dump_only))),
+        ("partial", partial),
+        ("unknown", schema.unknown),
+    )
+
+
+@lru_cache(maxsize=256)
+def _limit_schema(
+    schema_class: type[BaseHATEOASModelSchema],
+    only: tuple,
+    exclude: tuple,
+    options: tuple = (),
+) -> BaseHATEOASModelSchema:
+    """
+    Create a schema that only contains the given fields. Schemas are cached, as
+    creating them is relatively expensive.
+
+    Parameters
+    ----------
+    schema_class : type[BaseHATEOASModelSchema]
+        Class of the schema
+    only : tuple
+        Names of the fields to keep
+    exclude : tuple
+        Names of the fields that are excluded from the schema
+    options : tuple
+        Other options with which the schema is created, e.g. `many`, as pairs
+        of option name and value
+
+    Returns
+    -------
+    BaseHATEOASModelSchema
+        Schema with only the given fields
+    """
+    return schema_class(only=only, exclude=exclude, **dict(options))
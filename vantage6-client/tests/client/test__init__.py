@@ -24,7 +24,7 @@ class TestUserClient(unittest.TestCase):
         }
         self.client_instance.request.status_code = 200
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     @patch("vantage6.client.UserClient.authenticate")
     @patch("vantage6.client.UserClient.setup_encryption")
     def test_wait_for_results(
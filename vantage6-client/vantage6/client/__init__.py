@@ -1860,9 +1860,9 @@ class UserClient(ClientBase):
 
             self.parent.log.debug("Encrypting input for each organization")
             for org_id in organizations:
-                pub_key = self.parent.request(f"organization/{org_id}").get(
-                    "public_key"
-                )
+                pub_key = self.parent.request(
+                    f"organization/{org_id}", params={"fields": "public_key"}
+                ).get("public_key")
                 self.parent.log.debug(
                     "Public key for organization %s: %s", org_id, pub_key
                 )
@@ -1,5 +1,6 @@
+import contextlib
 import functools
-from typing import Any
+from typing import Any, ContextManager
 
 
 #
@@ -80,7 +81,8 @@ def filter_keys_from_result(func: callable) -> callable:
     ) -> dict:
         """
         Apply filters to the results of the function. If no filters are given,
-        the function returns the original dict.
+        the function returns the original dict. Only the kept keys are
+        requested from the server.
 
         Parameters
         ----------
@@ -96,10 +98,10 @@ def filter_keys_from_result(func: callable) -> callable:
         dict
             The filtered dictionary.
         """
-        dict_ = func(*args, **kwargs)
-        if field:
-            return filter_dict_keys(dict_, [field])
-        return filter_dict_keys(dict_, fields)
+        keys = [field] if field else fields
+        with select_fields_on_server(args, keys):
+            dict_ = func(*args, **kwargs)
+        return filter_dict_keys(dict_, keys)
 
     return wrapper_filter
 
@@ -127,7 +129,8 @@ def filter_keys_from_results(func: callable) -> callable:
     ) -> list[dict]:
         """
         Apply filters to the results of the function. If no filters are given,
-        the function returns the list of dicts.
+        the function returns the list of dicts. Only the kept keys, and the keys
+        that are filtered on, are requested from the server.
 
         Parameters
         ----------
@@ -143,10 +146,15 @@ def filter_keys_from_results(func: callable) -> callable:
         list[dict]
             The filtered list of dicts.
         """
-        dict_ = func(*args, **kwargs)
-        if field:
-            return filter_dicts_keys(dict_, [field])
-        return filter_dicts_keys(dict_, fields)
+        keys = [field] if field else fields
+        # the keys that are filtered on are needed as well
+        filters = kwargs.get("filters") or []
+        if kwargs.get("filter_"):
+            filters = [kwargs["filter_"]]
+        filter_keys = [key for key, _ in filters]
+        with select_fields_on_server(args, keys and [*keys, *filter_keys]):
+            dict_ = func(*args, **kwargs)
+        return filter_dicts_keys(dict_, keys)
 
     return wrapper_filter
 
@@ -199,6 +207,30 @@ def post_filtering(iterable: bool = True) -> callable:
 #
 # Helper functions
 #
+def select_fields_on_server(args: tuple, keys: list[str] | None) -> ContextManager:
+    """
+    Request only the specified keys from the server in the requests of a
+    subclient method, so that the server does not compute the other fields.
+
+    Parameters
+    ----------
+    args : tuple
+        Positional arguments of the subclient method, the first being the
+        subclient
+    keys : list[str] | None
+        The keys to request. If no keys are given, all keys are requested.
+
+    Returns
+    -------
+    ContextManager
+        Context in which the requests of the method are made
+    """
+    client = getattr(args[0], "parent", None) if args else None
+    if not keys or not hasattr(client, "select_fields"):
+        return contextlib.nullcontext()
+    return client.select_fields(keys)
+
+
 def filter_dicts_on_values(
     dicts: list[dict], filters: list[tuple[Any, Any]]
 ) -> list[dict]:
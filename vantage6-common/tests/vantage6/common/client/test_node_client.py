@@ -0,0 +1,79 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+import vantage6.common.client.node_client as node_client_module
+from vantage6.common.client.node_client import NodeClient
+from vantage6.common.globals import PUBLIC_KEY_CACHE_TTL_SECONDS
+
+
+class TestPublicKeyCache(TestCase):
+    def setUp(self):
+        self.client = NodeClient("http://localhost", 7601)
+        self.clock = 1000.0
+        clock_patcher = patch.object(
+            node_client_module.time, "monotonic", side_effect=lambda: self.clock
+        )
+        clock_patcher.start()
+        self.addCleanup(clock_patcher.stop)
+        request_patcher = patch.object(
+            self.client,
+            "request",
+            side_effect=self.respond,
+        )
+        self.request = request_patcher.start()
+        self.addCleanup(request_patcher.stop)
+
+    @staticmethod
+    def respond(endpoint: str, attempts_on_timeout: int = None) -> dict:
+        return {"public_key": f"key of {endpoint}"}
+
+    def test_public_key_cached_within_ttl(self):
+        self.assertEqual(self.client.get_public_key(1), "key of organization/1")
+        self.clock += PUBLIC_KEY_CACHE_TTL_SECONDS - 1
+        self.assertEqual(self.client.get_public_key(1), "key of organization/1")
+        self.request.assert_called_once_with("organization/1", attempts_on_timeout=None)
+
+    def test_public_key_cached_per_organization(self):
+        self.assertEqual(self.client.get_public_key(1), "key of organization/1")
+        self.assertEqual(self.client.get_public_key(2), "key of organization/2")
+        self.client.get_public_key(1)
+        self.client.get_public_key(2)
+        self.assertEqual(self.request.call_count, 2)
+
+    def test_public_key_retrieved_again_after_ttl(self):
+        self.client.get_public_key(1)
+        self.clock += PUBLIC_KEY_CACHE_TTL_SECONDS
+        self.request.side_effect = lambda endpoint, **_: {"public_key": "new key"}
+        self.assertEqual(self.client.get_public_key(1), "new key")
+        self.assertEqual(self.request.call_count, 2)
+
+    def test_missing_public_key_is_not_cached(self):
+        self.request.side_effect = lambda endpoint, **_: {"msg": "Connection error"}
+        self.assertIsNone(self.client.get_public_key(1, attempts_on_timeout=1))
+        self.request.assert_called_once_with("organization/1", attempts_on_timeout=1)
+        self.request.side_effect = lambda endpoint, **_: {"public_key": "key"}
+        self.assertEqual(self.client.get_public_key(1), "key")
+        self.assertEqual(self.request.call_count, 2)
+
+    def test_invalidate_public_key(self):
+        self.client.get_public_key(1)
+        self.client.get_public_key(2)
+
+        self.client.invalidate_public_key(1)
+        self.client.get_public_key(1)
+        self.client.get_public_key(2)
+        self.assertEqual(self.request.call_count, 3)
+
+        self.client.invalidate_public_key()
+        self.client.get_public_key(1)
+        self.client.get_public_key(2)
+        self.assertEqual(self.request.call_count, 5)
+
+    def test_cache_public_key(self):
+        self.assertIsNone(self.client.get_cached_public_key(1))
+        self.client.cache_public_key(1, "key retrieved elsewhere")
+        self.assertEqual(self.client.get_public_key(1), "key retrieved elsewhere")
+        self.request.assert_not_called()
+
+        self.clock += PUBLIC_KEY_CACHE_TTL_SECONDS
+        self.assertIsNone(self.client.get_cached_public_key(1))
@@ -0,0 +1,123 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import TestCase
+from unittest.mock import patch
+
+import requests
+
+import vantage6.common.http_session as http_session_module
+from vantage6.common.globals import DEFAULT_HTTP_MAX_RETRIES, DEFAULT_HTTP_TIMEOUT
+from vantage6.common.http_session import (
+    PooledSession,
+    configure_sessions,
+    get_session,
+    get_session_stats,
+)
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Handler that responds to GET requests over HTTP/1.1 connections"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestPooledSession(TestCase):
+    def setUp(self):
+        # restore the defaults and named sessions of the module after each test
+        patchers = [
+            patch.dict(http_session_module._defaults),
+            patch.dict(http_session_module._sessions, clear=True),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def start_server(self) -> str:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    def test_default_timeout(self):
+        session = PooledSession()
+        self.assertEqual(session.timeout, DEFAULT_HTTP_TIMEOUT)
+        with patch.object(requests.Session, "request") as request:
+            session.get("http://server/api", timeout=None)
+            self.assertEqual(request.call_args.kwargs["timeout"], session.timeout)
+
+            session.get("http://server/api", timeout=5)
+            self.assertEqual(request.call_args.kwargs["timeout"], 5)
+        self.assertEqual(session.num_requests, 2)
+
+    def test_retries_only_connection_errors(self):
+        session = PooledSession(max_retries=4)
+        for prefix in ("http://", "https://"):
+            retries = session.adapters[prefix].max_retries
+            self.assertEqual(retries.total, 4)
+            self.assertEqual(retries.connect, 4)
+            self.assertEqual(retries.read, 0)
+            self.assertEqual(retries.status, 0)
+            # any method may be retried, as the request was never received
+            self.assertIsNone(retries.allowed_methods)
+
+    def test_connections_are_reused(self):
+        url = self.start_server()
+        session = PooledSession()
+        for _ in range(3):
+            self.assertEqual(session.get(f"{url}/api").json(), {"ok": True})
+
+        stats = session.stats()
+        self.assertEqual(stats["http_requests"], 3)
+        self.assertEqual(stats["http_connections_created"], 1)
+        self.assertEqual(stats["http_idle_connections"], 1)
+        self.assertEqual(stats["http_pools"], 1)
+
+    def test_get_session_is_shared(self):
+        self.assertIs(get_session("proxy"), get_session("proxy"))
+        self.assertIsNot(get_session("proxy"), get_session())
+
+    def test_configure_sessions(self):
+        existing = get_session("proxy")
+        self.assertEqual(
+            existing.adapters["http://"].max_retries.total, DEFAULT_HTTP_MAX_RETRIES
+        )
+
+        configure_sessions(pool_maxsize=20, max_retries=1, timeout=30)
+
+        # named sessions that exist already are reconfigured
+        self.assertEqual(existing.timeout, 30)
+        self.assertEqual(existing.adapters["http://"].max_retries.total, 1)
+        self.assertEqual(existing.adapters["http://"]._pool_maxsize, 20)
+
+        # new sessions use the new defaults, unless settings are given explicitly
+        session = PooledSession()
+        self.assertEqual(session.timeout, 30)
+        self.assertEqual(session.adapters["https://"]._pool_maxsize, 20)
+        self.assertEqual(PooledSession(timeout=5).timeout, 5)
+
+        # settings that are not given keep their value
+        configure_sessions(timeout=10)
+        self.assertEqual(existing.timeout, 10)
+        self.assertEqual(existing.adapters["http://"].max_retries.total, 1)
+
+    def test_session_stats(self):
+        url = self.start_server()
+        get_session("proxy").get(f"{url}/api")
+        get_session("blob")
+
+        stats = get_session_stats()
+        self.assertEqual(set(stats), {"proxy", "blob"})
+        self.assertEqual(stats["proxy"]["http_requests"], 1)
+        self.assertEqual(stats["blob"]["http_requests"], 0)
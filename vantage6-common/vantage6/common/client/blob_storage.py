@@ -46,7 +46,7 @@ class BlobStorageMixin:
                 yield run_data[i : i + chunk_size]
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 url, data=chunked_run_data_stream(run_data_bytes), headers=headers
             )
         except requests.RequestException as e:
@@ -104,7 +104,7 @@ class BlobStorageMixin:
         self.log.debug(f"Streaming run data from {url}")
         run_data = b""
         try:
-            with requests.get(
+            with self.session.get(
                 url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT
             ) as response:
                 if response.status_code == 200:
@@ -152,7 +152,7 @@ class BlobStorageMixin:
         status_url = f"{base_url}/status"
         headers = self.headers
         headers["Content-Type"] = "application/octet-stream"
-        response = requests.get(status_url, headers=headers)
+        response = self.session.get(status_url, headers=headers)
         if not response.ok:
             self.log.warning(
                 f"Blob store check failed with status code {response.status_code}. "
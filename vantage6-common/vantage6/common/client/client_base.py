@@ -3,7 +3,11 @@ import logging
 import time
 import requests
 import json as json_lib
+from contextlib import contextmanager
+from http import HTTPStatus
 from pathlib import Path
+from typing import Iterator
+from urllib.parse import parse_qs, urlparse
 
 from vantage6.common.exceptions import AuthenticationException
 from vantage6.common.encryption import RSACryptor, DummyCryptor
@@ -11,6 +15,8 @@ from vantage6.common.globals import INTERVAL_MULTIPLIER, MAX_INTERVAL, STRING_EN
 from vantage6.common.client.utils import print_qr_code
 from vantage6.common.task_status import has_task_finished
 from vantage6.common.client.blob_storage import BlobStorageMixin
+from vantage6.common.http_session import PooledSession
+from vantage6.common.client.response_cache import ResponseCache
 
 module_name = __name__.split(".")[1]
 
@@ -101,6 +107,16 @@ class ClientBase(BlobStorageMixin):
         self.cryptor = None
         self.whoami = None
 
+        # keep connections to the server open between requests
+        self.session = PooledSession()
+
+        # fields of resources that are requested from the server, see
+        # `select_fields`
+        self._selected_fields = None
+
+        # responses to GET requests, which are revalidated with the server
+        self.response_cache = ResponseCache()
+
     @property
     def name(self) -> str:
         """
@@ -269,21 +285,44 @@ class ClientBase(BlobStorageMixin):
         if not store_valid:
             return
 
+        # only request the selected fields, see `select_fields`. Fields that are
+        # given explicitly take precedence.
+        if (
+            self._selected_fields
+            and method.lower() == "get"
+            and "fields" not in (params or {})
+        ):
+            params = {**(params or {}), "fields": ",".join(self._selected_fields)}
+
         # get appropiate method
         rest_method = {
-            "get": requests.get,
-            "post": requests.post,
-            "put": requests.put,
-            "patch": requests.patch,
-            "delete": requests.delete,
-        }.get(method.lower(), requests.get)
+            "get": self.session.get,
+            "post": self.session.post,
+            "put": self.session.put,
+            "patch": self.session.patch,
+            "delete": self.session.delete,
+        }.get(method.lower(), self.session.get)
 
         # send request to server
         url = self.generate_path_to(endpoint, is_for_algorithm_store)
         self.log.debug(f"Making request: {method.upper()} | {url} | {params}")
 
+        # GET requests are conditional if the response is cached: the server only
+        # sends the response again if it changed
+        cache_key = None
+        etag = None
+        if method.lower() == "get":
+            cache_key = (
+                requests.Request("GET", url, params=params).prepare().url,
+                tuple(sorted((headers or {}).items())),
+            )
+            etag = self.response_cache.etag(cache_key)
+
         # add additional headers if any are given
+        extra_headers = headers
         headers = self.headers if headers is None else headers | self.headers
+        if etag:
+            headers = {**headers, "If-None-Match": etag}
 
         timeout_attempts = 0
         while True:
@@ -303,6 +342,24 @@ class ClientBase(BlobStorageMixin):
                 self.log.info(exc)
                 time.sleep(1)
 
+        if response.status_code == HTTPStatus.NOT_MODIFIED:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                self.log.debug("Response not modified, using cached response")
+                return cached
+            # the cached response was removed in the meantime: request it again
+            return self.request(
+                endpoint,
+                json,
+                method,
+                params,
+                extra_headers,
+                first_try=first_try,
+                retry=retry,
+                attempts_on_timeout=attempts_on_timeout,
+                is_for_algorithm_store=is_for_algorithm_store,
+            )
+
         # TODO: should check for a non 2xx response
         if response.status_code > 210:
             self.log.error(f"Server responded with error code: {response.status_code}")
@@ -327,7 +384,7 @@ class ClientBase(BlobStorageMixin):
                         json,
                         method,
                         params,
-                        headers,
+                        extra_headers,
                         first_try=False,
                         attempts_on_timeout=attempts_on_timeout,
                         is_for_algorithm_store=is_for_algorithm_store,
@@ -335,7 +392,83 @@ class ClientBase(BlobStorageMixin):
                 else:
                     self.log.error("Nope, refreshing the token didn't fix it.")
 
-        return response.json()
+        data = response.json()
+        if cache_key is not None and response.status_code == HTTPStatus.OK:
+            self.response_cache.put(
+                cache_key, response.headers.get("ETag"), data, len(response.content)
+            )
+        return data
+
+    @contextmanager
+    def select_fields(self, fields: list[str] | None) -> Iterator[None]:
+        """
+        Request only the given fields of resources in the GET requests that are
+        made in this context. The server then leaves out the other fields, and
+        does not have to compute them.
+
+        Parameters
+        ----------
+        fields : list[str] | None
+            Fields to request. If None or empty, all fields are requested.
+        """
+        previous = self._selected_fields
+        if fields:
+            fields = list(fields)
+            # the input and result can only be decrypted if it is known whether
+            # they are kept in blob storage
+            if {"input", "result"} & set(fields):
+                fields.append("blob_storage_used")
+            self._selected_fields = fields
+        try:
+            yield
+        finally:
+            self._selected_fields = previous
+
+    def _multi_page_request(self, endpoint: str, params: dict = None) -> list[dict]:
+        """
+        Make multiple requests to the central server to get all pages of a list
+        of resources.
+
+        The pages are requested with cursor pagination, so that the server does
+        not have to count the resources or skip the resources of all previous
+        pages. Servers that do not support cursor pagination are browsed by page
+        number.
+
+        Parameters
+        ----------
+        endpoint: str
+            Endpoint to which the request should be made.
+        params: dict
+            Parameters to be passed to the request. If 'page' is present, it
+            will be ignored.
+
+        Returns
+        -------
+        list[dict]
+            All resources. If the first request fails, its response is returned.
+        """
+        params = {**(params or {}), "cursor": ""}
+        params.pop("page", None)
+        response = self.request(endpoint, params=params)
+        if not isinstance(response, dict) or "data" not in response:
+            return response
+        data = response["data"]
+
+        # append next pages (if any)
+        page = 1
+        links = response.get("links")
+        while links and links.get("next"):
+            next_args = parse_qs(urlparse(links["next"]).query)
+            if "cursor" in next_args:
+                params["cursor"] = next_args["cursor"][0]
+            else:
+                page += 1
+                params["page"] = page
+            response = self.request(endpoint, params=params)
+            data += response["data"]
+            links = response.get("links")
+
+        return data
 
     def setup_encryption(self, private_key_file: str | None) -> None:
         """Use private key file to setup encryption of sensitive data.
@@ -439,7 +572,7 @@ class ClientBase(BlobStorageMixin):
 
         # authenticate to the central server
         url = self.generate_path_to(path, is_for_algorithm_store=False)
-        response = requests.post(url, json=credentials)
+        response = self.session.post(url, json=credentials)
         if response.status_code == 404:
             self.log.error(
                 "Server not found at %s. Please check the address and whether the "
@@ -503,7 +636,7 @@ class ClientBase(BlobStorageMixin):
             url = f"{self.__host}{self.__refresh_url}"
 
         # send request to server
-        response = requests.post(
+        response = self.session.post(
             url, headers={"Authorization": "Bearer " + self.__refresh_token}
         )
 
@@ -7,12 +7,13 @@ import jwt
 import datetime
 import time
 
-from threading import Thread
+from threading import Lock, Thread
 
 from vantage6.common import WhoAmI
 from vantage6.common.client.client_base import ClientBase
 from vantage6.common.globals import (
     NODE_CLIENT_REFRESH_BEFORE_EXPIRES_SECONDS,
+    PUBLIC_KEY_CACHE_TTL_SECONDS,
     InstanceType,
 )
 
@@ -27,6 +28,12 @@ class NodeClient(ClientBase):
         self.collaboration_id = None
         self.whoami = None
 
+        # public keys of organizations, by organization id, together with the
+        # time at which they were retrieved
+        self._public_keys: dict[int, tuple[str | None, float]] = {}
+        self._public_keys_lock = Lock()
+        self._blob_store_enabled = None
+
         self.run = self.Run(self)
         self.algorithm_store = self.AlgorithmStore(self)
 
@@ -69,6 +76,117 @@ class NodeClient(ClientBase):
             organization_name=organization_name,
         )
 
+    def get_public_key(
+        self, organization_id: int, attempts_on_timeout: int = None
+    ) -> str | None:
+        """
+        Get the public key of an organization.
+
+        Public keys are cached for `PUBLIC_KEY_CACHE_TTL_SECONDS`, so that sending
+        results to the same organization does not require retrieving its public key
+        again every time.
+
+        Parameters
+        ----------
+        organization_id : int
+            ID of the organization
+        attempts_on_timeout : int, optional
+            Number of attempts to make when the server cannot be reached. By
+            default, the request is retried until the server is reached.
+
+        Returns
+        -------
+        str | None
+            Public key of the organization, or None if it could not be retrieved
+        """
+        public_key = self.get_cached_public_key(organization_id)
+        if public_key is not None:
+            return public_key
+
+        self.log.debug(f"Retrieving public key from organization={organization_id}")
+        org = self.request(
+            f"organization/{organization_id}", attempts_on_timeout=attempts_on_timeout
+        )
+        if "public_key" not in org:
+            self.log.critical(
+                "Public key could not be retrieved... Does the "
+                "initiating organization belong to your organization?"
+            )
+            return None
+
+        public_key = org["public_key"]
+        self.cache_public_key(organization_id, public_key)
+        return public_key
+
+    def get_cached_public_key(self, organization_id: int) -> str | None:
+        """
+        Get the public key of an organization from the cache, without retrieving
+        it from the server.
+
+        Parameters
+        ----------
+        organization_id : int
+            ID of the organization
+
+        Returns
+        -------
+        str | None
+            Public key of the organization, or None if it is not cached or has
+            been cached for longer than `PUBLIC_KEY_CACHE_TTL_SECONDS`
+        """
+        with self._public_keys_lock:
+            cached = self._public_keys.get(organization_id)
+        if cached and time.monotonic() - cached[1] < PUBLIC_KEY_CACHE_TTL_SECONDS:
+            return cached[0]
+        return None
+
+    def cache_public_key(self, organization_id: int, public_key: str) -> None:
+        """
+        Add a public key that was retrieved from the server to the cache.
+
+        Parameters
+        ----------
+        organization_id : int
+            ID of the organization
+        public_key : str
+            Public key of the organization
+        """
+        with self._public_keys_lock:
+            self._public_keys[organization_id] = (public_key, time.monotonic())
+
+    def invalidate_public_key(self, organization_id: int | None = None) -> None:
+        """
+        Remove a public key from the cache, so that it is retrieved from the server
+        the next time it is used.
+
+        Parameters
+        ----------
+        organization_id : int | None
+            ID of the organization whose public key changed. If None, all cached
+            public keys are removed.
+        """
+        with self._public_keys_lock:
+            if organization_id is None:
+                self._public_keys.clear()
+            else:
+                self._public_keys.pop(organization_id, None)
+
+    def check_if_blob_store_enabled(self) -> bool:
+        """
+        Check if the blob store is enabled on the server.
+
+        The blob store setting of the server does not change while the node is
+        connected, so it is only requested once.
+
+        Returns
+        -------
+        bool
+            True if blob store is enabled, False otherwise.
+        """
+        if self._blob_store_enabled is None:
+            self._blob_store_enabled = super().check_if_blob_store_enabled()
+        return self._blob_store_enabled
+
     def auto_refresh_token(self) -> None:
         """Start a thread that refreshes token before it expires."""
         # set up thread to refresh token
@@ -140,7 +258,12 @@ class NodeClient(ClientBase):
         """Subclient for the run endpoint."""
 
         def list(
-            self, state: str, include_task: bool, task_id: int = None
+            self,
+            state: str,
+            include_task: bool,
+            task_id: int = None,
+            id_from: int = None,
+            decrypt: bool = True,
         ) -> dict | list:
             """
             Obtain algorithm runs.
@@ -154,47 +277,75 @@ class NodeClient(ClientBase):
             task_id : int, optional
                 ID of the task, by default None. If None, all tasks are
                 returned.
+            id_from : int, optional
+                Only return algorithm runs with at least this ID, by default
+                None.
+            decrypt : bool, optional
+                Whether to decrypt the input of the runs, by default True. If
+                False, use `decrypt_input` to decrypt the input of a run when it
+                is needed.
 
             Returns
             -------
             dict | list
                 The algorithm runs as json.
             """
-            params = {"state": state, "node_id": self.parent.whoami.id_}
+            params = {
+                "state": state,
+                "node_id": self.parent.whoami.id_,
+                "sort": "-id",
+            }
             if include_task:
                 params["include"] = "task"
             if task_id:
                 params["task_id"] = task_id
-            run_data = self.parent.request(endpoint="run", params=params)
+            if id_from:
+                params["id_from"] = id_from
+            run_data = self.parent._multi_page_request(endpoint="run", params=params)
 
-            if isinstance(run_data, str):
+            if not isinstance(run_data, list):
                 self.parent.log.warning("Requesting algorithm runs failed")
                 self.parent.log.warning(f"Fail message: {run_data}")
                 return {}
 
-            # if there are multiple pages of algorithm runs, get them all
-            links = run_data.get("links")
-            page = 1
-            while links and links.get("next"):
-                page += 1
-                new_runs_page = self.parent.request(
-                    endpoint="run", params={**params, "page": page}
-                )
-                run_data["data"] += new_runs_page["data"]
-                links = new_runs_page.get("links")
-
-            # strip pagination links
-            run_data = run_data["data"]
-
             # Multiple runs
-            for run in run_data:
-                run["input"] = self.parent._fetch_and_decrypt_run_data(
-                    run["input"], run["blob_storage_used"]
-                )
+            if decrypt:
+                for run in run_data:
+                    self.decrypt_input(run)
 
             return run_data
 
-        def patch(self, id_: int, data: dict, init_org_id: int = None) -> dict | None:
+        def decrypt_input(self, run: dict) -> dict:
+            """
+            Decrypt the input of an algorithm run, downloading it from the blob
+            store first if it is stored there.
+
+            Parameters
+            ----------
+            run : dict
+                Algorithm run as obtained from the server. Its input is replaced
+                by the decrypted input. If the run does not contain its input, the
+                input is retrieved from the server.
+
+            Returns
+            -------
+            dict
+                The algorithm run with decrypted input
+            """
+            if "input" not in run:
+                run["input"] = self.parent.request(f"run/{run['id']}")["input"]
+            run["input"] = self.parent._fetch_and_decrypt_run_data(
+                run["input"], run["blob_storage_used"]
+            )
+            return run
+
+        def patch(
+            self,
+            id_: int,
+            data: dict,
+            init_org_id: int = None,
+            attempts_on_timeout: int = None,
+        ) -> dict | None:
             """
             Update the algorithm run data at the central server.
 
@@ -210,6 +361,9 @@ class NodeClient(ClientBase):
                 Organization id of the origin of the task. This is required
                 when the run dict includes results, because then results have
                 to be encrypted specifically for them
+            attempts_on_timeout: int, optional
+                Number of attempts to make when the server cannot be reached. By
+                default, the request is retried until the server is reached.
 
             Returns
             -------
@@ -223,37 +377,76 @@ class NodeClient(ClientBase):
                         "to server as they cannot be encrypted"
                     )
                     return
-                self.parent.log.debug(
-                    f"Retrieving public key from organization={init_org_id}"
+                blob_store_enabled = self.parent.check_if_blob_store_enabled()
+                data["result"] = self.encrypt_result(
+                    data["result"], init_org_id, blob_store_enabled
                 )
+                data["result"] = self.upload_result(data["result"], blob_store_enabled)
+            self.parent.log.debug("Sending algorithm run update to server")
+            return self.parent.request(
+                f"run/{id_}",
+                json=data,
+                method="patch",
+                attempts_on_timeout=attempts_on_timeout,
+            )
+
+        def encrypt_result(
+            self, result: bytes, init_org_id: int, blob_store_enabled: bool
+        ) -> str | bytes:
+            """
+            Encrypt the result of an algorithm run for the organization that
+            created the task.
 
-                org = self.parent.request(f"organization/{init_org_id}")
-                public_key = None
-                try:
-                    public_key = org["public_key"]
-                except KeyError:
-                    self.parent.log.critical(
-                        "Public key could not be retrieved... Does the "
-                        "initiating organization belong to your organization?"
-                    )
+            Parameters
+            ----------
+            result: bytes
+                Result of the algorithm run
+            init_org_id: int
+                ID of the organization that created the task
+            blob_store_enabled: bool
+                Whether the result is sent to the blob store. If so, the encrypted
+                result is not base64 encoded.
 
-                self.parent.log.debug("Sending algorithm run update to server")
-                blob_store_enabled = self.parent.check_if_blob_store_enabled()
-                # If the result is a blob, it is not base64 encoded.
-                data["result"] = self.parent.cryptor.encrypt_bytes_to_str(
-                    data["result"],
-                    public_key,
-                    skip_base64_encoding_of_msg=blob_store_enabled,
-                )
-                # If blob store is enabled, stream the result to the server, which
-                # will stream it to the blob store and return the UUID reference to use.
-                if blob_store_enabled:
-                    result_uuid = self.parent._upload_run_data_to_server(data["result"])
-                    self.parent.log.debug(
-                        f"Result uploaded to server with UUID: {result_uuid}"
-                    )
-                    data["result"] = result_uuid
-            return self.parent.request(f"run/{id_}", json=data, method="patch")
+            Returns
+            -------
+            str | bytes
+                The encrypted result. If the blob store is enabled, this is bytes
+                rather than a string.
+            """
+            public_key = self.parent.get_public_key(init_org_id)
+            return self.parent.cryptor.encrypt_bytes_to_str(
+                result,
+                public_key,
+                skip_base64_encoding_of_msg=blob_store_enabled,
+            )
+
+        def upload_result(
+            self, encrypted_result: str | bytes, blob_store_enabled: bool
+        ) -> str:
+            """
+            Upload an encrypted result to the blob store, if it is enabled.
+
+            Parameters
+            ----------
+            encrypted_result: str | bytes
+                Result encrypted with `encrypt_result`
+            blob_store_enabled: bool
+                Whether the blob store is enabled at the server
+
+            Returns
+            -------
+            str
+                Value to send as result when patching the run: the UUID reference
+                to the result in the blob store, or the encrypted result itself if
+                the blob store is not enabled.
+            """
+            if not blob_store_enabled:
+                return encrypted_result
+            # Stream the result to the server, which will stream it to the blob
+            # store and return the UUID reference to use.
+            result_uuid = self.parent._upload_run_data_to_server(encrypted_result)
+            self.parent.log.debug(f"Result uploaded to server with UUID: {result_uuid}")
+            return result_uuid
 
     class AlgorithmStore(ClientBase.SubClient):
         """Subclient for the algorithm store endpoint."""
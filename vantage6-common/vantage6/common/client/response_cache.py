@@ -0,0 +1,104 @@
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from vantage6.common.globals import MAX_CACHED_RESPONSES, MAX_CACHED_RESPONSE_SIZE
+
+
+class ResponseCache:
+    """
+    Cache of responses to GET requests, that are revalidated with the server.
+
+    A cached response is stored with its ETag. When the same request is made
+    again, the ETag is sent in the `If-None-Match` header. If the server responds
+    that the resource was not modified, the cached response is used. Only the
+    most recently used responses are kept.
+
+    Parameters
+    ----------
+    max_entries : int, optional
+        Maximum number of responses that are kept
+    max_size : int, optional
+        Maximum size in bytes of the body of a response to keep it
+    """
+
+    def __init__(
+        self,
+        max_entries: int = MAX_CACHED_RESPONSES,
+        max_size: int = MAX_CACHED_RESPONSE_SIZE,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self._entries: OrderedDict[Any, tuple[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def etag(self, key: Any) -> str | None:
+        """
+        Get the ETag of a cached response.
+
+        Parameters
+        ----------
+        key : Any
+            Key of the request
+
+        Returns
+        -------
+        str | None
+            ETag of the cached response, or None if no response is cached
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def get(self, key: Any) -> Any:
+        """
+        Get a cached response, and mark it as recently used.
+
+        Parameters
+        ----------
+        key : Any
+            Key of the request
+
+        Returns
+        -------
+        Any
+            A copy of the cached response, so that it can be modified by the
+            caller, or None if no response is cached
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+        return copy.deepcopy(entry[1])
+
+    def put(self, key: Any, etag: str | None, data: Any, size: int) -> None:
+        """
+        Cache a response. Responses without ETag, or that are too large, are
+        not cached, and remove a previously cached response to the request.
+
+        Parameters
+        ----------
+        key : Any
+            Key of the request
+        etag : str | None
+            ETag of the response
+        data : Any
+            Decoded body of the response
+        size : int
+            Size in bytes of the body of the response
+        """
+        with self._lock:
+            if not etag or size > self.max_size:
+                self._entries.pop(key, None)
+                return
+            self._entries[key] = (etag, copy.deepcopy(data))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached responses"""
+        with self._lock:
+            self._entries.clear()
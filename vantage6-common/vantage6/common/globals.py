@@ -40,6 +40,15 @@ PING_INTERVAL_SECONDS = 60
 # expires.
 NODE_CLIENT_REFRESH_BEFORE_EXPIRES_SECONDS = 600
 
+# time for which the node caches the public keys of organizations. Organizations
+# may update their public key, so the cached keys have to be refreshed regularly.
+PUBLIC_KEY_CACHE_TTL_SECONDS = 600
+
+# prefixes of the references that nodes send to the server instead of the input and
+# results of subtasks that they keep locally for their own organization
+LOCAL_SUBTASK_INPUT_PREFIX = "vantage6-local-input:"
+LOCAL_SUBTASK_RESULT_PREFIX = "vantage6-local-result:"
+
 # The basics image can be used (mainly by the UI) to collect column names
 BASIC_PROCESSING_IMAGE = "harbor2.vantage6.ai/algorithms/basics"
 
@@ -62,6 +71,24 @@ REQUEST_TIMEOUT = 300
 # Default chunk size for streaming inputs and results
 DEFAULT_CHUNK_SIZE = 1024 * 1024  # 1MB
 
+# Maximum number of responses of the server that clients cache, and the maximum
+# size in bytes of a response that is cached. Cached responses are revalidated
+# with the server using their ETag.
+MAX_CACHED_RESPONSES = 256
+MAX_CACHED_RESPONSE_SIZE = 1024 * 1024  # 1MB
+
+# Default settings of the pooled HTTP sessions: number of hosts for which
+# connections are pooled, number of connections kept open per host, number of
+# retries when a connection cannot be established, and request timeout in seconds
+# (None for no timeout)
+DEFAULT_HTTP_POOL_CONNECTIONS = 10
+DEFAULT_HTTP_POOL_MAXSIZE = 10
+DEFAULT_HTTP_MAX_RETRIES = 3
+DEFAULT_HTTP_TIMEOUT = None
+
+# Maximum number of results that are downloaded from the blob store concurrently
+MAX_CONCURRENT_RESULT_DOWNLOADS = 8
+
 
 class InstanceType(str, Enum):
     """The types of instances that can be created."""
@@ -0,0 +1,247 @@
+"""
+Pooled HTTP sessions
+
+Calling `requests.get`, `requests.post` etc. directly opens a new connection (and
+does a new TLS handshake) for every request. The sessions in this module keep
+connections to each host open and reuse them, retry requests for which no
+connection could be established, and apply a default timeout.
+
+Clients that talk to a single vantage6 server create their own `PooledSession`.
+Modules that make requests on behalf of others (e.g. the node proxy server) use a
+named session that is shared within the process, see `get_session`.
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from vantage6.common.globals import (
+    DEFAULT_HTTP_MAX_RETRIES,
+    DEFAULT_HTTP_POOL_CONNECTIONS,
+    DEFAULT_HTTP_POOL_MAXSIZE,
+    DEFAULT_HTTP_TIMEOUT,
+)
+
+# settings used for sessions that are created without explicit settings
+_defaults = {
+    "pool_connections": DEFAULT_HTTP_POOL_CONNECTIONS,
+    "pool_maxsize": DEFAULT_HTTP_POOL_MAXSIZE,
+    "max_retries": DEFAULT_HTTP_MAX_RETRIES,
+    "timeout": DEFAULT_HTTP_TIMEOUT,
+}
+_sessions: dict[str, "PooledSession"] = {}
+_sessions_lock = threading.Lock()
+
+
+class PooledSession(requests.Session):
+    """
+    Requests session that keeps connections open and reuses them.
+
+    Attributes
+    ----------
+    timeout: float | None
+        Timeout in seconds that is used for requests that do not specify a
+        timeout themselves
+    num_requests: int
+        Number of requests that have been sent with this session
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = None,
+        pool_maxsize: int = None,
+        max_retries: int = None,
+        timeout: float | None = None,
+    ) -> None:
+        """
+        Create a pooled session. Settings that are not provided are taken from
+        the defaults set with `configure_sessions`.
+
+        Parameters
+        ----------
+        pool_connections: int, optional
+            Number of hosts for which connections are pooled
+        pool_maxsize: int, optional
+            Maximum number of connections that are kept open per host
+        max_retries: int, optional
+            Number of times a request is retried when no connection could be
+            established
+        timeout: float | None, optional
+            Default timeout in seconds for requests
+        """
+        super().__init__()
+        self.timeout = _defaults["timeout"] if timeout is None else timeout
+        self.num_requests = 0
+        self._lock = threading.Lock()
+        self.configure(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=max_retries,
+        )
+
+    def configure(
+        self,
+        pool_connections: int = None,
+        pool_maxsize: int = None,
+        max_retries: int = None,
+    ) -> None:
+        """
+        (Re)configure the connection pools of this session.
+
+        Parameters
+        ----------
+        pool_connections: int, optional
+            Number of hosts for which connections are pooled
+        pool_maxsize: int, optional
+            Maximum number of connections that are kept open per host
+        max_retries: int, optional
+            Number of times a request is retried when no connection could be
+            established
+        """
+        if max_retries is None:
+            max_retries = _defaults["max_retries"]
+        # only retry when the connection could not be established: in that case,
+        # the request has not been received by the other side so it is safe to
+        # retry any method. Errors in the response are handled by the callers.
+        retries = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            status=0,
+            other=0,
+            allowed_methods=None,
+            backoff_factor=0.5,
+            raise_on_status=False,
+        )
+        for prefix in ("https://", "http://"):
+            self.mount(
+                prefix,
+                HTTPAdapter(
+                    pool_connections=pool_connections or _defaults["pool_connections"],
+                    pool_maxsize=pool_maxsize or _defaults["pool_maxsize"],
+                    max_retries=retries,
+                ),
+            )
+
+    def request(self, method: str, url: str, *args, **kwargs) -> requests.Response:
+        """
+        Send a request, using the default timeout if no timeout is given.
+
+        See `requests.Session.request` for the parameters.
+        """
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        with self._lock:
+            self.num_requests += 1
+        return super().request(method, url, *args, **kwargs)
+
+    def stats(self) -> dict:
+        """
+        Get statistics on the connection pools of this session.
+
+        Returns
+        -------
+        dict
+            Number of requests sent, number of connections that were opened, number
+            of connections that are currently idle in the pools, and the number of
+            hosts for which connections are pooled.
+        """
+        connections_created = 0
+        idle_connections = 0
+        num_pools = 0
+        for adapter in self.adapters.values():
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                num_pools += 1
+                connections_created += pool.num_connections
+                # the queue of a pool is filled with placeholders for connections
+                # that have not been opened yet
+                if pool.pool is not None:
+                    idle_connections += sum(
+                        1 for conn in list(pool.pool.queue) if conn is not None
+                    )
+        return {
+            "http_requests": self.num_requests,
+            "http_connections_created": connections_created,
+            "http_idle_connections": idle_connections,
+            "http_pools": num_pools,
+        }
+
+
+def configure_sessions(
+    pool_connections: int = None,
+    pool_maxsize: int = None,
+    max_retries: int = None,
+    timeout: float | None = None,
+) -> None:
+    """
+    Set the default settings of pooled sessions.
+
+    The settings apply to sessions that are created afterwards, and to the named
+    sessions obtained with `get_session` that exist already.
+
+    Parameters
+    ----------
+    pool_connections: int, optional
+        Number of hosts for which connections are pooled
+    pool_maxsize: int, optional
+        Maximum number of connections that are kept open per host
+    max_retries: int, optional
+        Number of times a request is retried when no connection could be
+        established
+    timeout: float | None, optional
+        Default timeout in seconds for requests
+    """
+    settings = {
+        "pool_connections": pool_connections,
+        "pool_maxsize": pool_maxsize,
+        "max_retries": max_retries,
+        "timeout": timeout,
+    }
+    _defaults.update(
+        {key: value for key, value in settings.items() if value is not None}
+    )
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.timeout = _defaults["timeout"]
+            session.configure()
+
+
+def get_session(name: str = "default") -> PooledSession:
+    """
+    Get a pooled session that is shared within this process.
+
+    Parameters
+    ----------
+    name: str
+        Name of the session. Different parts of an application may use different
+        sessions, so that their statistics can be told apart.
+
+    Returns
+    -------
+    PooledSession
+        The shared session with the given name
+    """
+    with _sessions_lock:
+        if name not in _sessions:
+            _sessions[name] = PooledSession()
+        return _sessions[name]
+
+
+def get_session_stats() -> dict[str, dict]:
+    """
+    Get statistics of all named sessions.
+
+    Returns
+    -------
+    dict[str, dict]
+        Statistics per session name, see `PooledSession.stats`
+    """
+    with _sessions_lock:
+        sessions = dict(_sessions)
+    return {name: session.stats() for name, session in sessions.items()}
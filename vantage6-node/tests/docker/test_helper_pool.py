@@ -0,0 +1,156 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import vantage6.node.docker.helper_pool as helper_pool_module
+from vantage6.node.docker.helper_pool import VPNHelperPool
+
+
+class SynchronousThread:
+    """Thread that runs its target when it is started, in the calling thread"""
+
+    def __init__(self, target, args=(), daemon=None):
+        self.target = target
+        self.args = args
+
+    def start(self):
+        self.target(*self.args)
+
+
+class TestVPNHelperPool(TestCase):
+    def setUp(self):
+        self.docker = MagicMock()
+        self.docker.containers.list.return_value = []
+        self.docker.containers.run.side_effect = self._new_helper
+        self.vpn_manager = MagicMock()
+        self.vpn_manager.has_vpn = True
+        self.created = []
+
+        # fill the pool in the test thread, so that its state can be checked
+        thread_patcher = patch.object(
+            helper_pool_module.threading, "Thread", SynchronousThread
+        )
+        thread_patcher.start()
+        self.addCleanup(thread_patcher.stop)
+        remove_patcher = patch.object(helper_pool_module, "remove_container")
+        self.remove_container = remove_patcher.start()
+        self.addCleanup(remove_patcher.stop)
+
+    def _new_helper(self, **kwargs):
+        helper = MagicMock()
+        helper.name = kwargs["name"]
+        helper.status = "running"
+        self.created.append(helper)
+        return helper
+
+    def create_pool(self, size: int = 2) -> VPNHelperPool:
+        return VPNHelperPool(
+            docker_client=self.docker,
+            vpn_manager=self.vpn_manager,
+            isolated_network_mgr=MagicMock(network_name="isolated"),
+            node_name="node",
+            alpine_image="alpine",
+            size=size,
+        )
+
+    def test_pool_is_filled(self):
+        pool = self.create_pool(size=2)
+        self.assertEqual(len(pool._available), 2)
+        self.assertEqual(self.vpn_manager.forward_traffic_from_algorithm.call_count, 2)
+        for helper in self.created:
+            self.vpn_manager.forward_traffic_from_algorithm.assert_any_call(helper)
+
+    def test_stale_helpers_are_removed(self):
+        stale = MagicMock()
+        self.docker.containers.list.return_value = [stale]
+        self.create_pool()
+        self.remove_container.assert_called_once_with(stale, kill=True)
+        filters = self.docker.containers.list.call_args.kwargs["filters"]
+        self.assertIn("pooled=true", filters["label"])
+
+    def test_claim_and_refill(self):
+        pool = self.create_pool(size=2)
+        helper = pool.claim()
+        self.assertIn(helper, self.created[:2])
+        # the pool is filled up again after a helper is claimed
+        self.assertEqual(len(pool._available), 2)
+        self.assertNotIn(helper, pool._available)
+
+    def test_claim_creates_helper_if_pool_is_empty(self):
+        pool = self.create_pool(size=0)
+        self.assertEqual(pool._available, [])
+        helper = pool.claim()
+        self.assertIs(helper, self.created[0])
+        self.vpn_manager.forward_traffic_from_algorithm.assert_called_once_with(helper)
+
+    def test_release_returns_helper_to_pool(self):
+        pool = self.create_pool(size=1)
+        helper = pool.claim()
+        pool._available.clear()
+
+        pool.release(helper)
+        self.vpn_manager.remove_forwarding_to_algorithm.assert_called_once_with(helper)
+        self.assertEqual(pool._available, [helper])
+        self.remove_container.assert_not_called()
+
+    def test_release_removes_helper_if_pool_is_full(self):
+        pool = self.create_pool(size=1)
+        helper = pool.claim()
+        pool.release(helper)
+        self.assertNotIn(helper, pool._available)
+        self.remove_container.assert_called_once_with(helper, kill=True)
+
+    def test_release_removes_stopped_helper(self):
+        pool = self.create_pool(size=1)
+        helper = pool.claim()
+        pool._available.clear()
+        helper.status = "exited"
+
+        pool.release(helper)
+        self.assertEqual(pool._available, [])
+        self.vpn_manager.remove_forwarding_to_algorithm.assert_not_called()
+        self.remove_container.assert_called_once_with(helper, kill=True)
+
+    def test_release_removes_helper_on_error(self):
+        pool = self.create_pool(size=1)
+        pool._available.clear()
+
+        # the helper container has disappeared
+        helper = self._new_helper(name="gone")
+        helper.reload.side_effect = RuntimeError("No such container")
+        pool.release(helper)
+        self.assertEqual(pool._available, [])
+        self.remove_container.assert_called_once_with(helper, kill=True)
+
+        # the forwarding rules to the helper could not be removed
+        self.remove_container.reset_mock()
+        helper = self._new_helper(name="no-forwarding")
+        self.vpn_manager.remove_forwarding_to_algorithm.side_effect = RuntimeError()
+        pool.release(helper)
+        self.assertEqual(pool._available, [])
+        self.remove_container.assert_called_once_with(helper, kill=True)
+
+    def test_helper_removed_if_routing_fails(self):
+        self.vpn_manager.forward_traffic_from_algorithm.side_effect = RuntimeError()
+        pool = self.create_pool(size=1)
+        # the pool is not filled, and the helper that was created is removed
+        self.assertEqual(pool._available, [])
+        self.assertFalse(pool._filling)
+        self.remove_container.assert_called_once_with(self.created[0], kill=True)
+
+        self.remove_container.reset_mock()
+        with self.assertRaises(RuntimeError):
+            pool.claim()
+        self.remove_container.assert_any_call(self.created[1], kill=True)
+
+    def test_not_filled_without_vpn(self):
+        self.vpn_manager.has_vpn = False
+        pool = self.create_pool(size=2)
+        self.assertEqual(pool._available, [])
+        self.docker.containers.run.assert_not_called()
+
+    def test_cleanup(self):
+        pool = self.create_pool(size=2)
+        pool.cleanup()
+        self.assertEqual(pool._available, [])
+        for helper in self.created:
+            self.remove_container.assert_any_call(helper, kill=True)
@@ -0,0 +1,224 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import vantage6.node.docker.image_cache as image_cache_module
+from vantage6.node.docker.image_cache import (
+    ImageCache,
+    ImageMetadataCache,
+    split_pinned_digest,
+)
+
+IMAGE = "harbor2.vantage6.ai/demo/average:latest"
+DIGEST = "sha256:" + "a" * 64
+PINNED_IMAGE = f"harbor2.vantage6.ai/demo/average@{DIGEST}"
+
+
+def local_image(repo_digests: list[str], labels: dict = None) -> MagicMock:
+    """Create a mock of a local docker image"""
+    image = MagicMock()
+    image.attrs = {
+        "RepoDigests": repo_digests,
+        "Config": {"Labels": labels or {}, "ExposedPorts": {"8888/tcp": {}}},
+    }
+    return image
+
+
+class TestImageCache(TestCase):
+    def setUp(self):
+        self.docker = MagicMock()
+        self.docker.images.list.return_value = []
+        self.clock = 1000.0
+        patcher = patch.object(
+            image_cache_module.time, "monotonic", side_effect=lambda: self.clock
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_pull_skipped_within_ttl(self):
+        cache = ImageCache(self.docker, pull_ttl=60)
+        self.assertFalse(cache.is_up_to_date(IMAGE))
+
+        cache.pull(IMAGE)
+        cache.pull(IMAGE)
+        self.docker.images.pull.assert_called_once_with(IMAGE)
+        self.assertTrue(cache.is_up_to_date(IMAGE))
+
+    def test_pull_again_after_ttl_expired(self):
+        cache = ImageCache(self.docker, pull_ttl=60)
+        cache.pull(IMAGE)
+
+        self.clock += 59
+        self.assertTrue(cache.is_up_to_date(IMAGE))
+        self.clock += 1
+        self.assertFalse(cache.is_up_to_date(IMAGE))
+
+        cache.pull(IMAGE)
+        self.assertEqual(self.docker.images.pull.call_count, 2)
+
+    def test_zero_ttl_always_pulls(self):
+        cache = ImageCache(self.docker, pull_ttl=0)
+        cache.pull(IMAGE)
+        cache.pull(IMAGE)
+        self.assertEqual(self.docker.images.pull.call_count, 2)
+
+    def test_invalidate(self):
+        cache = ImageCache(self.docker, pull_ttl=60)
+        cache.pull(IMAGE)
+        cache.invalidate(IMAGE)
+        self.assertFalse(cache.is_up_to_date(IMAGE))
+
+        cache.pull(IMAGE)
+        cache.invalidate()
+        self.assertFalse(cache.is_up_to_date(IMAGE))
+
+    def test_failed_pull_is_not_cached(self):
+        self.docker.images.pull.side_effect = RuntimeError("registry unavailable")
+        cache = ImageCache(self.docker, pull_ttl=60)
+        with self.assertRaises(RuntimeError):
+            cache.pull(IMAGE)
+        self.assertFalse(cache.is_up_to_date(IMAGE))
+
+    def test_pinned_digest_available_locally(self):
+        self.docker.images.list.return_value = [
+            local_image([f"harbor2.vantage6.ai/demo/average@{DIGEST}"])
+        ]
+        cache = ImageCache(self.docker, pull_ttl=0)
+        self.assertTrue(cache.is_up_to_date(PINNED_IMAGE))
+        cache.pull(PINNED_IMAGE)
+        self.docker.images.pull.assert_not_called()
+        self.docker.images.list.assert_called_with(
+            name="harbor2.vantage6.ai/demo/average"
+        )
+
+    def test_pinned_digest_not_available_locally(self):
+        self.docker.images.list.return_value = [
+            local_image(["harbor2.vantage6.ai/demo/average@sha256:" + "b" * 64])
+        ]
+        cache = ImageCache(self.docker, pull_ttl=0)
+        self.assertFalse(cache.is_up_to_date(PINNED_IMAGE))
+        cache.pull(PINNED_IMAGE)
+        self.docker.images.pull.assert_called_once_with(PINNED_IMAGE)
+
+    def test_pull_updates_metadata(self):
+        metadata = MagicMock()
+        pulled = local_image([])
+        self.docker.images.pull.return_value = pulled
+        cache = ImageCache(self.docker, pull_ttl=60, metadata=metadata)
+        cache.pull(IMAGE)
+        metadata.update_from_image.assert_called_once_with(IMAGE, pulled)
+
+    def test_prepull_disabled(self):
+        cache = ImageCache(self.docker, pull_ttl=60, prepull=False)
+        with patch.object(image_cache_module.threading, "Thread") as thread:
+            cache.prepull(IMAGE)
+        thread.assert_not_called()
+
+    def test_prepull_worker_does_not_raise(self):
+        self.docker.images.pull.side_effect = RuntimeError("registry unavailable")
+        cache = ImageCache(self.docker, pull_ttl=60)
+        cache._prepulling.add(IMAGE)
+        cache._prepull_worker(IMAGE)
+        self.assertNotIn(IMAGE, cache._prepulling)
+        self.assertFalse(cache.is_up_to_date(IMAGE))
+
+
+class TestImageMetadataCache(TestCase):
+    def setUp(self):
+        self.docker = MagicMock()
+        self.clock = 1000.0
+        patcher = patch.object(
+            image_cache_module.time, "time", side_effect=lambda: self.clock
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        get_digest_patcher = patch.object(
+            image_cache_module, "get_digest", return_value=DIGEST
+        )
+        self.get_digest = get_digest_patcher.start()
+        self.addCleanup(get_digest_patcher.stop)
+
+    def test_digest_cached_within_ttl(self):
+        cache = ImageMetadataCache(self.docker, digest_ttl=60)
+        self.assertEqual(cache.get_digest(IMAGE), DIGEST)
+        self.clock += 59
+        self.assertEqual(cache.get_digest(IMAGE), DIGEST)
+        self.get_digest.assert_called_once_with(IMAGE, client=self.docker)
+
+    def test_digest_refreshed_after_ttl(self):
+        cache = ImageMetadataCache(self.docker, digest_ttl=60)
+        cache.get_digest(IMAGE)
+        self.clock += 60
+        new_digest = "sha256:" + "c" * 64
+        self.get_digest.return_value = new_digest
+        self.assertEqual(cache.get_digest(IMAGE), new_digest)
+        self.assertEqual(self.get_digest.call_count, 2)
+
+    def test_pinned_digest_is_not_looked_up(self):
+        cache = ImageMetadataCache(self.docker, digest_ttl=60)
+        self.assertEqual(cache.get_digest(PINNED_IMAGE), DIGEST)
+        self.get_digest.assert_not_called()
+
+    def test_missing_digest_is_not_cached(self):
+        self.get_digest.return_value = None
+        cache = ImageMetadataCache(self.docker, digest_ttl=60)
+        self.assertIsNone(cache.get_digest(IMAGE))
+        self.assertIsNone(cache.get_digest(IMAGE))
+        self.assertEqual(self.get_digest.call_count, 2)
+
+    def test_image_config_cached_by_digest(self):
+        self.docker.images.get.return_value = local_image(
+            [f"harbor2.vantage6.ai/demo/average@{DIGEST}"], labels={"a": "b"}
+        )
+        cache = ImageMetadataCache(self.docker, digest_ttl=60)
+        expected = {"labels": {"a": "b"}, "exposed_ports": ["8888/tcp"]}
+        self.assertEqual(cache.get_image_config(IMAGE), expected)
+        self.assertEqual(cache.get_image_config(IMAGE), expected)
+        self.assertEqual(cache.get_image_config(PINNED_IMAGE), expected)
+        self.docker.images.get.assert_called_once_with(IMAGE)
+
+    def test_persisted_across_restarts(self):
+        self.docker.images.get.return_value = local_image(
+            [f"harbor2.vantage6.ai/demo/average@{DIGEST}"]
+        )
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_file = Path(temp_dir) / "image_metadata.json"
+            cache = ImageMetadataCache(self.docker, cache_file, digest_ttl=60)
+            cache.get_image_config(IMAGE)
+
+            restarted = ImageMetadataCache(self.docker, cache_file, digest_ttl=60)
+            self.assertEqual(restarted.get_digest(IMAGE), DIGEST)
+            restarted.get_image_config(IMAGE)
+            self.get_digest.assert_not_called()
+            self.docker.images.get.assert_called_once()
+
+    def test_corrupt_cache_file_is_ignored(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_file = Path(temp_dir) / "image_metadata.json"
+            cache_file.write_text("{not json", encoding="utf-8")
+            cache = ImageMetadataCache(self.docker, cache_file, digest_ttl=60)
+            self.assertEqual(cache.get_digest(IMAGE), DIGEST)
+            with open(cache_file, encoding="utf-8") as fp:
+                self.assertIn(IMAGE, json.load(fp)["digests"])
+
+    def test_invalidate(self):
+        cache = ImageMetadataCache(self.docker, digest_ttl=60)
+        cache.get_digest(IMAGE)
+        cache.invalidate(IMAGE)
+        cache.get_digest(IMAGE)
+        self.assertEqual(self.get_digest.call_count, 2)
+
+
+class TestSplitPinnedDigest(TestCase):
+    def test_split_pinned_digest(self):
+        self.assertEqual(
+            split_pinned_digest(PINNED_IMAGE),
+            ("harbor2.vantage6.ai/demo/average", DIGEST),
+        )
+        self.assertEqual(
+            split_pinned_digest(f"harbor2.vantage6.ai/demo/average:1.0@{DIGEST}"),
+            ("harbor2.vantage6.ai/demo/average", DIGEST),
+        )
+        self.assertEqual(split_pinned_digest(IMAGE), (IMAGE, None))
@@ -0,0 +1,318 @@
+import itertools
+import re
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from vantage6.common.docker.addons import get_image_name_wo_tag
+from vantage6.common.globals import NodePolicy
+from vantage6.node.docker.docker_manager import DockerManager
+from vantage6.node.docker.policy_matcher import PolicyMatcher
+
+DIGEST_A = "sha256:" + "a" * 64
+DIGEST_B = "sha256:" + "b" * 64
+
+# registry digests of the images used in the tests
+DIGESTS = {
+    "harbor2.vantage6.ai/demo/average": DIGEST_A,
+    "harbor2.vantage6.ai/demo/average:latest": DIGEST_A,
+    "harbor2.vantage6.ai/demo/average:1.0": DIGEST_A,
+    "harbor2.vantage6.ai/demo/average:0.9": DIGEST_B,
+    f"harbor2.vantage6.ai/demo/average@{DIGEST_A}": DIGEST_A,
+    f"harbor2.vantage6.ai/demo/average@{DIGEST_B}": DIGEST_B,
+    "harbor2.vantage6.ai/demo/kaplan-meier:latest": DIGEST_B,
+}
+
+STORES = {
+    1: "https://store.cotopaxi.vantage6.ai",
+    2: "https://store.other.org",
+}
+
+IMAGES = [
+    "harbor2.vantage6.ai/demo/average",
+    "harbor2.vantage6.ai/demo/average:latest",
+    "harbor2.vantage6.ai/demo/average:1.0",
+    "harbor2.vantage6.ai/demo/average:0.9",
+    f"harbor2.vantage6.ai/demo/average@{DIGEST_A}",
+    f"harbor2.vantage6.ai/demo/average@{DIGEST_B}",
+    "harbor2.vantage6.ai/demo/kaplan-meier:latest",
+    "harbor2.vantage6.ai/demo/average-extended:latest",
+    "docker.io/someone/average:latest",
+    "INVALID IMAGE NAME",
+]
+
+ALLOWED_ALGORITHMS = [
+    None,
+    # exact names, with and without tag or digest
+    "harbor2.vantage6.ai/demo/average",
+    ["harbor2.vantage6.ai/demo/average:latest"],
+    ["harbor2.vantage6.ai/demo/average:1.0"],
+    [f"harbor2.vantage6.ai/demo/average@{DIGEST_B}"],
+    ["harbor2.vantage6.ai/demo/kaplan-meier", "harbor2.vantage6.ai/demo/average:0.9"],
+    # dots are not interpreted as regular expression
+    ["harbor2.vantage6.ai/demo/average-extended:latest"],
+    ["harbor2Xvantage6Xai/demo/average"],
+    # regular expressions
+    [r"^harbor2\.vantage6\.ai/demo/.*"],
+    [r"harbor2\.vantage6\.ai/demo/average$"],
+    [r"^docker\.io/.*", "harbor2.vantage6.ai/demo/kaplan-meier:latest"],
+    # policies that cannot be parsed are skipped
+    ["NOT AN IMAGE", "harbor2.vantage6.ai/demo/average:latest"],
+]
+
+ALLOWED_STORES = [
+    None,
+    "https://store.cotopaxi.vantage6.ai",
+    ["https://store.other.org"],
+    [r"^https://store\.cotopaxi\..*"],
+    [r"https://.*\.org$", "https://store.cotopaxi.vantage6.ai"],
+]
+
+
+def baseline_is_algorithm_allowed(
+    policies: dict, evaluated_img: str, store_url: str | None
+) -> bool:
+    """
+    The checks of the `allowed_algorithms` and `allowed_algorithm_stores` policies
+    as they were implemented in `DockerManager.is_docker_image_allowed` before the
+    policies were precompiled.
+    """
+
+    def _is_regex_pattern(pattern: str) -> bool:
+        common_regex_chars = [
+            "*",
+            "\\",
+            "?",
+            "$",
+            "^",
+            "[",
+            "]",
+            "(",
+            ")",
+            "{",
+            "}",
+            "|",
+            "+",
+            "\\.",
+        ]
+        return any((c in pattern for c in common_regex_chars))
+
+    allowed_algorithms = policies.get(NodePolicy.ALLOWED_ALGORITHMS)
+    allowed_stores = policies.get(NodePolicy.ALLOWED_ALGORITHM_STORES)
+    allow_either_whitelist_or_store = policies.get(
+        "allow_either_whitelist_or_store", False
+    )
+
+    algorithm_whitelisted = False
+    if allowed_algorithms:
+        if isinstance(allowed_algorithms, str):
+            allowed_algorithms = [allowed_algorithms]
+        try:
+            evaluated_img_wo_tag = get_image_name_wo_tag(evaluated_img)
+        except Exception:
+            evaluated_img_wo_tag = None
+        for allowed_algo in allowed_algorithms:
+            if not _is_regex_pattern(allowed_algo):
+                try:
+                    allowed_wo_tag = get_image_name_wo_tag(allowed_algo)
+                except Exception:
+                    continue
+                if allowed_algo == evaluated_img:
+                    algorithm_whitelisted = True
+                    break
+                elif allowed_algo == evaluated_img_wo_tag:
+                    algorithm_whitelisted = True
+                    break
+                elif allowed_wo_tag == evaluated_img_wo_tag:
+                    digest_evaluated_image = DIGESTS.get(evaluated_img)
+                    digest_policy_image = DIGESTS.get(allowed_algo)
+                    if (
+                        digest_evaluated_image
+                        and digest_policy_image
+                        and (digest_evaluated_image == digest_policy_image)
+                    ):
+                        algorithm_whitelisted = True
+                        break
+            else:
+                expr_ = re.compile(allowed_algo)
+                if expr_.match(evaluated_img):
+                    algorithm_whitelisted = True
+
+    store_whitelisted = False
+    if allowed_stores and store_url:
+        if isinstance(allowed_stores, str):
+            allowed_stores = [allowed_stores]
+        for store in allowed_stores:
+            if not _is_regex_pattern(store):
+                if store == store_url:
+                    store_whitelisted = True
+            else:
+                expr_ = re.compile(store)
+                if expr_.match(store_url):
+                    store_whitelisted = True
+
+    allowed_from_whitelist = not allowed_algorithms or algorithm_whitelisted
+    allowed_from_store = not allowed_stores or store_whitelisted
+    if allow_either_whitelist_or_store:
+        return allowed_from_whitelist or allowed_from_store
+    return allowed_from_whitelist and allowed_from_store
+
+
+def create_docker_manager(policies: dict) -> DockerManager:
+    """Create a docker manager that only has what is needed to check policies"""
+    docker_manager = DockerManager.__new__(DockerManager)
+    docker_manager._policies = docker_manager._setup_policies({"policies": policies})
+    docker_manager._algorithm_store_urls = {}
+    docker_manager._metadata_ttl = 300
+    docker_manager.client = MagicMock()
+    docker_manager.client.algorithm_store.get.side_effect = lambda id_: {
+        "url": STORES[id_]
+    }
+    docker_manager.image_metadata = MagicMock()
+    docker_manager.image_metadata.get_digest.side_effect = DIGESTS.get
+    return docker_manager
+
+
+class TestPolicyMatcherParity(TestCase):
+    def test_parity_with_baseline(self):
+        for allowed_algorithms, allowed_stores, either in itertools.product(
+            ALLOWED_ALGORITHMS, ALLOWED_STORES, [False, True]
+        ):
+            policies = {
+                NodePolicy.ALLOWED_ALGORITHMS: allowed_algorithms,
+                NodePolicy.ALLOWED_ALGORITHM_STORES: allowed_stores,
+                "allow_either_whitelist_or_store": either,
+            }
+            docker_manager = create_docker_manager(policies)
+            for image, store_id in itertools.product(IMAGES, [None, 1, 2]):
+                task_info = {"algorithm_store": {"id": store_id} if store_id else None}
+                with self.subTest(policies=policies, image=image, store_id=store_id):
+                    self.assertEqual(
+                        docker_manager.is_docker_image_allowed(image, task_info),
+                        baseline_is_algorithm_allowed(
+                            policies, image, STORES.get(store_id)
+                        ),
+                    )
+
+
+class TestAlgorithmStoreUrl(TestCase):
+    @patch("vantage6.node.docker.docker_manager.time.monotonic")
+    def test_store_url_refreshed_after_ttl(self, monotonic):
+        monotonic.return_value = 1000
+        docker_manager = create_docker_manager(
+            {NodePolicy.ALLOWED_ALGORITHM_STORES: STORES[1]}
+        )
+        task_info = {"algorithm_store": {"id": 1}}
+        image = "harbor2.vantage6.ai/demo/average"
+        self.assertTrue(docker_manager.is_docker_image_allowed(image, task_info))
+
+        # the URL of the store is changed at the server
+        docker_manager.client.algorithm_store.get.side_effect = lambda id_: {
+            "url": "https://other-store.example.com"
+        }
+        monotonic.return_value += 299
+        self.assertTrue(docker_manager.is_docker_image_allowed(image, task_info))
+        monotonic.return_value += 1
+        self.assertFalse(docker_manager.is_docker_image_allowed(image, task_info))
+        self.assertEqual(docker_manager.client.algorithm_store.get.call_count, 2)
+
+
+class TestPolicyMatcher(TestCase):
+    def test_exact_name(self):
+        matcher = PolicyMatcher(
+            {NodePolicy.ALLOWED_ALGORITHMS: ["harbor2.vantage6.ai/demo/average:1.0"]}
+        )
+        self.assertTrue(
+            matcher.match_algorithm_by_name("harbor2.vantage6.ai/demo/average:1.0")
+        )
+        self.assertFalse(
+            matcher.match_algorithm_by_name("harbor2.vantage6.ai/demo/average:0.9")
+        )
+
+    def test_name_without_tag(self):
+        matcher = PolicyMatcher(
+            {NodePolicy.ALLOWED_ALGORITHMS: "harbor2.vantage6.ai/demo/average"}
+        )
+        for image in [
+            "harbor2.vantage6.ai/demo/average",
+            "harbor2.vantage6.ai/demo/average:0.9",
+            f"harbor2.vantage6.ai/demo/average@{DIGEST_A}",
+        ]:
+            self.assertTrue(matcher.match_algorithm_by_name(image), image)
+        self.assertFalse(
+            matcher.match_algorithm_by_name("harbor2.vantage6.ai/demo/averages")
+        )
+
+    def test_digest_candidates(self):
+        matcher = PolicyMatcher(
+            {
+                NodePolicy.ALLOWED_ALGORITHMS: [
+                    "harbor2.vantage6.ai/demo/average:1.0",
+                    f"harbor2.vantage6.ai/demo/average@{DIGEST_B}",
+                    "harbor2.vantage6.ai/demo/kaplan-meier:latest",
+                    r"^harbor2\.vantage6\.ai/demo/average:.*",
+                ]
+            }
+        )
+        self.assertEqual(
+            matcher.get_digest_candidates("harbor2.vantage6.ai/demo/average:latest"),
+            [
+                "harbor2.vantage6.ai/demo/average:1.0",
+                f"harbor2.vantage6.ai/demo/average@{DIGEST_B}",
+            ],
+        )
+        self.assertEqual(
+            matcher.get_digest_candidates("harbor2.vantage6.ai/demo/unknown"), []
+        )
+        self.assertEqual(matcher.get_digest_candidates("INVALID IMAGE NAME"), [])
+
+    def test_regex(self):
+        matcher = PolicyMatcher(
+            {NodePolicy.ALLOWED_ALGORITHMS: [r"^harbor2\.vantage6\.ai/demo/.*"]}
+        )
+        self.assertEqual(matcher.algorithm_names, [])
+        self.assertTrue(
+            matcher.match_algorithm_by_name("harbor2.vantage6.ai/demo/anything")
+        )
+        self.assertFalse(
+            matcher.match_algorithm_by_name("harbor2.vantage6.ai/other/average")
+        )
+
+    def test_dot_is_not_a_regex(self):
+        self.assertFalse(PolicyMatcher.is_regex_pattern("harbor2.vantage6.ai/average"))
+        self.assertTrue(PolicyMatcher.is_regex_pattern(r"harbor2\.vantage6\.ai/.*"))
+        matcher = PolicyMatcher(
+            {NodePolicy.ALLOWED_ALGORITHMS: "harbor2.vantage6.ai/demo/average"}
+        )
+        self.assertFalse(
+            matcher.match_algorithm_by_name("harbor2Xvantage6Xai/demo/average")
+        )
+
+    def test_invalid_regex_is_skipped(self):
+        matcher = PolicyMatcher(
+            {
+                NodePolicy.ALLOWED_ALGORITHMS: ["^harbor2[", "^docker.io/.*"],
+                NodePolicy.ALLOWED_ALGORITHM_STORES: ["^https://(store"],
+            }
+        )
+        self.assertEqual(len(matcher.algorithm_patterns), 1)
+        self.assertEqual(matcher.store_patterns, [])
+        self.assertTrue(matcher.match_algorithm_by_name("docker.io/someone/image"))
+
+    def test_store(self):
+        matcher = PolicyMatcher(
+            {
+                NodePolicy.ALLOWED_ALGORITHM_STORES: [
+                    "https://store.cotopaxi.vantage6.ai",
+                    r"^https://.*\.org$",
+                ]
+            }
+        )
+        self.assertTrue(matcher.match_store("https://store.cotopaxi.vantage6.ai"))
+        self.assertTrue(matcher.match_store("https://store.other.org"))
+        self.assertFalse(matcher.match_store("https://store.cotopaxi.vantage6.ai/x"))
+        self.assertFalse(matcher.match_store("https://store.other.com"))
+
+    def test_no_policies(self):
+        matcher = PolicyMatcher({})
+        self.assertFalse(matcher.match_algorithm_by_name("any/image"))
+        self.assertFalse(matcher.match_store("https://store.cotopaxi.vantage6.ai"))
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import time
+from pathlib import Path
+from unittest import TestCase
+
+from vantage6.common.globals import (
+    LOCAL_SUBTASK_INPUT_PREFIX,
+    LOCAL_SUBTASK_RESULT_PREFIX,
+)
+from vantage6.node.local_subtasks import LocalSubtaskStore
+
+
+class TestLocalSubtaskStore(TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.directory = Path(temp_dir.name) / "local_subtasks"
+        self.store = LocalSubtaskStore(self.directory, retention=3600)
+        self.store.start()
+
+    def test_references(self):
+        reference = self.store.store_input(b"input")
+        self.assertTrue(reference.startswith(LOCAL_SUBTASK_INPUT_PREFIX))
+        self.assertTrue(LocalSubtaskStore.is_input_reference(reference))
+        self.assertFalse(LocalSubtaskStore.is_result_reference(reference))
+
+        result_reference = self.store.store_result(1, b"result")
+        self.assertTrue(result_reference.startswith(LOCAL_SUBTASK_RESULT_PREFIX))
+        self.assertTrue(LocalSubtaskStore.is_result_reference(result_reference))
+
+        # encrypted or base64 encoded input and results are not references
+        for value in ("aW5wdXQ=", b"vantage6-local-input:abc", None):
+            self.assertFalse(LocalSubtaskStore.is_input_reference(value))
+            self.assertFalse(LocalSubtaskStore.is_result_reference(value))
+
+    def test_start_run_and_store_result(self):
+        reference = self.store.store_input(b"input")
+        self.assertFalse(self.store.is_local_run(1))
+
+        self.assertEqual(self.store.start_run(1, reference), b"input")
+        self.assertTrue(self.store.is_local_run(1))
+
+        result_reference = self.store.store_result(1, b"result")
+        self.assertFalse(self.store.is_local_run(1))
+        self.assertEqual(self.store.get_result(result_reference), b"result")
+        # the input is removed once the result is stored
+        self.assertIsNone(self.store.start_run(2, reference))
+        self.assertEqual(
+            [path.name.split("-")[0] for path in self.directory.iterdir()],
+            ["result"],
+        )
+
+    def test_missing_input_and_result(self):
+        missing = "0" * 32
+        self.assertIsNone(
+            self.store.start_run(1, f"{LOCAL_SUBTASK_INPUT_PREFIX}{missing}")
+        )
+        self.assertFalse(self.store.is_local_run(1))
+        self.assertIsNone(
+            self.store.get_result(f"{LOCAL_SUBTASK_RESULT_PREFIX}{missing}")
+        )
+
+    def test_invalid_key_does_not_leave_store(self):
+        outside = self.directory.parent / "input-secret"
+        outside.write_bytes(b"secret")
+        for key in ("../input-secret", "/etc/passwd", "A" * 32, ""):
+            self.assertIsNone(
+                self.store.start_run(1, f"{LOCAL_SUBTASK_INPUT_PREFIX}{key}")
+            )
+            self.assertIsNone(
+                self.store.get_result(f"{LOCAL_SUBTASK_RESULT_PREFIX}../{key}")
+            )
+        self.assertFalse(self.store.is_local_run(1))
+
+    def test_prune_expired_entries(self):
+        expired = self.store.store_input(b"old input")
+        current = self.store.store_input(b"new input")
+        key = expired[len(LOCAL_SUBTASK_INPUT_PREFIX) :]
+        long_ago = time.time() - 7200
+        os.utime(self.directory / f"input-{key}", (long_ago, long_ago))
+
+        self.store.prune()
+        self.assertIsNone(self.store.start_run(1, expired))
+        self.assertEqual(self.store.start_run(2, current), b"new input")
+
+    def test_expired_entries_removed_on_start(self):
+        reference = self.store.store_input(b"input")
+        key = reference[len(LOCAL_SUBTASK_INPUT_PREFIX) :]
+        long_ago = time.time() - 7200
+        os.utime(self.directory / f"input-{key}", (long_ago, long_ago))
+
+        # e.g. after the node was restarted
+        restarted = LocalSubtaskStore(self.directory, retention=3600)
+        restarted.start()
+        self.assertEqual(list(self.directory.iterdir()), [])
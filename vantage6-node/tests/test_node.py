@@ -0,0 +1,118 @@
+import queue
+from threading import Lock
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from vantage6.node import Node
+
+
+class TestSyncTaskQueue(TestCase):
+    def setUp(self):
+        # open runs for this node at the server
+        self.open_runs = []
+
+        self.node = Node.__new__(Node)
+        self.node.log = MagicMock()
+        self.node.queue = queue.Queue()
+        self.node.client = MagicMock()
+        self.node.client.run.list.side_effect = self.list_runs
+        self.node.result_uploader = MagicMock()
+        self.node.result_uploader.is_pending.return_value = False
+        self.node._Node__docker = MagicMock()
+        self.node._Node__docker.is_running.return_value = False
+        self.node._last_run_id = 0
+        self.node._received_run_ids = set()
+        self.node._received_runs_lock = Lock()
+
+    def list_runs(self, id_from: int = None, task_id: int = None, **kwargs):
+        return [
+            run
+            for run in self.open_runs
+            if run["id"] >= (id_from or 0)
+            and (task_id is None or run["task"]["id"] == task_id)
+        ]
+
+    def create_runs(self, task_id: int, run_ids: list[int]) -> list[dict]:
+        runs = [
+            {"id": id_, "task": {"id": task_id, "name": "task", "image": "image"}}
+            for id_ in run_ids
+        ]
+        self.open_runs.extend(runs)
+        return runs
+
+    def queued_run_ids(self) -> list[int]:
+        run_ids = []
+        while not self.node.queue.empty():
+            run_ids.append(self.node.queue.get()["id"])
+        return run_ids
+
+    def test_sync_only_fetches_new_runs(self):
+        self.create_runs(1, [1, 2])
+        self.node.sync_task_queue_with_server()
+        self.assertEqual(self.queued_run_ids(), [1, 2])
+
+        self.create_runs(2, [3])
+        self.node.sync_task_queue_with_server()
+        self.assertEqual(self.queued_run_ids(), [3])
+        id_from = [
+            call.kwargs["id_from"] for call in self.node.client.run.list.call_args_list
+        ]
+        self.assertEqual(id_from, [1, 3])
+
+        # syncing without new runs keeps the runs that are known
+        self.node.sync_task_queue_with_server()
+        self.assertEqual(self.queued_run_ids(), [])
+        self.assertEqual(self.node._last_run_id, 3)
+
+    def test_event_does_not_skip_runs_with_lower_id(self):
+        # the event of task 1 was missed, and the event of task 2 is received
+        # before the node has synced with the server
+        self.create_runs(1, [1])
+        self.node.add_runs_to_queue(self.create_runs(2, [2]))
+        self.assertEqual(self.queued_run_ids(), [2])
+
+        self.node.sync_task_queue_with_server()
+        self.assertEqual(self.queued_run_ids(), [1])
+        self.assertEqual(self.node.client.run.list.call_args.kwargs["id_from"], 1)
+        self.assertEqual(self.node._last_run_id, 2)
+        self.assertEqual(self.node._received_run_ids, set())
+
+    def test_runs_received_twice_are_queued_once(self):
+        # a run is delivered by a websocket event after the node has synced
+        runs = self.create_runs(1, [1, 2])
+        self.node.sync_task_queue_with_server()
+        self.node.add_runs_to_queue(runs)
+        self.node.get_task_and_add_to_queue(1)
+        self.assertEqual(self.queued_run_ids(), [1, 2])
+
+        # a run is synced after it was delivered by a websocket event
+        runs = self.create_runs(2, [3])
+        self.node.add_runs_to_queue(runs)
+        self.node.sync_task_queue_with_server()
+        self.assertEqual(self.queued_run_ids(), [3])
+
+    def test_runs_above_last_synced_run_are_remembered(self):
+        self.create_runs(1, [1])
+        self.node.sync_task_queue_with_server()
+        self.node.add_runs_to_queue(self.create_runs(2, [4]))
+        self.assertEqual(self.node._received_run_ids, {4})
+
+        # run 3 was created before run 4, but its event has not been received
+        self.create_runs(3, [3])
+        self.open_runs.sort(key=lambda run: run["id"])
+        self.assertEqual(
+            [run["id"] for run in self.node.filter_unknown_runs(self.open_runs)], [3]
+        )
+        self.assertEqual(self.node.filter_unknown_runs(self.open_runs), [])
+
+    def test_running_run_is_not_queued(self):
+        self.node._Node__docker.is_running.return_value = True
+        self.create_runs(1, [1])
+        self.node.sync_task_queue_with_server()
+        self.assertEqual(self.queued_run_ids(), [])
+
+        self.node._Node__docker.is_running.return_value = False
+        self.node.result_uploader.is_pending.return_value = True
+        self.create_runs(2, [2])
+        self.node.sync_task_queue_with_server()
+        self.assertEqual(self.queued_run_ids(), [])
@@ -0,0 +1,173 @@
+import json
+from http import HTTPStatus
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from vantage6.common import bytes_to_base64s
+from vantage6.common.client.node_client import NodeClient
+from vantage6.node import proxy_server
+
+SERVER_URL = "http://server:7601/api"
+CONTAINER_HEADERS = {"Authorization": "Bearer container-token"}
+
+
+class ServerResponse:
+    """Response of the central server, as returned by `requests`"""
+
+    def __init__(self, body: dict | list, status_code: int = HTTPStatus.OK):
+        self.body = body
+        self.status_code = status_code
+        self.content = json.dumps(body).encode()
+        self.headers = {"Content-Type": "application/json"}
+
+    def json(self):
+        return self.body
+
+
+class ProxyServerTestCase(TestCase):
+    """Base class for tests of the proxy server, without a central server"""
+
+    def setUp(self):
+        self.client = NodeClient("http://server", 7601)
+        self.client.whoami = MagicMock(organization_id=1)
+        self.client.cryptor = MagicMock()
+        self.client.cryptor.encrypt_bytes_to_str.side_effect = (
+            lambda data, public_key: f"encrypted for {public_key}: {data.decode()}"
+        )
+        self.client.cryptor.decrypt.side_effect = lambda data: data.encode()
+        for method, value in [
+            ("is_encrypted_collaboration", True),
+            ("check_if_blob_store_enabled", False),
+        ]:
+            patcher = patch.object(self.client, method, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        # requests that the proxy server sends to the central server
+        self.requests = []
+        self.responses = {}
+        method_patcher = patch.object(
+            proxy_server, "get_method", side_effect=self._get_method
+        )
+        method_patcher.start()
+        self.addCleanup(method_patcher.stop)
+
+        config_patcher = patch.dict(
+            proxy_server.app.config, {"SERVER_IO": self.client, "LOCAL_SUBTASKS": None}
+        )
+        config_patcher.start()
+        self.addCleanup(config_patcher.stop)
+        url_patcher = patch.object(proxy_server, "server_url", SERVER_URL)
+        url_patcher.start()
+        self.addCleanup(url_patcher.stop)
+        self.app = proxy_server.app.test_client()
+
+    def _get_method(self, method: str) -> callable:
+        def send(url, json=None, params=None, headers=None, stream=False):
+            endpoint = url.removeprefix(f"{SERVER_URL}/")
+            self.requests.append((method.lower(), endpoint, json, headers))
+            return self.responses[(method.lower(), endpoint)](json)
+
+        return send
+
+    def respond(self, method: str, endpoint: str, body, status=HTTPStatus.OK):
+        """Set the response of the central server to a request"""
+        self.responses[(method, endpoint)] = lambda _: ServerResponse(body, status)
+
+    @staticmethod
+    def organization(id_: int, input_: str) -> dict:
+        return {"id": id_, "input": bytes_to_base64s(input_.encode())}
+
+
+class TestProxyTask(ProxyServerTestCase):
+    def setUp(self):
+        super().setUp()
+        for org_id in (1, 2):
+            self.respond(
+                "get", f"organization/{org_id}", {"public_key": f"key {org_id}"}
+            )
+        self.responses[("post", "task")] = lambda body: ServerResponse(body)
+
+    def post_task(self, org_ids: list[int]):
+        return self.app.post(
+            "/task",
+            json={
+                "organizations": [
+                    self.organization(org_id, f"input {org_id}") for org_id in org_ids
+                ]
+            },
+            headers=CONTAINER_HEADERS,
+        )
+
+    def test_input_encrypted_per_organization(self):
+        response = self.post_task([1, 2])
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(
+            [org["input"] for org in response.get_json(force=True)["organizations"]],
+            ["encrypted for key 1: input 1", "encrypted for key 2: input 2"],
+        )
+
+    def test_public_key_retrieved_with_container_token(self):
+        self.post_task([2])
+        self.assertIn(("get", "organization/2", None, CONTAINER_HEADERS), self.requests)
+        self.assertEqual(self.client.get_cached_public_key(2), "key 2")
+
+    def test_cached_public_key_is_used(self):
+        self.client.cache_public_key(2, "cached key 2")
+        response = self.post_task([2])
+        self.assertEqual(
+            response.get_json(force=True)["organizations"][0]["input"],
+            "encrypted for cached key 2: input 2",
+        )
+        self.assertEqual([request[1] for request in self.requests], ["task"])
+
+    def test_public_key_not_available_to_container(self):
+        self.respond(
+            "get", "organization/2", {"msg": "forbidden"}, HTTPStatus.FORBIDDEN
+        )
+        with patch.object(proxy_server, "sleep"):
+            response = self.post_task([1, 2])
+        self.assertEqual(response.status_code, HTTPStatus.INTERNAL_SERVER_ERROR)
+        self.assertNotIn("task", [request[1] for request in self.requests])
+        self.assertIsNone(self.client.get_cached_public_key(2))
+
+
+class TestProxyResult(ProxyServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.respond(
+            "get",
+            "result?task_id=1",
+            {
+                "data": [
+                    {"id": 1, "result": "result 1", "blob_storage_used": False},
+                    {"id": 2, "result": "result 2", "blob_storage_used": False},
+                ],
+                "links": {"first": "/result?page=1"},
+            },
+        )
+
+    def get_results(self):
+        return self.app.get("/result?task_id=1", headers=CONTAINER_HEADERS)
+
+    def test_results_decrypted(self):
+        response = self.get_results()
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        body = json.loads(response.data)
+        self.assertEqual(
+            [run["result"] for run in body["data"]],
+            [bytes_to_base64s(b"result 1"), bytes_to_base64s(b"result 2")],
+        )
+        self.assertEqual(body["links"], {"first": "/result?page=1"})
+
+    def test_failed_decryption_returns_error(self):
+        def decrypt_result(run: dict) -> dict:
+            if run["id"] == 2:
+                raise RuntimeError("Result of run 2 could not be read")
+            return run
+
+        with patch.object(proxy_server, "decrypt_result", side_effect=decrypt_result):
+            response = self.get_results()
+        self.assertEqual(response.status_code, HTTPStatus.INTERNAL_SERVER_ERROR)
+        # the algorithm receives a complete error message, not a partial result
+        self.assertIn("msg", json.loads(response.data))
@@ -0,0 +1,121 @@
+import http.client
+import socket
+import threading
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from vantage6.node.proxy_wsgi_server import ProxyWSGIServer
+
+
+class TestProxyWSGIServer(TestCase):
+    def setUp(self):
+        # requests to /block wait until this event is set
+        self.unblock = threading.Event()
+        self.addCleanup(self.unblock.set)
+        self.blocked = threading.Event()
+
+    def app(self, environ: dict, start_response: callable) -> list[bytes]:
+        if environ["PATH_INFO"] == "/block":
+            self.blocked.set()
+            self.unblock.wait(timeout=10)
+        body = str(environ["REMOTE_PORT"]).encode()
+        start_response(
+            "200 OK",
+            [("Content-Type", "text/plain"), ("Content-Length", str(len(body)))],
+        )
+        return [body]
+
+    def start_server(self, workers: int) -> ProxyWSGIServer:
+        server = ProxyWSGIServer(
+            "127.0.0.1", 0, self.app, workers=workers, access_log=MagicMock()
+        )
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def connect(self, server: ProxyWSGIServer) -> http.client.HTTPConnection:
+        connection = http.client.HTTPConnection(
+            "127.0.0.1", server.server_port, timeout=10
+        )
+        self.addCleanup(connection.close)
+        return connection
+
+    @staticmethod
+    def get(connection: http.client.HTTPConnection, path: str) -> str:
+        connection.request("GET", path)
+        response = connection.getresponse()
+        return response.read().decode()
+
+    def test_requests_handled_concurrently(self):
+        server = self.start_server(workers=2)
+        blocking = threading.Thread(
+            target=self.get, args=(self.connect(server), "/block"), daemon=True
+        )
+        blocking.start()
+        self.assertTrue(self.blocked.wait(timeout=10))
+
+        # another request is handled while the first one is waiting
+        self.get(self.connect(server), "/fast")
+        self.assertTrue(blocking.is_alive())
+
+        self.unblock.set()
+        blocking.join(timeout=10)
+        self.assertFalse(blocking.is_alive())
+
+    def test_number_of_workers_is_bounded(self):
+        server = self.start_server(workers=1)
+
+        def get_and_close(connection: http.client.HTTPConnection) -> None:
+            # close the connection, so that it does not keep the worker occupied
+            self.get(connection, "/block")
+            connection.close()
+
+        blocking = threading.Thread(
+            target=get_and_close, args=(self.connect(server),), daemon=True
+        )
+        blocking.start()
+        self.assertTrue(self.blocked.wait(timeout=10))
+
+        # the only worker is busy, so the second request has to wait
+        done = threading.Event()
+        waiting = threading.Thread(
+            target=lambda: (self.get(self.connect(server), "/fast"), done.set()),
+            daemon=True,
+        )
+        waiting.start()
+        self.assertFalse(done.wait(timeout=0.5))
+
+        self.unblock.set()
+        self.assertTrue(done.wait(timeout=10))
+
+    def test_connection_closed_after_response(self):
+        server = self.start_server(workers=1)
+        connection = self.connect(server)
+        connection.request("GET", "/fast")
+        response = connection.getresponse()
+        response.read()
+        self.assertEqual(response.getheader("Connection"), "close")
+
+        # the worker is available for the next connection
+        self.get(self.connect(server), "/fast")
+
+    def test_idle_connection_is_closed(self):
+        server = self.start_server(workers=1)
+        server.RequestHandlerClass.timeout = 0.2
+        idle = socket.create_connection(("127.0.0.1", server.server_port))
+        self.addCleanup(idle.close)
+
+        # the idle connection is closed after the timeout, which frees the worker
+        self.assertTrue(self.get(self.connect(server), "/fast").isdigit())
+        idle.settimeout(10)
+        self.assertEqual(idle.recv(1024), b"")
+
+    def test_server_close_stops_workers(self):
+        server = self.start_server(workers=2)
+        self.get(self.connect(server), "/fast")
+        server.shutdown()
+        server.server_close()
+        with self.assertRaises(RuntimeError):
+            server.executor.submit(print)
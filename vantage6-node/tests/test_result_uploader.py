@@ -0,0 +1,206 @@
+import json
+import tempfile
+import time
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import vantage6.node.result_uploader as result_uploader_module
+from vantage6.node.globals import RESULT_UPLOAD_MAX_BACKOFF
+from vantage6.node.result_uploader import ResultUploader, ResultUploadStage
+
+RESULT = b"secret result of the algorithm"
+ENCRYPTED_RESULT = f"encrypted:{RESULT.hex()}"
+DATA = {"status": "completed", "log": "done"}
+
+
+class TestResultUploader(TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.spool_dir = Path(temp_dir.name) / "spool"
+
+        self.client = MagicMock()
+        self.client.check_if_blob_store_enabled.return_value = False
+        self.client.get_public_key.return_value = "public key"
+        self.client.run.encrypt_result.side_effect = (
+            lambda result, org_id, blob: f"encrypted:{result.hex()}"
+        )
+        self.client.run.upload_result.side_effect = lambda result, blob: result
+        self.client.request.side_effect = lambda endpoint, **kwargs: {"id": 1}
+
+        # retries are not scheduled, but recorded with their delay
+        self.timers = []
+        timer_patcher = patch.object(
+            result_uploader_module.threading, "Timer", side_effect=self._timer
+        )
+        timer_patcher.start()
+        self.addCleanup(timer_patcher.stop)
+
+    def _timer(self, delay, function, args=()):
+        self.timers.append((delay, args))
+        return MagicMock()
+
+    def create_uploader(self, max_attempts: int = 3) -> ResultUploader:
+        uploader = ResultUploader(
+            self.client, self.spool_dir, max_attempts=max_attempts
+        )
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        return uploader
+
+    def read_spool(self, run_id: int) -> dict:
+        with open(self.spool_dir / f"{run_id}.json", encoding="utf-8") as f:
+            return json.load(f)
+
+    def patched_result(self) -> dict:
+        """Return the JSON body with which the run was patched at the server"""
+        self.assertEqual(self.client.request.call_args.args, ("run/1",))
+        self.assertEqual(self.client.request.call_args.kwargs["method"], "patch")
+        return self.client.request.call_args.kwargs["json"]
+
+    def test_result_encrypted_before_spooling(self):
+        uploader = self.create_uploader()
+        uploader.submit(1, 2, RESULT, DATA)
+
+        spool_file = self.spool_dir / "1.json"
+        self.assertNotIn(RESULT, spool_file.read_bytes())
+        entry = self.read_spool(1)
+        self.assertEqual(entry["stage"], ResultUploadStage.ENCRYPTED)
+        self.assertEqual(entry["result"], {"str": ENCRYPTED_RESULT})
+        self.client.get_public_key.assert_called_once_with(2, attempts_on_timeout=1)
+        self.assertTrue(uploader.is_pending(1))
+
+        uploader._upload(1)
+        self.assertEqual(self.patched_result(), {**DATA, "result": ENCRYPTED_RESULT})
+        # the result is not encrypted again
+        self.client.run.encrypt_result.assert_called_once()
+        self.assertFalse(uploader.is_pending(1))
+        self.assertEqual(uploader.get_metrics()["result_upload_count"], 1)
+
+    def test_spooled_unencrypted_if_public_key_unavailable(self):
+        self.client.get_public_key.return_value = None
+        uploader = self.create_uploader()
+        uploader.submit(1, 2, RESULT, DATA)
+        entry = self.read_spool(1)
+        self.assertEqual(entry["stage"], ResultUploadStage.PLAIN)
+        self.client.run.encrypt_result.assert_not_called()
+
+        # the upload worker encrypts the result once the key is available
+        self.client.get_public_key.return_value = "public key"
+        uploader._upload(1)
+        self.assertEqual(self.patched_result(), {**DATA, "result": ENCRYPTED_RESULT})
+
+    def test_spooled_unencrypted_if_server_unreachable(self):
+        self.client.check_if_blob_store_enabled.side_effect = ConnectionError()
+        uploader = self.create_uploader()
+        uploader.submit(1, 2, RESULT, DATA)
+        self.assertEqual(self.read_spool(1)["stage"], ResultUploadStage.PLAIN)
+
+        # encrypting in the worker fails as well, so the upload is retried
+        with patch.object(uploader, "_retry_later") as retry_later:
+            with self.assertRaises(ConnectionError):
+                uploader._upload(1)
+        retry_later.assert_not_called()
+        self.assertTrue(uploader.is_pending(1))
+
+    def test_result_without_encryption(self):
+        uploader = self.create_uploader()
+        uploader.submit(1, None, "vantage6-local-result:abc", DATA, encrypt=False)
+        self.assertEqual(self.read_spool(1)["stage"], ResultUploadStage.UPLOADED)
+        uploader._upload(1)
+        self.client.run.encrypt_result.assert_not_called()
+        self.assertEqual(
+            self.patched_result(), {**DATA, "result": "vantage6-local-result:abc"}
+        )
+
+    def test_unknown_organization_is_discarded(self):
+        uploader = self.create_uploader()
+        uploader.submit(1, None, RESULT, DATA)
+        uploader._upload(1)
+        self.client.request.assert_not_called()
+        self.assertFalse(uploader.is_pending(1))
+        self.assertEqual(uploader.get_metrics()["result_upload_failures"], 1)
+
+    def test_retry_with_exponential_backoff(self):
+        self.client.request.side_effect = lambda endpoint, **kwargs: {
+            "msg": "Connection error"
+        }
+        uploader = self.create_uploader(max_attempts=3)
+        uploader.submit(1, 2, RESULT, DATA)
+        for _ in range(12):
+            uploader._upload(1)
+
+        delays = [delay for delay, _ in self.timers]
+        self.assertEqual(delays[:4], [1, 2, 4, 8])
+        self.assertEqual(max(delays), RESULT_UPLOAD_MAX_BACKOFF)
+        self.assertEqual(delays[-1], RESULT_UPLOAD_MAX_BACKOFF)
+        self.assertTrue(all(args == (1,) for _, args in self.timers))
+        # connection errors are retried without limit
+        self.assertTrue(uploader.is_pending(1))
+
+        # after a successful upload, the backoff is reset
+        self.client.request.side_effect = lambda endpoint, **kwargs: {"id": 1}
+        uploader._upload(1)
+        self.assertEqual(uploader._retries, {})
+        self.assertFalse(uploader.is_pending(1))
+
+    def test_worker_retries_on_exception(self):
+        uploader = self.create_uploader()
+        uploader.submit(1, 2, RESULT, DATA)
+        uploader._queue.put(1)
+        # stop the worker by raising an exception that it does not catch
+        upload_errors = [RuntimeError("unexpected"), SystemExit()]
+        with patch.object(uploader, "_upload", side_effect=upload_errors):
+            with self.assertRaises(SystemExit):
+                uploader._upload_worker()
+        self.assertEqual(self.timers, [(1, (1,))])
+
+    def test_rejected_result_discarded_after_max_attempts(self):
+        self.client.request.side_effect = lambda endpoint, **kwargs: {
+            "msg": "Run is already finished"
+        }
+        uploader = self.create_uploader(max_attempts=3)
+        uploader.submit(1, 2, RESULT, DATA)
+
+        uploader._upload(1)
+        uploader._upload(1)
+        self.assertEqual(len(self.timers), 2)
+        self.assertTrue(uploader.is_pending(1))
+
+        uploader._upload(1)
+        self.assertEqual(len(self.timers), 2)
+        self.assertFalse(uploader.is_pending(1))
+        self.assertEqual(uploader._rejections, {})
+        self.assertEqual(uploader.get_metrics()["result_upload_failures"], 1)
+
+    def test_replay_spool_after_restart(self):
+        # the node crashed after it spooled the results
+        uploader = self.create_uploader()
+        uploader.submit(1, 2, RESULT, DATA)
+        self.client.get_public_key.return_value = None
+        uploader.submit(2, 2, RESULT, DATA)
+        (self.spool_dir / "3.tmp").write_text("{", encoding="utf-8")
+        (self.spool_dir / "not-a-run.json").write_text("{}", encoding="utf-8")
+
+        self.client.get_public_key.return_value = "public key"
+        self.client.request.side_effect = lambda endpoint, **kwargs: {"id": 1}
+        restarted = self.create_uploader()
+        self.assertEqual(restarted.get_metrics()["result_upload_pending"], 3)
+        restarted.start()
+
+        deadline = time.monotonic() + 10
+        while restarted.is_pending(1) or restarted.is_pending(2):
+            self.assertLess(time.monotonic(), deadline, "Spool was not uploaded")
+            time.sleep(0.01)
+        patched = {
+            call.args[0]: call.kwargs["json"]
+            for call in self.client.request.call_args_list
+        }
+        self.assertEqual(
+            patched,
+            {
+                "run/1": {**DATA, "result": ENCRYPTED_RESULT},
+                "run/2": {**DATA, "result": ENCRYPTED_RESULT},
+            },
+        )
+        self.assertEqual(restarted.get_metrics()["result_upload_count"], 2)
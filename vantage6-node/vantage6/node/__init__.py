@@ -36,9 +36,8 @@ import psutil
 import pynvml
 
 from pathlib import Path
-from threading import Thread
+from threading import Lock, Thread
 from socketio import Client as SocketIO
-from gevent.pywsgi import WSGIServer
 from enum import Enum
 
 from vantage6.common import logger_name
@@ -55,12 +54,23 @@ from vantage6.common.log import get_file_logger
 from vantage6.cli.context.node import NodeContext
 from vantage6.node.context import DockerNodeContext
 from vantage6.node.globals import (
+    DEFAULT_LOCAL_SUBTASK_RETENTION_HOURS,
+    DEFAULT_PROXY_SERVER_WORKERS,
+    DEFAULT_RESULT_UPLOAD_MAX_ATTEMPTS,
+    DEFAULT_RESULT_UPLOAD_WORKERS,
+    LOCAL_SUBTASK_FOLDER,
     NODE_PROXY_SERVER_HOSTNAME,
+    RESULT_SPOOL_FOLDER,
     SLEEP_BTWN_NODE_LOGIN_TRIES,
     TIME_LIMIT_RETRY_CONNECT_NODE,
     TIME_LIMIT_INITIAL_CONNECTION_WEBSOCKET,
 )
 from vantage6.common.client.node_client import NodeClient
+from vantage6.common.http_session import (
+    configure_sessions,
+    get_session,
+    get_session_stats,
+)
 from vantage6.node import proxy_server
 from vantage6.node.util import get_parent_id
 from vantage6.node.docker.docker_manager import DockerManager
@@ -68,6 +78,9 @@ from vantage6.node.docker.vpn_manager import VPNManager
 from vantage6.node.socket import NodeTaskNamespace
 from vantage6.node.docker.ssh_tunnel import SSHTunnel
 from vantage6.node.docker.squid import Squid
+from vantage6.node.result_uploader import ResultUploader
+from vantage6.node.local_subtasks import LocalSubtaskStore
+from vantage6.node.proxy_wsgi_server import ProxyWSGIServer
 
 # make sure the version is available
 from vantage6.node._version import __version__  # noqa: F401
@@ -116,6 +129,26 @@ class Node:
         self.debug: dict = self.config.get("debug", {})
         self.queue = queue.Queue()
         self._using_encryption = None
+        # algorithm runs that have been received from the server, so that syncing
+        # with the server only fetches runs that are new. All open runs up to
+        # `_last_run_id` have been received by syncing; runs with a higher ID that
+        # were delivered by websocket events are kept in `_received_run_ids`
+        self._last_run_id = 0
+        self._received_run_ids: set[int] = set()
+        self._received_runs_lock = Lock()
+        # sequence number of the last websocket event received from the server, so
+        # that events that are missed while disconnected can be requested
+        self.last_event_sequence = 0
+
+        # configure the connection pools used for requests to the server, both by
+        # the node itself and by the proxy server
+        pool_config = self.config.get("http_pool", {})
+        configure_sessions(
+            pool_connections=pool_config.get("pool_connections"),
+            pool_maxsize=pool_config.get("pool_maxsize"),
+            max_retries=pool_config.get("max_retries"),
+            timeout=pool_config.get("timeout_seconds"),
+        )
 
         # initialize Node connection to the server
         self.client = NodeClient(
@@ -134,6 +167,21 @@ class Node:
         # Setup encryption
         self.setup_encryption()
 
+        # subtasks that algorithms create for their own organization can be handed
+        # to this node locally, instead of via the server
+        local_subtask_config = self.config.get("local_subtasks", {})
+        self.local_subtasks = None
+        if local_subtask_config.get("enabled", False):
+            self.log.info("Subtasks for the own organization are handed over locally")
+            retention_hours = local_subtask_config.get(
+                "retention_hours", DEFAULT_LOCAL_SUBTASK_RETENTION_HOURS
+            )
+            self.local_subtasks = LocalSubtaskStore(
+                Path(self.ctx.data_dir) / LOCAL_SUBTASK_FOLDER,
+                retention=retention_hours * 3600,
+            )
+            self.local_subtasks.start()
+
         # Thread for proxy server for algorithm containers, so they can
         # communicate with the central server.
         self.log.info("Setting up proxy server")
@@ -173,6 +221,19 @@ class Node:
             proxy=self.squid,
         )
 
+        # setup the uploader of results. Results that were not uploaded before the
+        # node stopped are uploaded now.
+        upload_config = self.config.get("result_upload", {})
+        self.result_uploader = ResultUploader(
+            client=self.client,
+            spool_dir=Path(self.ctx.data_dir) / RESULT_SPOOL_FOLDER,
+            workers=upload_config.get("workers", DEFAULT_RESULT_UPLOAD_WORKERS),
+            max_attempts=upload_config.get(
+                "max_attempts", DEFAULT_RESULT_UPLOAD_MAX_ATTEMPTS
+            ),
+        )
+        self.result_uploader.start()
+
         # Create a long-lasting websocket connection.
         self.log.debug("Creating websocket connection with the server")
         self.connect_to_socket()
@@ -221,11 +282,34 @@ class Node:
         while True:
             try:
                 metadata = self.__gather_system_metadata()
+                metadata.update(self.result_uploader.get_metrics())
+                metadata.update(self.__gather_http_pool_metrics())
                 self.socketIO.emit("node_metrics_update", metadata, namespace="/tasks")
             except Exception:
                 self.log.exception("Metadata thread had an exception")
             time.sleep(report_interval)
 
+    def __gather_http_pool_metrics(self) -> dict:
+        """
+        Gather statistics of the connection pools used for requests to the
+        server, summed over the node client and the proxy server.
+
+        Returns
+        -------
+        dict
+            Number of requests sent, connections opened and connections that are
+            currently idle.
+        """
+        session_stats = [self.client.session.stats(), *get_session_stats().values()]
+        return {
+            key: sum(stats[key] for stats in session_stats)
+            for key in (
+                "http_requests",
+                "http_connections_created",
+                "http_idle_connections",
+            )
+        }
+
     def __gather_system_metadata(self) -> dict:
         """
         Gather system metadata such as CPU, memory, OS, and GPU information.
@@ -326,6 +410,7 @@ class Node:
             self.log.debug("Debug mode enabled for proxy server")
             proxy_server.app.debug = True
         proxy_server.app.config["SERVER_IO"] = self.client
+        proxy_server.app.config["LOCAL_SUBTASKS"] = self.local_subtasks
         proxy_server.server_url = self.client.base_path
 
         # set up proxy server logging
@@ -334,14 +419,24 @@ class Node:
             "proxy_server", self.ctx.proxy_log_file, log_level_file=log_level
         )
 
+        # every request that the proxy server handles concurrently may need a
+        # connection to the server
+        proxy_workers = self.config.get("proxy_server", {}).get(
+            "workers", DEFAULT_PROXY_SERVER_WORKERS
+        )
+        get_session("proxy").configure(pool_maxsize=proxy_workers)
+
         # this is where we try to find a port for the proxyserver
         for try_number in range(5):
             self.log.info("Starting proxyserver at '%s:%s'", proxy_host, proxy_port)
-            http_server = WSGIServer(
-                ("0.0.0.0", proxy_port), proxy_server.app, log=self.proxy_log
-            )
-
             try:
+                http_server = ProxyWSGIServer(
+                    "0.0.0.0",
+                    proxy_port,
+                    proxy_server.app,
+                    workers=proxy_workers,
+                    access_log=self.proxy_log,
+                )
                 http_server.serve_forever()
 
             except OSError as e:
@@ -361,17 +456,38 @@ class Node:
                 self.log.error(e)
 
     def sync_task_queue_with_server(self) -> None:
-        """Get all unprocessed tasks from the server for this node."""
+        """
+        Get the unprocessed tasks from the server for this node that it has not
+        received before.
+
+        The input of the runs is decrypted when the run is started.
+        """
         assert self.client.cryptor, "Encrpytion has not been setup"
 
         # request open tasks from the server
-        task_results = self.client.run.list(state="open", include_task=True)
+        task_results = self.client.run.list(
+            state="open",
+            include_task=True,
+            id_from=self._last_run_id + 1,
+            decrypt=False,
+        )
         self.log.debug("task_results: %s", task_results)
 
         # add the tasks to the queue
         self.__add_tasks_to_queue(task_results)
         self.log.info("Received %s tasks", self.queue._qsize())
 
+        # all open runs up to the highest ID that was returned have now been
+        # received, so they no longer have to be remembered one by one
+        if task_results:
+            with self._received_runs_lock:
+                self._last_run_id = max(
+                    self._last_run_id, *(run["id"] for run in task_results)
+                )
+                self._received_run_ids = {
+                    id_ for id_ in self._received_run_ids if id_ > self._last_run_id
+                }
+
     def get_task_and_add_to_queue(self, task_id: int) -> None:
         """
         Fetches (open) task with task_id from the server. The `task_id` is
@@ -384,15 +500,55 @@ class Node:
         """
         # fetch open algorithm runs for this node
         task_runs = self.client.run.list(
-            include_task=True, state="open", task_id=task_id
+            include_task=True, state="open", task_id=task_id, decrypt=False
         )
 
         # add the tasks to the queue
         self.__add_tasks_to_queue(task_runs)
 
+    def add_runs_to_queue(self, runs: list[dict]) -> None:
+        """
+        Add runs that were sent by the server to the queue. Their input is
+        decrypted when the run is started.
+
+        Parameters
+        ----------
+        runs : list[dict]
+            Runs, including their task, that this node should execute
+        """
+        self.__add_tasks_to_queue(runs)
+
+    def filter_unknown_runs(self, runs: list[dict]) -> list[dict]:
+        """
+        Get the runs that have not been received from the server before, and
+        register them as received.
+
+        Parameters
+        ----------
+        runs : list[dict]
+            Runs that were sent by the server
+
+        Returns
+        -------
+        list[dict]
+            The runs that are new to this node
+        """
+        unknown_runs = []
+        with self._received_runs_lock:
+            for run in runs:
+                if (
+                    run["id"] <= self._last_run_id
+                    or run["id"] in self._received_run_ids
+                ):
+                    continue
+                self._received_run_ids.add(run["id"])
+                unknown_runs.append(run)
+        return unknown_runs
+
     def __add_tasks_to_queue(self, task_results: list[dict]) -> None:
         """
-        Add a task to the queue.
+        Add a task to the queue. Runs that have been received before, e.g. by
+        both syncing and a websocket event, are only added once.
 
         Parameters
         ----------
@@ -400,9 +556,20 @@ class Node:
             A list of dictionaries with information required to run the
             algorithm
         """
-        for task_result in task_results:
+        for task_result in self.filter_unknown_runs(task_results):
             try:
-                if not self.__docker.is_running(task_result["id"]):
+                if self.result_uploader.is_pending(task_result["id"]):
+                    self.log.info(
+                        f"Not starting task {task_result['task']['id']} - "
+                        f"{task_result['task']['name']} as its result is being "
+                        "uploaded"
+                    )
+                elif not self.__docker.is_running(task_result["id"]):
+                    # start pulling the image already, so that it is available
+                    # by the time the task is taken from the queue
+                    self.__docker.prepull_image(
+                        task_result["task"]["image"], task_result["task"]
+                    )
                     self.queue.put(task_result)
                 else:
                     self.log.info(
@@ -448,6 +615,45 @@ class Node:
             )
             return  # prevent starting the run if there is no token
 
+        # input of subtasks that were created on this node for its own
+        # organization is taken from the node itself
+        if self.local_subtasks and self.local_subtasks.is_input_reference(
+            task_incl_run.get("input")
+        ):
+            input_ = self.local_subtasks.start_run(
+                task_incl_run["id"], task_incl_run["input"]
+            )
+            if input_ is None:
+                self.log.error(
+                    "Input of run %s is not available at the node", task_incl_run["id"]
+                )
+                self.client.run.patch(
+                    id_=task_incl_run["id"],
+                    data={
+                        "status": TaskStatus.FAILED,
+                        "log": "Input of the algorithm run is no longer available",
+                    },
+                )
+                return
+            task_incl_run["input"] = input_
+        else:
+            # the input is decrypted only now, so that syncing many runs with the
+            # server does not delay starting the first of them
+            try:
+                self.client.run.decrypt_input(task_incl_run)
+            except Exception:
+                self.log.exception(
+                    "Could not decrypt input of run %s", task_incl_run["id"]
+                )
+                self.client.run.patch(
+                    id_=task_incl_run["id"],
+                    data={
+                        "status": TaskStatus.FAILED,
+                        "log": "Could not decrypt the input of the algorithm run",
+                    },
+                )
+                return
+
         # create a temporary volume for each job_id
         vol_name = self.ctx.docker_temporary_volume_name(task["job_id"])
         self.__docker.create_volume(vol_name)
@@ -549,8 +755,6 @@ class Node:
         Routine that is in a seperate thread sending results
         to the server when they come available.
         """
-        # TODO change to a single request, might need to reconsider
-        #     the flow
         self.log.debug("Waiting for results to send to the server")
 
         while True:
@@ -574,44 +778,49 @@ class Node:
 
                 self.log.info(f"Sending result (run={results.run_id}) to the server!")
 
-                # FIXME: why are we retrieving the result *again*? Shouldn't we
-                # just store the task_id when retrieving the task the first
-                # time?
-                response = self.client.request(f"run/{results.run_id}")
-                task_id = response.get("task").get("id")
-
-                if not task_id:
-                    self.log.error(
-                        f"task_id of run (id={results.run_id}) "
-                        f"could not be retrieved"
-                    )
-                    return
-
-                response = self.client.request(f"task/{task_id}")
-
-                init_org = response.get("init_org")
-                if not init_org:
-                    self.log.error(
-                        f"Initiator organization from task (id={task_id}) "
-                        "could not be retrieved!"
-                    )
+                # the task context is kept from when the run was started, so that
+                # only the run itself has to be updated at the server
+                init_org_id = results.init_org_id
+                if not init_org_id:
+                    task = self.client.request(f"task/{results.task_id}")
+                    init_org_id = (task.get("init_org") or {}).get("id")
+                    if not init_org_id:
+                        self.log.error(
+                            f"Initiator organization from task (id={results.task_id})"
+                            " could not be retrieved!"
+                        )
 
                 if self.ctx.config.get("share_algorithm_logs", True):
                     logs = results.logs
                 else:
                     logs = "Node does not allow sharing algorithm logs"
 
-                self.client.run.patch(
-                    id_=results.run_id,
+                # results of local subtasks are kept at the node, and the server
+                # only receives a reference to them
+                result = results.data
+                encrypt = True
+                if self.local_subtasks and self.local_subtasks.is_local_run(
+                    results.run_id
+                ):
+                    result = self.local_subtasks.store_result(
+                        results.run_id, results.data
+                    )
+                    encrypt = False
+
+                # the result is spooled and uploaded in the background, so that
+                # collecting finished algorithms does not wait for the server
+                self.result_uploader.submit(
+                    run_id=results.run_id,
+                    init_org_id=init_org_id,
+                    result=result,
+                    encrypt=encrypt,
                     data={
-                        "result": results.data,
                         "log": logs,
                         "status": results.status,
                         "finished_at": datetime.datetime.now(
                             datetime.timezone.utc
                         ).isoformat(),
                     },
-                    init_org_id=init_org.get("id"),
                 )
             except Exception:
                 self.log.exception("Speaking thread had an exception")
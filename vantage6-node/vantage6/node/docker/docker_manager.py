@@ -12,8 +12,8 @@ from socket import SocketIO
 import time
 import logging
 import docker
-import re
 import shutil
+import threading
 from docker.utils import parse_repository_tag
 
 from typing import NamedTuple
@@ -23,8 +23,6 @@ from vantage6.common import logger_name
 from vantage6.common import get_database_config
 from vantage6.common.docker.addons import (
     get_container,
-    get_digest,
-    get_image_name_wo_tag,
     running_in_docker,
 )
 from vantage6.common.globals import (
@@ -42,13 +40,23 @@ from vantage6.node.docker.docker_base import DockerBaseManager
 from vantage6.node.docker.vpn_manager import VPNManager
 from vantage6.node.docker.task_manager import DockerTaskManager
 from vantage6.node.docker.squid import Squid
+from vantage6.node.docker.image_cache import ImageCache, ImageMetadataCache
+from vantage6.node.docker.helper_pool import VPNHelperPool
+from vantage6.node.docker.policy_matcher import PolicyMatcher
 from vantage6.common.client.node_client import NodeClient
 from vantage6.node.docker.exceptions import (
     UnknownAlgorithmStartFail,
     PermanentAlgorithmStartFail,
     AlgorithmContainerNotFound,
 )
-from vantage6.node.globals import DEFAULT_REQUIRE_ALGO_IMAGE_PULL
+from vantage6.node.globals import (
+    ALPINE_IMAGE,
+    DEFAULT_IMAGE_DIGEST_TTL,
+    DEFAULT_IMAGE_PULL_TTL,
+    DEFAULT_REQUIRE_ALGO_IMAGE_PULL,
+    DEFAULT_VPN_HELPER_POOL_SIZE,
+    IMAGE_METADATA_CACHE_FILE,
+)
 
 log = logging.getLogger(logger_name(__name__))
 
@@ -63,12 +71,19 @@ class Result(NamedTuple):
     ----------
     run_id: int
         ID of the current algorithm run
+    task_id: int
+        ID of the task the algorithm run belongs to
     logs: str
         Logs attached to current algorithm run
     data: str
         Output data of the algorithm
     status_code: int
         Status code of the algorithm run
+    parent_id: int | None
+        ID of the parent task, if any
+    init_org_id: int | None
+        ID of the organization that created the task. Results are encrypted for
+        this organization
     """
 
     run_id: int
@@ -77,6 +92,7 @@ class Result(NamedTuple):
     data: str
     status: str
     parent_id: int | None
+    init_org_id: int | None
 
 
 class ToBeKilled(NamedTuple):
@@ -156,6 +172,8 @@ class DockerManager(DockerBaseManager):
 
         # before a task is executed it gets exposed to these policies
         self._policies = self._setup_policies(config)
+        # algorithm store URLs with the time at which they were retrieved
+        self._algorithm_store_urls: dict[int, tuple[str, float]] = {}
 
         # node name is used to identify algorithm containers belonging
         # to this node. This is required as multiple nodes may run at
@@ -172,6 +190,40 @@ class DockerManager(DockerBaseManager):
         docker_registries = ctx.config.get("docker_registries", [])
         self.login_to_registries(docker_registries)
 
+        # keep track of pulled algorithm images, so that up-to-date images are not
+        # pulled again for every run, and of the metadata of these images
+        image_cache_config = config.get("image_cache", {})
+        self._metadata_ttl = image_cache_config.get(
+            "digest_ttl_seconds", DEFAULT_IMAGE_DIGEST_TTL
+        )
+        self.image_metadata = ImageMetadataCache(
+            docker_client=self.docker,
+            cache_file=Path(ctx.data_dir) / IMAGE_METADATA_CACHE_FILE,
+            digest_ttl=self._metadata_ttl,
+        )
+        self.image_cache = ImageCache(
+            docker_client=self.docker,
+            pull_ttl=image_cache_config.get("pull_ttl_seconds", DEFAULT_IMAGE_PULL_TTL),
+            prepull=image_cache_config.get("prepull", True),
+            metadata=self.image_metadata,
+        )
+
+        # keep helper containers for algorithms that use the VPN warm, so that they
+        # don't have to be started for every run
+        self.helper_pool = None
+        helper_pool_size = config.get(
+            "vpn_helper_pool_size", DEFAULT_VPN_HELPER_POOL_SIZE
+        )
+        if self.vpn_manager and self.vpn_manager.has_vpn and helper_pool_size > 0:
+            self.helper_pool = VPNHelperPool(
+                docker_client=self.docker,
+                vpn_manager=self.vpn_manager,
+                isolated_network_mgr=self.isolated_network_mgr,
+                node_name=ctx.name,
+                alpine_image=self.alpine_image or ALPINE_IMAGE,
+                size=helper_pool_size,
+            )
+
         # set database uri and whether or not it is a file
         self._set_database(ctx.databases)
 
@@ -349,6 +401,8 @@ class DockerManager(DockerBaseManager):
         dict
             Dictionary with the policies
         """
+        # Note that the algorithm and store policies are also compiled into a
+        # matcher here, so that they don't have to be parsed again for every task
         policies = config.get("policies", {})
         if not policies or (
             not policies.get(NodePolicy.ALLOWED_ALGORITHMS)
@@ -360,6 +414,7 @@ class DockerManager(DockerBaseManager):
             self.log.warning(
                 "This means that all algorithms are allowed to run on this node."
             )
+        self._policy_matcher = PolicyMatcher(policies)
         return policies
 
     def create_volume(self, volume_name: str) -> None:
@@ -437,72 +492,7 @@ class DockerManager(DockerBaseManager):
 
         algorithm_whitelisted = False
         if allowed_algorithms:
-            if isinstance(allowed_algorithms, str):
-                allowed_algorithms = [allowed_algorithms]
-            try:
-                evaluated_img_wo_tag = get_image_name_wo_tag(evaluated_img)
-            except Exception as exc:
-                self.log.warning(
-                    "Could not parse image with name %s: %s",
-                    evaluated_img,
-                    exc,
-                )
-                evaluated_img_wo_tag = None
-            for allowed_algo in allowed_algorithms:
-                if not self._is_regex_pattern(allowed_algo):
-                    try:
-                        allowed_wo_tag = get_image_name_wo_tag(allowed_algo)
-                    except Exception as exc:
-                        self.log.warning(
-                            "Could not parse allowed_algorithm policy with name %s: %s",
-                            allowed_algo,
-                            exc,
-                        )
-                        self.log.warning("Skipping policy as it cannot be parsed")
-                        continue  # skip policy as it cannot be parsed
-                    if allowed_algo == evaluated_img:
-                        # OK if allowed algorithm and provided algorithm match exactly
-                        algorithm_whitelisted = True
-                        break
-                    elif allowed_algo == evaluated_img_wo_tag:
-                        # OK if allowed algorithm is an image name without a tag, and
-                        # the provided image is the same but includes extra tag
-                        algorithm_whitelisted = True
-                        break
-                    elif allowed_wo_tag == evaluated_img_wo_tag:
-                        # The allowed image and the evaluated image are indeed the same
-                        # image but the allowed image only allows certain tags or sha's.
-                        # Gather the digests of the images and compare them - if they
-                        # are the same, the image is allowed.
-                        # Note that by comparing the digests, we also take into account
-                        # the situation where e.g. the allowed image has a tag, but the
-                        # evaluated image has a sha256.
-                        digest_evaluated_image = get_digest(
-                            evaluated_img, client=self.docker
-                        )
-                        if not digest_evaluated_image:
-                            self.log.warning(
-                                "Could not obtain digest for image %s",
-                                evaluated_img,
-                            )
-                        digest_policy_image = get_digest(
-                            allowed_algo, client=self.docker
-                        )
-                        if not digest_policy_image:
-                            self.log.warning(
-                                "Could not obtain digest for image %s", allowed_algo
-                            )
-                        if (
-                            digest_evaluated_image
-                            and digest_policy_image
-                            and (digest_evaluated_image == digest_policy_image)
-                        ):
-                            algorithm_whitelisted = True
-                            break
-                else:
-                    expr_ = re.compile(allowed_algo)
-                    if expr_.match(evaluated_img):
-                        algorithm_whitelisted = True
+            algorithm_whitelisted = self._is_algorithm_whitelisted(evaluated_img)
 
         store_whitelisted = False
         if allowed_stores:
@@ -512,20 +502,9 @@ class DockerManager(DockerBaseManager):
             except Exception:
                 store_id = None
             if store_id:
-                store = self.client.algorithm_store.get(store_id)
-                store_from_task = store["url"]
-                # check if the store matches any of the regex cases
-                if isinstance(allowed_stores, str):
-                    allowed_stores = [allowed_stores]
-                for store in allowed_stores:
-                    if not self._is_regex_pattern(store):
-                        # check if string matches exactly
-                        if store == store_from_task:
-                            store_whitelisted = True
-                    else:
-                        expr_ = re.compile(store)
-                        if expr_.match(store_from_task):
-                            store_whitelisted = True
+                store_whitelisted = self._policy_matcher.match_store(
+                    self._get_algorithm_store_url(store_id)
+                )
 
         allowed_from_whitelist = not allowed_algorithms or algorithm_whitelisted
         allowed_from_store = not allowed_stores or store_whitelisted
@@ -545,50 +524,96 @@ class DockerManager(DockerBaseManager):
 
         return allowed
 
-    @staticmethod
-    def _is_regex_pattern(pattern: str) -> bool:
+    def _get_algorithm_store_url(self, store_id: int) -> str:
         """
-        Check if a string just a string or if it is a regex pattern. Note that there is
-        no failsafe way to do this so we make a best effort.
+        Get the URL of an algorithm store. URLs are cached, as they are requested
+        from the server for every task that uses an algorithm from a store. Like
+        image digests, they are refreshed after the metadata TTL, so that a changed
+        store URL is used by the policy checks.
+
+        Parameters
+        ----------
+        store_id: int
+            ID of the algorithm store at the server
 
-        Note, for instance, that if a user provides the allowed algorithm "some.name",
-        we will interpret this as a regular string. This prevents that "someXname" is
-        allowed as well. The user is thus not able to define a regex pattern with only
-        a dot as special character. However we expect that this use case is extremely
-        rare - not doing so is likely to lead to regex's that lead to unintended
-        algorithms passing the filter criteria.
+        Returns
+        -------
+        str
+            URL of the algorithm store
+        """
+        cached = self._algorithm_store_urls.get(store_id)
+        if cached and time.monotonic() - cached[1] < self._metadata_ttl:
+            return cached[0]
+        url = self.client.algorithm_store.get(store_id)["url"]
+        self._algorithm_store_urls[store_id] = (url, time.monotonic())
+        return url
+
+    def _is_algorithm_whitelisted(self, evaluated_img: str) -> bool:
+        """
+        Check if an image is allowed by the `allowed_algorithms` policy
 
         Parameters
         ----------
-        pattern: str
-            String to be checked
+        evaluated_img: str
+            URI of the docker image of which we are checking if it is allowed
 
         Returns
         -------
         bool
-            Returns False if the pattern is a normal string, True if it is a regex.
-        """
-        # Inspired by
-        # https://github.com/corydolphin/flask-cors/blob/main/flask_cors/core.py#L254.
-        common_regex_chars = [
-            "*",
-            "\\",
-            "?",
-            "$",
-            "^",
-            "[",
-            "]",
-            "(",
-            ")",
-            "{",
-            "}",
-            "|",
-            "+",
-            "\.",
-        ]
-        # Use common characters used in regular expressions as a proxy
-        # for if this string is in fact a regex.
-        return any((c in pattern for c in common_regex_chars))
+            Whether the image is allowed by the `allowed_algorithms` policy
+        """
+        if self._policy_matcher.match_algorithm_by_name(evaluated_img):
+            return True
+
+        # The allowed image and the evaluated image may be the same image, where the
+        # allowed image only allows certain tags or sha's. Gather the digests of the
+        # images and compare them - if they are the same, the image is allowed.
+        # Note that by comparing the digests, we also take into account the
+        # situation where e.g. the allowed image has a tag, but the evaluated image
+        # has a sha256.
+        candidates = self._policy_matcher.get_digest_candidates(evaluated_img)
+        if not candidates:
+            return False
+        digest_evaluated_image = self.image_metadata.get_digest(evaluated_img)
+        if not digest_evaluated_image:
+            self.log.warning("Could not obtain digest for image %s", evaluated_img)
+            return False
+        for allowed_algo in candidates:
+            digest_policy_image = self.image_metadata.get_digest(allowed_algo)
+            if not digest_policy_image:
+                self.log.warning("Could not obtain digest for image %s", allowed_algo)
+            elif digest_evaluated_image == digest_policy_image:
+                return True
+        return False
+
+    def prepull_image(self, image: str, task_info: dict) -> None:
+        """
+        Start pulling the image of a new task in the background, so that it is
+        available by the time the task is started.
+
+        The node policies are checked first, in the background as well, so that
+        images that are not allowed to run on this node are never pulled.
+
+        Parameters
+        ----------
+        image: str
+            Docker image name
+        task_info: dict
+            Dictionary with task information
+        """
+        if not self.image_cache.prepull_enabled or self.image_cache.is_up_to_date(
+            image
+        ):
+            return
+
+        def _check_policies_and_prepull() -> None:
+            try:
+                if self.is_docker_image_allowed(image, task_info):
+                    self.image_cache.prepull(image)
+            except Exception:
+                self.log.debug("Could not pre-pull image %s", image, exc_info=True)
+
+        threading.Thread(target=_check_policies_and_prepull, daemon=True).start()
 
     def is_running(self, run_id: int) -> bool:
         """
@@ -648,6 +673,8 @@ class DockerManager(DockerBaseManager):
         # killed, but we don't register them as killed so they will be run
         # again when the node is restarted
         self.cleanup_tasks()
+        if self.helper_pool:
+            self.helper_pool.cleanup()
         for service in self.linked_services:
             self.isolated_network_mgr.disconnect(service)
 
@@ -732,6 +759,8 @@ class DockerManager(DockerBaseManager):
             collaboration_id=self.client.collaboration_id,
             share_algorithm_logs=self.share_algorithm_logs,
             write_run_context_file=self.write_run_context_file,
+            image_cache=self.image_cache,
+            helper_pool=self.helper_pool,
         )
 
         # attempt to kick of the task. If it fails do to unknown reasons we try
@@ -836,6 +865,7 @@ class DockerManager(DockerBaseManager):
             data=results,
             status=finished_task.status,
             parent_id=finished_task.parent_id,
+            init_org_id=finished_task.init_org_id,
         )
 
     def login_to_registries(self, registries: list = []) -> None:
@@ -0,0 +1,203 @@
+"""
+Pool of VPN helper containers
+
+When VPN is enabled, every algorithm container runs in the network namespace of a
+helper container. The helper container is started first, after which the traffic
+from the helper container is routed via the VPN client container. Only then can the
+algorithm container be started. Starting the helper container and configuring its
+network roughly doubles the start time of algorithm containers, which adds up for
+algorithms that start many short-lived containers.
+
+The helper pool keeps a number of helper containers warm, with their network already
+configured. Task managers claim a helper container from the pool when they start an
+algorithm, and release it when the algorithm is finished. Released helpers are
+returned to the pool after the traffic forwarding rules to them have been removed.
+"""
+
+import logging
+import threading
+import uuid
+
+from docker import DockerClient
+from docker.models.containers import Container
+
+from vantage6.common import logger_name
+from vantage6.common.globals import APPNAME
+from vantage6.common.docker.addons import remove_container
+from vantage6.common.docker.network_manager import NetworkManager
+from vantage6.node.docker.vpn_manager import VPNManager
+
+
+class VPNHelperPool:
+    """
+    Pool of warm helper containers for algorithms that use the VPN.
+    """
+
+    log = logging.getLogger(logger_name(__name__))
+
+    def __init__(
+        self,
+        docker_client: DockerClient,
+        vpn_manager: VPNManager,
+        isolated_network_mgr: NetworkManager,
+        node_name: str,
+        alpine_image: str,
+        size: int,
+    ) -> None:
+        """
+        Initialize the pool. The pool is filled in the background.
+
+        Parameters
+        ----------
+        docker_client: DockerClient
+            Docker client used to create helper containers
+        vpn_manager: VPNManager
+            VPN manager used to route helper container traffic via the VPN
+        isolated_network_mgr: NetworkManager
+            Manager of the isolated network in which helper containers run
+        node_name: str
+            Name of the node, used to label the helper containers
+        alpine_image: str
+            Image used for the helper containers
+        size: int
+            Number of warm helper containers to keep available
+        """
+        self.docker = docker_client
+        self.vpn_manager = vpn_manager
+        self.isolated_network_mgr = isolated_network_mgr
+        self.node_name = node_name
+        self.alpine_image = alpine_image
+        self.size = size
+
+        self.labels = {
+            f"{APPNAME}-type": "algorithm-helper",
+            "node": node_name,
+            "pooled": "true",
+        }
+
+        self._available: list[Container] = []
+        self._lock = threading.Lock()
+        self._filling = False
+
+        self._remove_stale_helpers()
+        self.fill()
+
+    def claim(self) -> Container:
+        """
+        Claim a helper container with its traffic already routed via the VPN.
+
+        If no warm helper is available, a new one is created.
+
+        Returns
+        -------
+        Container
+            Running helper container
+        """
+        helper = None
+        with self._lock:
+            if self._available:
+                helper = self._available.pop()
+        if helper:
+            self.log.debug("Claimed helper container %s from pool", helper.name)
+        else:
+            self.log.debug("No warm helper container available, creating one")
+            helper = self._create_helper()
+        self.fill()
+        return helper
+
+    def release(self, helper: Container) -> None:
+        """
+        Return a helper container to the pool once its algorithm has finished.
+
+        The algorithm container that used the network namespace of the helper must
+        have been removed already. If the helper can not be reused, or if the pool
+        is full, the helper is removed.
+
+        Parameters
+        ----------
+        helper: Container
+            Helper container that was claimed from this pool
+        """
+        try:
+            helper.reload()
+            reusable = helper.status == "running" and self.vpn_manager.has_vpn
+            if reusable:
+                self.vpn_manager.remove_forwarding_to_algorithm(helper)
+        except Exception:
+            self.log.debug("Cannot reuse helper container %s", helper.name)
+            reusable = False
+
+        with self._lock:
+            if reusable and len(self._available) < self.size:
+                self._available.append(helper)
+                self.log.debug("Returned helper container %s to pool", helper.name)
+                return
+        remove_container(helper, kill=True)
+
+    def fill(self) -> None:
+        """Create helper containers in the background until the pool is full"""
+        with self._lock:
+            if self._filling or len(self._available) >= self.size:
+                return
+            self._filling = True
+        threading.Thread(target=self._fill_worker, daemon=True).start()
+
+    def cleanup(self) -> None:
+        """Remove all warm helper containers"""
+        with self._lock:
+            helpers, self._available = self._available, []
+        for helper in helpers:
+            remove_container(helper, kill=True)
+
+    def _fill_worker(self) -> None:
+        """Create helper containers until the pool is full"""
+        try:
+            while self.vpn_manager.has_vpn:
+                with self._lock:
+                    if len(self._available) >= self.size:
+                        break
+                helper = self._create_helper()
+                with self._lock:
+                    self._available.append(helper)
+        except Exception:
+            self.log.exception("Could not create helper container for the pool")
+        finally:
+            with self._lock:
+                self._filling = False
+
+    def _create_helper(self) -> Container:
+        """
+        Create a helper container and route its traffic via the VPN client
+
+        Returns
+        -------
+        Container
+            Running helper container
+        """
+        helper = self.docker.containers.run(
+            command="sleep infinity",
+            image=self.alpine_image,
+            labels=self.labels,
+            network=self.isolated_network_mgr.network_name,
+            name=f"{APPNAME}-{self.node_name}-helper-{uuid.uuid4().hex[:12]}",
+            detach=True,
+        )
+        try:
+            self.vpn_manager.forward_traffic_from_algorithm(helper)
+        except Exception:
+            remove_container(helper, kill=True)
+            raise
+        return helper
+
+    def _remove_stale_helpers(self) -> None:
+        """
+        Remove pooled helper containers that were left behind, e.g. because the
+        node crashed
+        """
+        stale_helpers = self.docker.containers.list(
+            all=True,
+            filters={"label": [f"{key}={value}" for key, value in self.labels.items()]},
+        )
+        for helper in stale_helpers:
+            self.log.debug("Removing stale helper container %s", helper.name)
+            remove_container(helper, kill=True)
@@ -0,0 +1,499 @@
+"""
+Image cache
+
+Keeps track of the algorithm images that the node has pulled. Pulling an image
+requires a round trip to the registry, also when the local image is already up to
+date. For iterative algorithms that create many subtasks with the same image, this
+adds latency to every run and makes every run depend on the availability of the
+registry.
+
+The image cache prevents this by skipping the pull when
+
+- the image is pinned to a digest (e.g. by the algorithm store) and an image with
+  that digest is available locally, or
+- the image was successfully pulled less than ``pull_ttl`` seconds ago.
+
+It can also pull images in the background (pre-pull), so that the image is already
+available when the node starts the run.
+
+Next to that, the image metadata cache stores the metadata of algorithm images that
+the node needs for every run: the registry digest of an image reference (used to check
+the node policies) and the labels and exposed ports of the image (used to set up VPN
+traffic). This metadata is persisted to disk, so that it survives node restarts.
+"""
+
+import json
+import logging
+import threading
+import time
+
+from pathlib import Path
+
+import docker
+from docker import DockerClient
+from docker.models.images import Image
+from docker.utils import parse_repository_tag
+
+from vantage6.common import logger_name
+from vantage6.common.docker.addons import get_digest, get_image_name_wo_tag
+from vantage6.node.globals import DEFAULT_IMAGE_DIGEST_TTL, DEFAULT_IMAGE_PULL_TTL
+
+log = logging.getLogger(logger_name(__name__))
+
+
+class ImageCache:
+    """
+    Cache that decides whether algorithm images need to be pulled again.
+    """
+
+    def __init__(
+        self,
+        docker_client: DockerClient,
+        pull_ttl: int = DEFAULT_IMAGE_PULL_TTL,
+        prepull: bool = True,
+        metadata: "ImageMetadataCache | None" = None,
+    ) -> None:
+        """
+        Initialize the image cache
+
+        Parameters
+        ----------
+        docker_client: DockerClient
+            Docker client used to pull and inspect images. This client may have been
+            logged in to one or more registries.
+        pull_ttl: int
+            Number of seconds after a successful pull in which the same image is not
+            pulled again. Set to 0 to always pull images that are not pinned to a
+            digest.
+        prepull: bool
+            Whether images may be pulled in the background before the run starts
+        metadata: ImageMetadataCache | None
+            Image metadata cache to update when an image has been pulled
+        """
+        self.docker = docker_client
+        self.metadata = metadata
+        self.pull_ttl = pull_ttl
+        self.prepull_enabled = prepull
+
+        # time (monotonic) of the last successful pull per image
+        self._last_pulled: dict[str, float] = {}
+        # per-image locks, so that the same image is never pulled twice at once
+        self._pull_locks: dict[str, threading.Lock] = {}
+        # images that are currently being pulled in the background
+        self._prepulling: set[str] = set()
+        self._lock = threading.Lock()
+
+    def is_up_to_date(self, image: str) -> bool:
+        """
+        Check whether the local version of an image can be used without pulling
+
+        Parameters
+        ----------
+        image: str
+            Image name, optionally including tag and/or digest
+
+        Returns
+        -------
+        bool
+            True if the image does not have to be pulled
+        """
+        if self._has_local_pinned_digest(image):
+            log.debug("Image %s with pinned digest is available locally", image)
+            return True
+        last_pulled = self._last_pulled.get(image)
+        return (
+            last_pulled is not None and time.monotonic() - last_pulled < self.pull_ttl
+        )
+
+    def pull(self, image: str) -> None:
+        """
+        Pull an image, unless it has been pulled in the meantime by another thread
+
+        Parameters
+        ----------
+        image: str
+            Image name, optionally including tag and/or digest
+
+        Raises
+        ------
+        docker.errors.APIError
+            If the image could not be pulled
+        """
+        with self._get_pull_lock(image):
+            # another thread (e.g. the pre-puller) may have pulled the image while
+            # we were waiting for the lock
+            if self.is_up_to_date(image):
+                return
+            pulled_image = self.docker.images.pull(image)
+            self._last_pulled[image] = time.monotonic()
+            # pulling an image without tag returns a list of all tags of the image
+            if self.metadata and not isinstance(pulled_image, list):
+                self.metadata.update_from_image(image, pulled_image)
+
+    def prepull(self, image: str) -> None:
+        """
+        Start pulling an image in a background thread.
+
+        Errors are not raised: if the pull fails, it is attempted again when the run
+        is started.
+
+        Parameters
+        ----------
+        image: str
+            Image name, optionally including tag and/or digest
+        """
+        if not self.prepull_enabled:
+            return
+        with self._lock:
+            if image in self._prepulling:
+                return
+            self._prepulling.add(image)
+        threading.Thread(
+            target=self._prepull_worker, args=(image,), daemon=True
+        ).start()
+
+    def invalidate(self, image: str | None = None) -> None:
+        """
+        Forget when an image was last pulled, so that it is pulled again on next use
+
+        Parameters
+        ----------
+        image: str | None
+            Image to invalidate. If None, all images are invalidated.
+        """
+        if image is None:
+            self._last_pulled.clear()
+        else:
+            self._last_pulled.pop(image, None)
+
+    def _prepull_worker(self, image: str) -> None:
+        """
+        Pull an image and log, rather than raise, any errors
+
+        Parameters
+        ----------
+        image: str
+            Image name, optionally including tag and/or digest
+        """
+        try:
+            if not self.is_up_to_date(image):
+                log.info("Pre-pulling image '%s'", image)
+                self.pull(image)
+                log.debug("Finished pre-pulling image '%s'", image)
+        except Exception as exc:
+            log.debug("Could not pre-pull image '%s': %s", image, exc)
+        finally:
+            with self._lock:
+                self._prepulling.discard(image)
+
+    def _get_pull_lock(self, image: str) -> threading.Lock:
+        """
+        Get the lock that guards pulling a particular image
+
+        Parameters
+        ----------
+        image: str
+            Image name
+
+        Returns
+        -------
+        threading.Lock
+            Lock for the image
+        """
+        with self._lock:
+            return self._pull_locks.setdefault(image, threading.Lock())
+
+    def _has_local_pinned_digest(self, image: str) -> bool:
+        """
+        Check if an image is pinned to a digest and available locally with that digest
+
+        Parameters
+        ----------
+        image: str
+            Image name, e.g. "harbor2.vantage6.ai/algorithms/average@sha256:..."
+
+        Returns
+        -------
+        bool
+            True if the image is pinned to a digest that is available locally
+        """
+        repository, digest = split_pinned_digest(image)
+        if not digest:
+            return False
+        try:
+            local_images = self.docker.images.list(name=repository)
+        except docker.errors.APIError:
+            return False
+        return any(
+            repo_digest.endswith(f"@{digest}")
+            for local_image in local_images
+            for repo_digest in local_image.attrs.get("RepoDigests", [])
+        )
+
+
+class ImageMetadataCache:
+    """
+    Persistent cache of the metadata of algorithm images.
+
+    Registry digests are cached per image reference. Digests of references that are
+    pinned to a digest never change, for other references (e.g. 'image:tag') the
+    digest is refreshed after ``digest_ttl`` seconds, because the tag may be moved
+    to another image. The labels and exposed ports of an image are cached per digest,
+    as an image with a given digest never changes.
+    """
+
+    def __init__(
+        self,
+        docker_client: DockerClient,
+        cache_file: Path | None = None,
+        digest_ttl: int = DEFAULT_IMAGE_DIGEST_TTL,
+    ) -> None:
+        """
+        Initialize the image metadata cache
+
+        Parameters
+        ----------
+        docker_client: DockerClient
+            Docker client used to obtain digests and to inspect images. This client
+            may have been logged in to one or more registries.
+        cache_file: Path | None
+            JSON file in which the cache is persisted. If None, the cache is only
+            kept in memory.
+        digest_ttl: int
+            Number of seconds that the digest of an image reference that is not
+            pinned to a digest is considered valid.
+        """
+        self.docker = docker_client
+        self.cache_file = cache_file
+        self.digest_ttl = digest_ttl
+        self._lock = threading.Lock()
+
+        # image reference -> {"digest": str, "checked_at": float}
+        self._digests: dict[str, dict] = {}
+        # image digest -> {"labels": dict, "exposed_ports": list[str]}
+        self._images: dict[str, dict] = {}
+        self._load()
+
+    def get_digest(self, image: str) -> str | None:
+        """
+        Get the registry digest of an image reference
+
+        Parameters
+        ----------
+        image: str
+            Image name, optionally including tag and/or digest
+
+        Returns
+        -------
+        str | None
+            Digest of the image or None if it could not be obtained
+        """
+        _, pinned_digest = split_pinned_digest(image)
+        if pinned_digest:
+            return pinned_digest
+
+        cached_digest = self._get_cached_digest(image)
+        if cached_digest:
+            return cached_digest
+
+        digest = get_digest(image, client=self.docker)
+        if digest:
+            self._set_digest(image, digest)
+        return digest
+
+    def get_image_config(self, image: str) -> dict:
+        """
+        Get the labels and exposed ports of a locally available image
+
+        Parameters
+        ----------
+        image: str
+            Image name, optionally including tag and/or digest
+
+        Returns
+        -------
+        dict
+            Dictionary with keys 'labels' (dict) and 'exposed_ports' (list of
+            strings such as '8888/tcp')
+
+        Raises
+        ------
+        docker.errors.ImageNotFound
+            If the image is not cached and not available locally
+        """
+        _, digest = split_pinned_digest(image)
+        digest = digest or self._get_cached_digest(image)
+        if digest and digest in self._images:
+            return self._images[digest]
+
+        return self.update_from_image(image, self.docker.images.get(image))
+
+    def update_from_image(self, image: str, local_image: Image) -> dict:
+        """
+        Store the metadata of a local image, e.g. after it has been pulled
+
+        Parameters
+        ----------
+        image: str
+            Image reference that was used to obtain the local image
+        local_image: Image
+            Local docker image
+
+        Returns
+        -------
+        dict
+            Dictionary with keys 'labels' and 'exposed_ports'
+        """
+        config = local_image.attrs.get("Config") or {}
+        image_config = {
+            "labels": config.get("Labels") or {},
+            "exposed_ports": list(config.get("ExposedPorts") or {}),
+        }
+
+        # find the digest by which the registry knows this image
+        _, digest = split_pinned_digest(image)
+        if not digest:
+            digest = self._find_repo_digest(image, local_image)
+            if digest:
+                self._set_digest(image, digest)
+
+        if digest:
+            with self._lock:
+                self._images[digest] = image_config
+            self._save()
+        return image_config
+
+    def invalidate(self, image: str | None = None) -> None:
+        """
+        Remove the cached digest of an image reference
+
+        Parameters
+        ----------
+        image: str | None
+            Image reference to invalidate. If None, all digests are invalidated.
+        """
+        with self._lock:
+            if image is None:
+                self._digests.clear()
+            else:
+                self._digests.pop(image, None)
+        self._save()
+
+    @staticmethod
+    def _find_repo_digest(image: str, local_image: Image) -> str | None:
+        """
+        Find the registry digest of a local image for a given image reference
+
+        Parameters
+        ----------
+        image: str
+            Image reference that was used to obtain the local image
+        local_image: Image
+            Local docker image
+
+        Returns
+        -------
+        str | None
+            Registry digest, or None if the image has no digest for the repository
+            of the image reference (e.g. because it was built locally)
+        """
+
+        def _normalize(name: str) -> str:
+            # official Docker Hub images may be referred to with or without
+            # 'library/' prefix
+            return get_image_name_wo_tag(name).removeprefix("library/")
+
+        try:
+            repository = _normalize(image)
+        except Exception:
+            return None
+        for repo_digest in local_image.attrs.get("RepoDigests") or []:
+            repo_digest_repository, digest = repo_digest.split("@", 1)
+            try:
+                if _normalize(repo_digest_repository) == repository:
+                    return digest
+            except Exception:
+                continue
+        return None
+
+    def _get_cached_digest(self, image: str) -> str | None:
+        """
+        Get the digest of an image reference from the cache, if it is still valid
+
+        Parameters
+        ----------
+        image: str
+            Image reference
+
+        Returns
+        -------
+        str | None
+            Cached digest, or None if it is not cached or has expired
+        """
+        entry = self._digests.get(image)
+        if entry and time.time() - entry["checked_at"] < self.digest_ttl:
+            return entry["digest"]
+        return None
+
+    def _set_digest(self, image: str, digest: str) -> None:
+        """
+        Store the digest of an image reference in the cache
+
+        Parameters
+        ----------
+        image: str
+            Image reference
+        digest: str
+            Registry digest of the image
+        """
+        with self._lock:
+            self._digests[image] = {"digest": digest, "checked_at": time.time()}
+        self._save()
+
+    def _load(self) -> None:
+        """Load the cache from disk, if it has been persisted before"""
+        if not self.cache_file or not Path(self.cache_file).exists():
+            return
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as fp:
+                cached = json.load(fp)
+            self._digests = cached.get("digests", {})
+            self._images = cached.get("images", {})
+        except (OSError, ValueError, AttributeError):
+            log.warning("Could not read image metadata cache %s", self.cache_file)
+            self._digests = {}
+            self._images = {}
+
+    def _save(self) -> None:
+        """Persist the cache to disk"""
+        if not self.cache_file:
+            return
+        with self._lock:
+            try:
+                with open(self.cache_file, "w", encoding="utf-8") as fp:
+                    json.dump({"digests": self._digests, "images": self._images}, fp)
+            except OSError:
+                log.warning("Could not write image metadata cache %s", self.cache_file)
+
+
+def split_pinned_digest(image: str) -> tuple[str, str | None]:
+    """
+    Split an image reference into the repository and the digest it is pinned to
+
+    Parameters
+    ----------
+    image: str
+        Image name. E.g. "harbor2.vantage6.ai/algorithms/average:1.0@sha256:..."
+
+    Returns
+    -------
+    tuple[str, str | None]
+        Repository without tag and the digest, or the image reference and None if
+        the image is not pinned to a digest
+    """
+    repository, digest = parse_repository_tag(image)
+    if not digest or not digest.startswith("sha256:"):
+        return image, None
+    # the repository may still contain a tag, e.g. 'image:tag@sha256:...'
+    repository, _ = parse_repository_tag(repository)
+    return repository, digest
@@ -0,0 +1,251 @@
+"""
+Matcher for the node policies that define which algorithms may run on the node.
+
+The policies are parsed once when the node starts: plain image names are split into
+the full name and the name without tag, and regular expressions are compiled. This
+way, checking whether an algorithm is allowed does not require parsing the policies
+again for every task.
+"""
+
+import logging
+import re
+
+from vantage6.common import logger_name
+from vantage6.common.docker.addons import get_image_name_wo_tag
+from vantage6.common.globals import NodePolicy
+
+log = logging.getLogger(logger_name(__name__))
+
+
+class PolicyMatcher:
+    """
+    Precompiled version of the `allowed_algorithms` and `allowed_algorithm_stores`
+    node policies.
+
+    Attributes
+    ----------
+    algorithm_names: list[tuple[str, str]]
+        Allowed algorithm images that are plain image names, as tuples of the image
+        name and the image name without tag
+    algorithm_patterns: list[re.Pattern]
+        Allowed algorithm images that are regular expressions
+    store_names: set[str]
+        Allowed algorithm store URLs
+    store_patterns: list[re.Pattern]
+        Allowed algorithm store URLs that are regular expressions
+    """
+
+    def __init__(self, policies: dict) -> None:
+        """
+        Compile the node policies
+
+        Parameters
+        ----------
+        policies: dict
+            Policies from the node configuration
+        """
+        self.algorithm_names: list[tuple[str, str]] = []
+        self.algorithm_patterns: list[re.Pattern] = []
+        for allowed_algo in self._as_list(policies.get(NodePolicy.ALLOWED_ALGORITHMS)):
+            if self.is_regex_pattern(allowed_algo):
+                pattern = self._compile(allowed_algo)
+                if pattern:
+                    self.algorithm_patterns.append(pattern)
+                continue
+            try:
+                allowed_wo_tag = get_image_name_wo_tag(allowed_algo)
+            except Exception as exc:
+                log.warning(
+                    "Could not parse allowed_algorithm policy with name %s: %s",
+                    allowed_algo,
+                    exc,
+                )
+                log.warning("Skipping policy as it cannot be parsed")
+                continue
+            self.algorithm_names.append((allowed_algo, allowed_wo_tag))
+
+        self.store_names: set[str] = set()
+        self.store_patterns: list[re.Pattern] = []
+        for store in self._as_list(policies.get(NodePolicy.ALLOWED_ALGORITHM_STORES)):
+            if self.is_regex_pattern(store):
+                pattern = self._compile(store)
+                if pattern:
+                    self.store_patterns.append(pattern)
+            else:
+                self.store_names.add(store)
+
+    def match_algorithm_by_name(self, image: str) -> bool:
+        """
+        Check if an image is allowed without comparing image digests
+
+        Parameters
+        ----------
+        image: str
+            Image name, optionally including tag and/or digest
+
+        Returns
+        -------
+        bool
+            True if the image matches one of the allowed images exactly, matches an
+            allowed image without tag, or matches an allowed regular expression
+        """
+        image_wo_tag = self.get_image_name_wo_tag(image)
+        for allowed_algo, _ in self.algorithm_names:
+            # OK if allowed algorithm and provided algorithm match exactly, or if
+            # allowed algorithm is an image name without a tag, and the provided
+            # image is the same but includes extra tag
+            if allowed_algo in (image, image_wo_tag):
+                return True
+        return any(pattern.match(image) for pattern in self.algorithm_patterns)
+
+    def get_digest_candidates(self, image: str) -> list[str]:
+        """
+        Get the allowed images that are the same image as the evaluated image, but
+        only allow certain tags or digests. For these images, the digests have to be
+        compared to decide whether the evaluated image is allowed.
+
+        Parameters
+        ----------
+        image: str
+            Image name, optionally including tag and/or digest
+
+        Returns
+        -------
+        list[str]
+            Allowed images of which the digest should be compared
+        """
+        image_wo_tag = self.get_image_name_wo_tag(image)
+        if not image_wo_tag:
+            return []
+        return [
+            allowed_algo
+            for allowed_algo, allowed_wo_tag in self.algorithm_names
+            if allowed_wo_tag == image_wo_tag
+        ]
+
+    def match_store(self, store_url: str) -> bool:
+        """
+        Check if an algorithm store is allowed
+
+        Parameters
+        ----------
+        store_url: str
+            URL of the algorithm store
+
+        Returns
+        -------
+        bool
+            True if the store matches one of the allowed stores
+        """
+        return store_url in self.store_names or any(
+            pattern.match(store_url) for pattern in self.store_patterns
+        )
+
+    @staticmethod
+    def get_image_name_wo_tag(image: str) -> str | None:
+        """
+        Get image name without tag, or None if the image name cannot be parsed
+
+        Parameters
+        ----------
+        image: str
+            Image name, optionally including tag and/or digest
+
+        Returns
+        -------
+        str | None
+            Image name without tag
+        """
+        try:
+            return get_image_name_wo_tag(image)
+        except Exception as exc:
+            log.warning("Could not parse image with name %s: %s", image, exc)
+            return None
+
+    @staticmethod
+    def is_regex_pattern(pattern: str) -> bool:
+        """
+        Check if a string just a string or if it is a regex pattern. Note that there is
+        no failsafe way to do this so we make a best effort.
+
+        Note, for instance, that if a user provides the allowed algorithm "some.name",
+        we will interpret this as a regular string. This prevents that "someXname" is
+        allowed as well. The user is thus not able to define a regex pattern with only
+        a dot as special character. However we expect that this use case is extremely
+        rare - not doing so is likely to lead to regex's that lead to unintended
+        algorithms passing the filter criteria.
+
+        Parameters
+        ----------
+        pattern: str
+            String to be checked
+
+        Returns
+        -------
+        bool
+            Returns False if the pattern is a normal string, True if it is a regex.
+        """
+        # Inspired by
+        # https://github.com/corydolphin/flask-cors/blob/main/flask_cors/core.py#L254.
+        common_regex_chars = [
+            "*",
+            "\\",
+            "?",
+            "$",
+            "^",
+            "[",
+            "]",
+            "(",
+            ")",
+            "{",
+            "}",
+            "|",
+            "+",
+            "\\.",
+        ]
+        # Use common characters used in regular expressions as a proxy
+        # for if this string is in fact a regex.
+        return any((c in pattern for c in common_regex_chars))
+
+    @staticmethod
+    def _compile(pattern: str) -> re.Pattern | None:
+        """
+        Compile a regular expression from the policies
+
+        Parameters
+        ----------
+        pattern: str
+            Regular expression
+
+        Returns
+        -------
+        re.Pattern | None
+            Compiled expression, or None if it is not a valid regular expression
+        """
+        try:
+            return re.compile(pattern)
+        except re.error as exc:
+            log.error("Invalid regular expression '%s' in node policies", pattern)
+            log.error(exc)
+            return None
+
+    @staticmethod
+    def _as_list(value: str | list[str] | None) -> list[str]:
+        """
+        Policies may be given as a single string or as a list of strings
+
+        Parameters
+        ----------
+        value: str | list[str] | None
+            Policy value
+
+        Returns
+        -------
+        list[str]
+            Policy value as a list
+        """
+        if not value:
+            return []
+        if isinstance(value, str):
+            return [value]
+        return list(value)
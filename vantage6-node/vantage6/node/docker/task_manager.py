@@ -20,9 +20,16 @@ from vantage6.common.docker.addons import (
 from vantage6.common.docker.network_manager import NetworkManager
 from vantage6.common.task_status import TaskStatus
 from vantage6.node.util import get_parent_id
-from vantage6.node.globals import ALPINE_IMAGE, ENV_VARS_NOT_SETTABLE_BY_NODE
+from vantage6.node.globals import (
+    ALGORITHM_LOG_BATCH_INTERVAL,
+    ALGORITHM_LOG_BATCH_MAX_SIZE,
+    ALPINE_IMAGE,
+    ENV_VARS_NOT_SETTABLE_BY_NODE,
+)
 from vantage6.node.docker.vpn_manager import VPNManager
 from vantage6.node.docker.squid import Squid
+from vantage6.node.docker.image_cache import ImageCache
+from vantage6.node.docker.helper_pool import VPNHelperPool
 from vantage6.node.docker.docker_base import DockerBaseManager
 from vantage6.node.docker.exceptions import (
     UnknownAlgorithmStartFail,
@@ -62,6 +69,8 @@ class DockerTaskManager(DockerBaseManager):
         requires_pull: bool = False,
         share_algorithm_logs: bool = False,
         write_run_context_file: bool = False,
+        image_cache: ImageCache | None = None,
+        helper_pool: VPNHelperPool | None = None,
     ):
         """
         Initialization creates DockerTaskManager instance
@@ -102,6 +111,12 @@ class DockerTaskManager(DockerBaseManager):
             If true, share algorithm logs with the server
         write_run_context_file: bool
             If true, write a run context file and expose RUN_CONTEXT_FILE
+        image_cache: ImageCache | None
+            Cache that is used to skip pulling images that are up to date. If None,
+            the image is pulled on every run
+        helper_pool: VPNHelperPool | None
+            Pool from which the VPN helper container is claimed. If None, a new
+            helper container is started for every run
         """
         self.task_id = task_info["id"]
         self.log = logging.getLogger(f"task ({self.task_id})")
@@ -112,6 +127,7 @@ class DockerTaskManager(DockerBaseManager):
         self.run_id = run_id
         self.task_id = task_info["id"]
         self.parent_id = get_parent_id(task_info)
+        self.init_org_id = (task_info.get("init_org") or {}).get("id")
         self.__tasks_dir = tasks_dir
         self.databases = databases
         self.data_volume_name = docker_volume_name
@@ -122,6 +138,8 @@ class DockerTaskManager(DockerBaseManager):
         self.requires_pull = requires_pull
         self.share_algorithm_logs = share_algorithm_logs
         self.write_run_context_file = write_run_context_file
+        self.image_cache = image_cache
+        self.helper_pool = helper_pool
         self.container = None
         self.helper_container = None
         self.status_code = None
@@ -221,9 +239,19 @@ class DockerTaskManager(DockerBaseManager):
         PermanentAlgorithmStartFail
             If the image could not be pulled and does not exist locally
         """
+        if (
+            local_exists
+            and self.image_cache
+            and self.image_cache.is_up_to_date(self.image)
+        ):
+            self.log.info("Image '%s' is up to date, not pulling it", self.image)
+            return
         try:
             self.log.info("Retrieving latest image: '%s'", self.image)
-            self.docker.images.pull(self.image)
+            if self.image_cache:
+                self.image_cache.pull(self.image)
+            else:
+                self.docker.images.pull(self.image)
         except Exception as exc:
             if isinstance(exc, docker.errors.APIError):
                 self.log.warning("Failed to pull image! Image does not exist")
@@ -310,10 +338,16 @@ class DockerTaskManager(DockerBaseManager):
 
     def cleanup(self) -> None:
         """Cleanup the containers generated for this task"""
-        if self.helper_container:
-            remove_container(self.helper_container, kill=True)
+        # remove the algorithm container first, as it uses the network namespace of
+        # the helper container, which may be reused
         if self.container:
             remove_container(self.container, kill=True)
+        if self.helper_container:
+            if self.helper_pool:
+                self.helper_pool.release(self.helper_container)
+            else:
+                remove_container(self.helper_container, kill=True)
+            self.helper_container = None
 
     def _run_algorithm(self) -> list[dict] | None:
         """
@@ -349,20 +383,31 @@ class DockerTaskManager(DockerBaseManager):
             # First, start a container that runs indefinitely. The algorithm
             # container will run in the same network and network exceptions
             # will therefore also affect the algorithm.
-            self.log.debug("Start helper container to setup VPN network")
-            self.helper_container = self.docker.containers.run(
-                command="sleep infinity",
-                image=self.alpine_image,
-                labels=self.helper_labels,
-                network=self.isolated_network_mgr.network_name,
-                name=helper_container_name,
-                detach=True,
-            )
+            if self.helper_pool:
+                # claim a warm helper container, of which the traffic is already
+                # routed via the VPN client
+                self.log.debug("Claim helper container to setup VPN network")
+                self.helper_container = self.helper_pool.claim()
+            else:
+                self.log.debug("Start helper container to setup VPN network")
+                self.helper_container = self.docker.containers.run(
+                    command="sleep infinity",
+                    image=self.alpine_image,
+                    labels=self.helper_labels,
+                    network=self.isolated_network_mgr.network_name,
+                    name=helper_container_name,
+                    detach=True,
+                )
             # setup forwarding of traffic via VPN client to and from the
             # algorithm container:
             self.log.debug("Setup port forwarder")
             vpn_ports = self.__vpn_manager.forward_vpn_traffic(
-                helper_container=self.helper_container, algo_image_name=self.image
+                helper_container=self.helper_container,
+                algo_image_name=self.image,
+                image_metadata=(
+                    self.image_cache.metadata if self.image_cache else None
+                ),
+                route_configured=self.helper_pool is not None,
             )
             container_network = "container:" + self.helper_container.id
 
@@ -946,23 +991,54 @@ class DockerTaskManager(DockerBaseManager):
             self.log.error("No container to stream logs from.")
             return
 
-        def log_stream():
-            for log in self.container.logs(stream=True):
-                decoded_log = log.decode("utf-8")
-                # print algorithm logs to node logs
-                self.log.info("[Task %s]: %s", run_id, decoded_log.rstrip())
-                # send logs to server
-                if share_algorithm_logs:
-                    socketIO.emit(
-                        "algorithm_log",
-                        data={
-                            "collaboration_id": collaboration_id,
-                            "run_id": run_id,
-                            "task_id": task_id,
-                            "log": decoded_log,
-                        },
-                        namespace="/tasks",
-                    )
+        # algorithm logs are sent to the server in batches, which are sent when
+        # they reach a maximum size or when they have been collected for some time
+        batch: list[str] = []
+        batch_size = 0
+        batch_lock = threading.Lock()
+        stream_finished = threading.Event()
+
+        def send_batch():
+            nonlocal batch, batch_size
+            with batch_lock:
+                lines, batch, batch_size = batch, [], 0
+            if not lines:
+                return
+            socketIO.emit(
+                "algorithm_log",
+                data={
+                    "collaboration_id": collaboration_id,
+                    "run_id": run_id,
+                    "task_id": task_id,
+                    "log": "".join(lines),
+                },
+                namespace="/tasks",
+            )
+
+        def send_batches():
+            while not stream_finished.wait(ALGORITHM_LOG_BATCH_INTERVAL):
+                send_batch()
+            send_batch()
 
+        def log_stream():
+            nonlocal batch_size
+            try:
+                for log in self.container.logs(stream=True):
+                    decoded_log = log.decode("utf-8")
+                    # print algorithm logs to node logs
+                    self.log.info("[Task %s]: %s", run_id, decoded_log.rstrip())
+                    # send logs to server
+                    if share_algorithm_logs:
+                        with batch_lock:
+                            batch.append(decoded_log)
+                            batch_size += len(decoded_log)
+                            is_full = batch_size >= ALGORITHM_LOG_BATCH_MAX_SIZE
+                        if is_full:
+                            send_batch()
+            finally:
+                stream_finished.set()
+
+        if share_algorithm_logs:
+            threading.Thread(target=send_batches, daemon=True).start()
         log_thread = threading.Thread(target=log_stream)
         log_thread.start()
@@ -25,6 +25,7 @@ from vantage6.node.globals import (
 )
 from vantage6.common.client.node_client import NodeClient
 from vantage6.node.docker.docker_base import DockerBaseManager
+from vantage6.node.docker.image_cache import ImageMetadataCache
 from vantage6.node._version import major_minor
 
 
@@ -307,7 +308,11 @@ class VPNManager(DockerBaseManager):
             )
 
     def forward_vpn_traffic(
-        self, helper_container: Container, algo_image_name: str
+        self,
+        helper_container: Container,
+        algo_image_name: str,
+        image_metadata: ImageMetadataCache | None = None,
+        route_configured: bool = False,
     ) -> list[dict] | None:
         """
         Setup rules so that traffic is properly forwarded between the VPN
@@ -319,6 +324,12 @@ class VPNManager(DockerBaseManager):
             Helper algorithm container
         algo_image_name: str
             Name of algorithm image that is run
+        image_metadata: ImageMetadataCache | None
+            Cache from which the exposed ports of the algorithm image are obtained.
+            If None, the image is inspected.
+        route_configured: bool
+            Whether outgoing traffic of the helper container is already routed via
+            the VPN client, e.g. because the helper was claimed from a pool
 
         Returns
         -------
@@ -326,11 +337,36 @@ class VPNManager(DockerBaseManager):
             Description of each port on the VPN client that forwards traffic to
             the algo container. None if VPN is not set up.
         """
-        ports = self._forward_traffic_to_algorithm(helper_container, algo_image_name)
-        self._forward_traffic_from_algorithm(helper_container)
+        ports = self._forward_traffic_to_algorithm(
+            helper_container, algo_image_name, image_metadata
+        )
+        if not route_configured:
+            self.forward_traffic_from_algorithm(helper_container)
         return ports
 
-    def _forward_traffic_from_algorithm(self, algo_helper_container: Container) -> None:
+    def remove_forwarding_to_algorithm(self, algo_helper_container: Container) -> None:
+        """
+        Remove the rules that forward incoming VPN traffic to an algorithm
+        container, so that its helper container can be used for another algorithm
+
+        Parameters
+        ----------
+        algo_helper_container: Container
+            Helper algorithm container
+        """
+        if not self.has_vpn:
+            return
+        algo_ip = self.get_isolated_netw_ip(algo_helper_container)
+        # list the forwarding rules to the algorithm and delete them one by one
+        command = (
+            "iptables -t nat -S PREROUTING | "
+            f'grep -- "--to-destination {algo_ip}:" | '
+            'sed "s/^-A /-D /" | '
+            "while read -r rule; do iptables -t nat $rule; done"
+        )
+        self.vpn_client_container.exec_run(["sh", "-c", command])
+
+    def forward_traffic_from_algorithm(self, algo_helper_container: Container) -> None:
         """
         Direct outgoing algorithm container traffic to the VPN client container
 
@@ -362,7 +398,10 @@ class VPNManager(DockerBaseManager):
         )
 
     def _forward_traffic_to_algorithm(
-        self, algo_helper_container: Container, algo_image_name: str
+        self,
+        algo_helper_container: Container,
+        algo_image_name: str,
+        image_metadata: ImageMetadataCache | None = None,
     ) -> list[dict] | None:
         """
         Forward incoming traffic from the VPN client container to the
@@ -374,6 +413,8 @@ class VPNManager(DockerBaseManager):
             Helper algorithm container
         algo_image_name: str
             Name of algorithm image that is run
+        image_metadata: ImageMetadataCache | None
+            Cache from which the exposed ports of the algorithm image are obtained
 
         Returns
         -------
@@ -391,7 +432,7 @@ class VPNManager(DockerBaseManager):
 
         # Set ports at which algorithm containers receive traffic
         self.log.debug("Finding exposed ports of algorithm container")
-        ports = self._find_exposed_ports(algo_image_name)
+        ports = self._find_exposed_ports(algo_image_name, image_metadata)
 
         # Find ports on VPN container that are already occupied
         cmd = (
@@ -456,7 +497,9 @@ class VPNManager(DockerBaseManager):
         vpn_ip = self.get_vpn_ip()
         return ipaddress.ip_address(vpn_ip) in ipaddress.ip_network(self.subnet)
 
-    def _find_exposed_ports(self, image: str) -> list[dict]:
+    def _find_exposed_ports(
+        self, image: str, image_metadata: ImageMetadataCache | None = None
+    ) -> list[dict]:
         """
         Find which ports were exposed via the EXPOSE keyword in the dockerfile
         of the algorithm image. This port will be used for VPN traffic. If no
@@ -466,6 +509,9 @@ class VPNManager(DockerBaseManager):
         ----------
         image: str
             Algorithm image name
+        image_metadata: ImageMetadataCache | None
+            Cache from which the exposed ports and labels of the image are
+            obtained. If None, the image is inspected.
 
         Returns
         -------
@@ -474,21 +520,19 @@ class VPNManager(DockerBaseManager):
             containing port number and label is given
         """
         default_ports = [{"algo_port": DEFAULT_ALGO_VPN_PORT, "label": None}]
-        algo_image = self.docker.images.get(image)
+        if image_metadata:
+            image_config = image_metadata.get_image_config(image)
+            exposed_ports = image_config["exposed_ports"]
+            labels = image_config["labels"]
+        else:
+            algo_image_config = self.docker.images.get(image).attrs.get("Config", {})
+            exposed_ports = algo_image_config.get("ExposedPorts")
+            # find any labels defined in the docker image
+            labels = algo_image_config.get("Labels")
 
-        exposed_ports = []
-        try:
-            exposed_ports = algo_image.attrs["Config"]["ExposedPorts"]
-        except KeyError:
+        if not exposed_ports:
             return default_ports
 
-        # find any labels defined in the docker image
-        labels = {}
-        try:
-            labels = algo_image.attrs["Config"]["Labels"]
-        except KeyError:
-            pass  # No labels found, ignore
-
         ports = []
         for port in exposed_ports:
             port = port[0 : port.find("/")]
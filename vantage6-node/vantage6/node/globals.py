@@ -54,3 +54,60 @@ ENV_VARS_NOT_SETTABLE_BY_NODE = ["PKG_NAME"]
 
 # default policies
 DEFAULT_REQUIRE_ALGO_IMAGE_PULL = True
+
+# number of seconds after a successful pull in which an algorithm image is not
+# pulled again
+DEFAULT_IMAGE_PULL_TTL = 300
+
+# number of seconds that the registry digest of an image tag is cached
+DEFAULT_IMAGE_DIGEST_TTL = 300
+
+# name of the file in the node data directory in which image metadata is cached
+IMAGE_METADATA_CACHE_FILE = "image_metadata.json"
+
+# default number of warm helper containers for algorithms that use the VPN
+DEFAULT_VPN_HELPER_POOL_SIZE = 2
+
+# folder in the node data directory in which results are kept until they have been
+# uploaded to the server
+RESULT_SPOOL_FOLDER = "result_spool"
+
+# default number of results that are uploaded to the server concurrently
+DEFAULT_RESULT_UPLOAD_WORKERS = 4
+
+# default number of times the server may reject a result before it is discarded
+DEFAULT_RESULT_UPLOAD_MAX_ATTEMPTS = 10
+
+# maximum number of seconds between attempts to upload a result
+RESULT_UPLOAD_MAX_BACKOFF = 300
+
+# number of seconds over which the result upload throughput is computed
+RESULT_UPLOAD_THROUGHPUT_WINDOW = 60
+
+# algorithm logs are sent to the server in batches. A batch is sent when it reaches
+# the maximum size (in characters), or after the interval (in seconds)
+ALGORITHM_LOG_BATCH_MAX_SIZE = 64 * 1024
+ALGORITHM_LOG_BATCH_INTERVAL = 1
+
+# maximum number of organizations for which the proxy server encrypts the input of a
+# task concurrently
+PROXY_ENCRYPTION_WORKERS = 8
+
+# maximum number of results that the proxy server decrypts concurrently
+PROXY_DECRYPTION_WORKERS = 8
+
+# default maximum number of requests from algorithm containers that the proxy server
+# handles concurrently
+DEFAULT_PROXY_SERVER_WORKERS = 32
+
+# number of seconds after which the proxy server closes connections from algorithm
+# containers that do not send a complete request
+PROXY_SERVER_CONNECTION_TIMEOUT = 15
+
+# folder in the node data directory in which the input and results of subtasks that
+# are handed to the node's own organization locally are kept
+LOCAL_SUBTASK_FOLDER = "local_subtasks"
+
+# default number of hours after which input and results of local subtasks are
+# removed
+DEFAULT_LOCAL_SUBTASK_RETENTION_HOURS = 24
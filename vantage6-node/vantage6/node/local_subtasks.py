@@ -0,0 +1,283 @@
+"""
+Local hand-off of subtasks that are executed by this node
+
+When an algorithm creates a subtask that includes its own organization, the input
+of that organization would normally be encrypted, sent to the server, retrieved by
+this same node and decrypted again, and the result would make the same round trip
+back. For iterative algorithms, this is where most of the time is spent.
+
+When local subtasks are enabled, the proxy server keeps the input for the node's
+own organization in the node's data directory and sends only a reference to it to
+the server. When the node starts the run, it takes the input from this store. The
+result is stored here as well, and the server receives a reference to it, which
+the proxy server resolves when the algorithm retrieves the results. The task and
+its runs, including their status and logs, are still registered at the server.
+
+Note that, as a consequence, the input and result of these runs can only be read
+by algorithms running on this node, not by users retrieving them from the server.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from vantage6.common import logger_name
+from vantage6.common.globals import (
+    LOCAL_SUBTASK_INPUT_PREFIX,
+    LOCAL_SUBTASK_RESULT_PREFIX,
+)
+
+
+class LocalSubtaskStore:
+    """
+    Store for the input and results of subtasks that this node created for its
+    own organization.
+    """
+
+    log = logging.getLogger(logger_name(__name__))
+
+    def __init__(self, directory: Path, retention: float) -> None:
+        """
+        Initialize the store. Call `start` before using it.
+
+        Parameters
+        ----------
+        directory: Path
+            Directory in which the input and results are stored
+        retention: float
+            Number of seconds after which input and results that are still in the
+            store are removed
+        """
+        self.directory = Path(directory)
+        self.retention = retention
+        # runs that were started with input from this store, and the reference to
+        # their input
+        self._runs: dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Create the directory of the store, and remove expired entries"""
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self.prune()
+
+    @staticmethod
+    def is_input_reference(value: str | bytes | None) -> bool:
+        """
+        Check if the input of a run refers to input in this store.
+
+        Parameters
+        ----------
+        value: str | bytes | None
+            Input of a run as obtained from the server
+
+        Returns
+        -------
+        bool
+            True if the input is a reference to input in this store
+        """
+        return isinstance(value, str) and value.startswith(LOCAL_SUBTASK_INPUT_PREFIX)
+
+    @staticmethod
+    def is_result_reference(value: str | bytes | None) -> bool:
+        """
+        Check if the result of a run refers to a result in this store.
+
+        Parameters
+        ----------
+        value: str | bytes | None
+            Result of a run as obtained from the server
+
+        Returns
+        -------
+        bool
+            True if the result is a reference to a result in this store
+        """
+        return isinstance(value, str) and value.startswith(LOCAL_SUBTASK_RESULT_PREFIX)
+
+    def store_input(self, input_: bytes) -> str:
+        """
+        Store the input of a run that will be executed by this node.
+
+        Parameters
+        ----------
+        input_: bytes
+            Serialized input of the run
+
+        Returns
+        -------
+        str
+            Reference to the input, to be sent to the server instead of the input
+        """
+        key = uuid.uuid4().hex
+        self._write(f"input-{key}", input_)
+        return f"{LOCAL_SUBTASK_INPUT_PREFIX}{key}"
+
+    def start_run(self, run_id: int, reference: str) -> bytes | None:
+        """
+        Get the input of a run that is started, and remember that its result
+        should be stored in this store.
+
+        Parameters
+        ----------
+        run_id: int
+            ID of the run
+        reference: str
+            Reference to the input, as obtained from the server
+
+        Returns
+        -------
+        bytes | None
+            Input of the run, or None if it is not in the store
+        """
+        key = reference[len(LOCAL_SUBTASK_INPUT_PREFIX) :]
+        if not self._is_valid_key(key):
+            return None
+        input_ = self._read(f"input-{key}")
+        if input_ is not None:
+            with self._lock:
+                self._runs[run_id] = key
+        return input_
+
+    def is_local_run(self, run_id: int) -> bool:
+        """
+        Check if a run was started with input from this store.
+
+        Parameters
+        ----------
+        run_id: int
+            ID of the run
+
+        Returns
+        -------
+        bool
+            True if the result of the run should be stored in this store
+        """
+        with self._lock:
+            return run_id in self._runs
+
+    def store_result(self, run_id: int, result: bytes) -> str:
+        """
+        Store the result of a run that was started with input from this store.
+        The input of the run is removed.
+
+        Parameters
+        ----------
+        run_id: int
+            ID of the run
+        result: bytes
+            Result of the run
+
+        Returns
+        -------
+        str
+            Reference to the result, to be sent to the server instead of the
+            result
+        """
+        result_key = uuid.uuid4().hex
+        self._write(f"result-{result_key}", result)
+        with self._lock:
+            input_key = self._runs.pop(run_id, None)
+        if input_key:
+            self._remove(f"input-{input_key}")
+        self.prune()
+        return f"{LOCAL_SUBTASK_RESULT_PREFIX}{result_key}"
+
+    def get_result(self, reference: str) -> bytes | None:
+        """
+        Get a result from this store.
+
+        Parameters
+        ----------
+        reference: str
+            Reference to the result, as obtained from the server
+
+        Returns
+        -------
+        bytes | None
+            The result, or None if it is not in the store
+        """
+        key = reference[len(LOCAL_SUBTASK_RESULT_PREFIX) :]
+        if not self._is_valid_key(key):
+            return None
+        return self._read(f"result-{key}")
+
+    def prune(self) -> None:
+        """Remove input and results that are older than the retention period"""
+        threshold = time.time() - self.retention
+        for path in self.directory.glob("*"):
+            try:
+                if path.stat().st_mtime < threshold:
+                    self.log.debug("Removing expired local subtask data %s", path.name)
+                    path.unlink()
+            except FileNotFoundError:
+                continue
+
+    @staticmethod
+    def _is_valid_key(key: str) -> bool:
+        """
+        Check that the key of a reference obtained from the server is one that
+        this store may have generated, so that it cannot point outside the store
+
+        Parameters
+        ----------
+        key: str
+            Key of the reference
+
+        Returns
+        -------
+        bool
+            True if the key is valid
+        """
+        return re.fullmatch(r"[0-9a-f]{32}", key) is not None
+
+    def _write(self, name: str, data: bytes) -> None:
+        """
+        Atomically write a file to the store
+
+        Parameters
+        ----------
+        name: str
+            Name of the file
+        data: bytes
+            Content of the file
+        """
+        path = self.directory / name
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _read(self, name: str) -> bytes | None:
+        """
+        Read a file from the store
+
+        Parameters
+        ----------
+        name: str
+            Name of the file
+
+        Returns
+        -------
+        bytes | None
+            Content of the file, or None if it does not exist
+        """
+        try:
+            with open(self.directory / name, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _remove(self, name: str) -> None:
+        """
+        Remove a file from the store
+
+        Parameters
+        ----------
+        name: str
+            Name of the file
+        """
+        (self.directory / name).unlink(missing_ok=True)
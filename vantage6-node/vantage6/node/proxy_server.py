@@ -7,10 +7,12 @@ methods to handle tasks and results, including their encryption and decryption.
 to access other places in the network.
 """
 
+import json
 import requests
 import logging
 import traceback
 
+from concurrent.futures import ThreadPoolExecutor
 from time import sleep
 from http import HTTPStatus
 from requests import Response
@@ -20,7 +22,10 @@ from flask import Flask, request, stream_with_context, Response as FlaskResponse
 from vantage6.common import bytes_to_base64s, base64s_to_bytes, logger_name
 from vantage6.common.client.node_client import NodeClient
 from vantage6.common.client.utils import is_uuid
-from vantage6.common.globals import STRING_ENCODING
+from vantage6.common.globals import DEFAULT_CHUNK_SIZE, STRING_ENCODING
+from vantage6.common.http_session import get_session
+from vantage6.node.globals import PROXY_DECRYPTION_WORKERS, PROXY_ENCRYPTION_WORKERS
+from vantage6.node.local_subtasks import LocalSubtaskStore
 
 
 # Initialize FLASK
@@ -29,11 +34,33 @@ log = logging.getLogger(logger_name(__name__))
 
 # Need to be set when the proxy server is initialized
 app.config["SERVER_IO"] = None
+# Store for the input and results of subtasks for the node's own organization, if
+# these are handed over locally
+app.config["LOCAL_SUBTASKS"] = None
 server_url = None
 
 # Number of times the request is retried before the proxy server gives up
 RETRY = 3
 
+# Headers of responses of the server that are not passed on to the algorithm
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "transfer-encoding",
+    "content-encoding",
+    "content-length",
+}
+
+# Pool of threads in which the input of tasks is encrypted for each organization
+encryption_pool = ThreadPoolExecutor(
+    max_workers=PROXY_ENCRYPTION_WORKERS, thread_name_prefix="proxy-encryption"
+)
+
+# Pool of threads in which results are decrypted before they are sent to algorithms
+decryption_pool = ThreadPoolExecutor(
+    max_workers=PROXY_DECRYPTION_WORKERS, thread_name_prefix="proxy-decryption"
+)
+
 
 def get_method(method: str) -> callable:
     """
@@ -51,18 +78,19 @@ def get_method(method: str) -> callable:
     """
     method_name: str = method.lower()
 
+    session = get_session("proxy")
     method_map = {
-        "get": requests.get,
-        "post": requests.post,
-        "patch": requests.patch,
-        "put": requests.put,
-        "delete": requests.delete,
+        "get": session.get,
+        "post": session.post,
+        "patch": session.patch,
+        "put": session.put,
+        "delete": session.delete,
     }
 
-    return method_map.get(method_name, requests.get)
+    return method_map.get(method_name, session.get)
 
 
-def make_proxied_request(endpoint: str) -> Response:
+def make_proxied_request(endpoint: str, stream: bool = False) -> Response:
     """
     Helper to create proxies requests to the central server.
 
@@ -70,6 +98,8 @@ def make_proxied_request(endpoint: str) -> Response:
     ----------
     endpoint: str
         endpoint to be reached at the vantage6 server
+    stream: bool, optional
+        Whether to read the body of the response only when it is consumed
 
     Returns
     -------
@@ -80,7 +110,9 @@ def make_proxied_request(endpoint: str) -> Response:
     headers = {"Authorization": request.headers["Authorization"]} if present else None
 
     json = request.get_json() if request.is_json else None
-    return make_request(request.method, endpoint, json, request.args, headers)
+    return make_request(
+        request.method, endpoint, json, request.args, headers, stream=stream
+    )
 
 
 def make_request(
@@ -89,6 +121,7 @@ def make_request(
     json: dict = None,
     params: dict = None,
     headers: dict = None,
+    stream: bool = False,
 ) -> Response:
     """
     Make request to the central server
@@ -105,6 +138,8 @@ def make_request(
         HTTP parameters
     headers: dict, optional
         HTTP headers
+    stream: bool, optional
+        Whether to read the body of the response only when it is consumed
 
     Returns
     -------
@@ -112,6 +147,7 @@ def make_request(
         Response from the vantage6 server
     """
 
+    method_name = method
     method = get_method(method)
 
     # Forward the request to the central server. Retry when an exception is
@@ -120,7 +156,9 @@ def make_request(
     url = f"{server_url}/{endpoint}"
     for i in range(RETRY):
         try:
-            response: Response = method(url, json=json, params=params, headers=headers)
+            response: Response = method(
+                url, json=json, params=params, headers=headers, stream=stream
+            )
             # verify that the server gave us a valid response, else we
             # would want to try again
             if response.status_code > 210:
@@ -130,7 +168,7 @@ def make_request(
                 log.warning("Error messages: %s", response.json())
                 log.debug(
                     "method: %s, url: %s, json: %s, params: %s, headers: %s",
-                    request.method,
+                    method_name,
                     url,
                     json,
                     params,
@@ -172,6 +210,16 @@ def decrypt_result(run: dict) -> dict:
         Run dict with the `result` decrypted
     """
     client: NodeClient = app.config.get("SERVER_IO")
+    local_subtasks: LocalSubtaskStore | None = app.config.get("LOCAL_SUBTASKS")
+
+    # results of runs of this node that were kept locally do not need decryption
+    if local_subtasks and local_subtasks.is_result_reference(run["result"]):
+        result = local_subtasks.get_result(run["result"])
+        if result is not None:
+            run["result"] = bytes_to_base64s(result)
+        else:
+            log.error("Result of run %s is no longer available locally", run["id"])
+        return run
 
     # if the result is a None, there is no need to decrypt that..
     try:
@@ -238,6 +286,7 @@ def proxy_task():
         log.error("No organizations found in proxy request..")
         return {"msg": "Organizations missing from input"}, HTTPStatus.BAD_REQUEST
 
+    headers = None
     try:
         headers = {"Authorization": request.headers["Authorization"]}
     except Exception:
@@ -252,26 +301,43 @@ def proxy_task():
     def encrypt_input(organization_id: int, input_: dict) -> str:
         """
         Encrypt the input for a specific organization by using its public key.
+
         Parameters
         ----------
         organization_id : int
             ID of the organization
         input_ : dict
             Input as specified by the client (algorithm in this case)
+
         Returns
         -------
         str
             Encrypted input as a string
+
+        Raises
+        ------
+        ValueError
+            If the public key of the organization could not be retrieved
         """
-        # retrieve public key of the organization
-        log.debug("Retrieving public key of org: %s", organization_id)
-        response = make_request(
-            "get", f"organization/{organization_id}", headers=headers
-        )
-        public_key = response.json().get("public_key")
+        # Public keys are cached by the client, so that they are not retrieved
+        # again for every subtask. If the public key is not cached, it is
+        # retrieved with the token of the algorithm container rather than with
+        # the token of the node, so that it is only obtained if the container is
+        # allowed to view the organization.
+        public_key = client.get_cached_public_key(organization_id)
+        if public_key is None:
+            log.debug("Retrieving public key of org: %s", organization_id)
+            response = make_request(
+                "get", f"organization/{organization_id}", headers=headers
+            )
+            public_key = response.json().get("public_key")
+            if public_key is None:
+                raise ValueError(
+                    f"Public key of organization {organization_id} could not be "
+                    "retrieved"
+                )
+            client.cache_public_key(organization_id, public_key)
 
-        # Encrypt the input field
-        client: NodeClient = app.config.get("SERVER_IO")
         # If blob store is enabled, we skip base64 encoding of the message.
         encrypted_input = client.cryptor.encrypt_bytes_to_str(
             base64s_to_bytes(input_), public_key
@@ -280,17 +346,46 @@ def proxy_task():
         log.debug("Input successfully encrypted for organization %s!", organization_id)
         return encrypted_input
 
-    if client.is_encrypted_collaboration():
+    blob_store_enabled = client.check_if_blob_store_enabled()
+
+    # The input for the node's own organization is kept at the node, so that it
+    # does not have to be encrypted, sent to the server and retrieved again. The
+    # server only receives a reference to it.
+    local_subtasks: LocalSubtaskStore | None = app.config.get("LOCAL_SUBTASKS")
+    if local_subtasks and not blob_store_enabled:
+        for org in organizations:
+            if org["id"] == client.whoami.organization_id:
+                log.debug("Keeping input for own organization at the node")
+                org["input"] = local_subtasks.store_input(
+                    base64s_to_bytes(org.get("input", ""))
+                )
+
+    if client.is_encrypted_collaboration() and not blob_store_enabled:
         log.debug("Applying end-to-end encryption")
 
         for org in organizations:
-            if not client.check_if_blob_store_enabled():
-                if is_uuid(org.get("input")):
-                    log.warning(
-                        "Input is a UUID, are you sending blob based inputs "
-                        "to a non-blob store enabled server?"
-                    )
-                org["input"] = encrypt_input(org["id"], org.get("input", {}))
+            if is_uuid(org.get("input")):
+                log.warning(
+                    "Input is a UUID, are you sending blob based inputs "
+                    "to a non-blob store enabled server?"
+                )
+        encrypted_orgs = [
+            org
+            for org in organizations
+            if not LocalSubtaskStore.is_input_reference(org.get("input"))
+        ]
+        futures = [
+            encryption_pool.submit(encrypt_input, org["id"], org.get("input", {}))
+            for org in encrypted_orgs
+        ]
+        try:
+            for org, future in zip(encrypted_orgs, futures):
+                org["input"] = future.result()
+        except Exception as exc:
+            log.exception("Encrypting the input of the task failed")
+            return {
+                "msg": f"Encrypting the input of the task failed: {exc}"
+            }, HTTPStatus.INTERNAL_SERVER_ERROR
         data["organizations"] = organizations
     # Attempt to send the task to the central server
     try:
@@ -347,12 +442,54 @@ def proxy_result() -> Response:
     # Attempt to decrypt the results. The endpoint should have returned
     # a list of results
     results = get_response_json_and_handle_exceptions(response)
+    if response.status_code != HTTPStatus.OK or not results or "data" not in results:
+        return results, response.status_code
+
+    # Results are decrypted concurrently. Results that are stored in the blob store
+    # are not decrypted here: the algorithm streams them through `stream_handler`.
+    futures = [
+        (
+            decryption_pool.submit(decrypt_result, result)
+            if not result.get("blob_storage_used")
+            else None
+        )
+        for result in results["data"]
+    ]
+
+    # Wait until all results are decrypted before the response is started, so
+    # that the algorithm receives an error rather than a truncated response if
+    # one of them fails
+    try:
+        decrypted = [
+            future.result() if future is not None else result
+            for result, future in zip(results["data"], futures)
+        ]
+    except Exception:
+        log.exception(f"Decrypting the results of task {task_id} failed")
+        return {
+            "msg": "Decrypting the results failed, see node logs"
+        }, HTTPStatus.INTERNAL_SERVER_ERROR
 
-    for result in results["data"]:
-        if not result["blob_storage_used"] or result["blob_storage_used"] == False:
-            result = decrypt_result(result)
+    def generate_response():
+        """
+        Serialize the decrypted results one by one, in the order in which the
+        server returned them, so that the complete response is not held in
+        memory as a single string.
+        """
+        yield '{"data": ['
+        for idx, result in enumerate(decrypted):
+            yield ("," if idx else "") + json.dumps(result)
+        yield "]"
+        for key, value in results.items():
+            if key != "data":
+                yield f", {json.dumps(key)}: {json.dumps(value)}"
+        yield "}"
 
-    return results, response.status_code
+    return FlaskResponse(
+        generate_response(),
+        status=response.status_code,
+        content_type="application/json",
+    )
 
 
 @app.route("/result/<int:id>", methods=["GET"])
@@ -514,7 +651,7 @@ def stream_handler_post() -> FlaskResponse:
     # Stream the data to the server while encrypting it.
     # This is done to avoid loading the entire content into memory.
     # The encrypted stream is a generator that yields chunks of encrypted data.
-    backend_response = requests.post(
+    backend_response = get_session("proxy").post(
         url, params=request.args, headers=headers, data=encrypted_stream
     )
 
@@ -565,11 +702,25 @@ def proxy(central_server_path: str) -> Response:
         Contains the server response
     """
     try:
-        response = make_proxied_request(central_server_path)
+        response = make_proxied_request(central_server_path, stream=True)
     except Exception:
         log.exception("Generic proxy endpoint")
         return {
             "msg": "Request failed, see node logs"
         }, HTTPStatus.INTERNAL_SERVER_ERROR
 
-    return response.content, response.status_code, response.headers.items()
+    # Pass the body through to the algorithm while it is received. The body is
+    # decoded by `requests` and sent in chunks, so headers that describe the
+    # encoding of the original body are not passed on.
+    headers = {
+        key: value
+        for key, value in response.headers.items()
+        if key.lower() not in HOP_BY_HOP_HEADERS
+    }
+    proxy_response = FlaskResponse(
+        response.iter_content(chunk_size=DEFAULT_CHUNK_SIZE),
+        status=response.status_code,
+        headers=headers,
+    )
+    proxy_response.call_on_close(response.close)
+    return proxy_response
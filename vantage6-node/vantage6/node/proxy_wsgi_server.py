@@ -0,0 +1,132 @@
+"""
+WSGI server for the node proxy server
+
+The proxy server forwards the requests of algorithm containers to the central
+server. While it waits for the central server, it should keep serving the requests
+of other algorithm containers. The requests are therefore handled by a bounded pool
+of threads.
+
+Werkzeug closes each connection after its response has been sent, so every request
+of an algorithm container occupies a worker thread only while it is handled.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from socket import socket
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+from vantage6.common import logger_name
+from vantage6.node.globals import PROXY_SERVER_CONNECTION_TIMEOUT
+
+log = logging.getLogger(logger_name(__name__))
+
+
+class ProxyRequestHandler(WSGIRequestHandler):
+    """Request handler that writes its access logs to the proxy server log"""
+
+    access_log: logging.Logger = log
+
+    # Close connections that do not send a complete request within this time, so
+    # that they do not keep occupying a worker thread
+    timeout = PROXY_SERVER_CONNECTION_TIMEOUT
+
+    # Responses are streamed in chunks, which should not wait for the previous
+    # chunk to be acknowledged
+    disable_nagle_algorithm = True
+
+    def log(self, type: str, message: str, *args) -> None:
+        """
+        Log a message about the request that is handled
+
+        Parameters
+        ----------
+        type: str
+            Log level, e.g. "info" or "error"
+        message: str
+            Message to log, formatted with `args`
+        *args
+            Arguments of the message
+        """
+        getattr(self.access_log, type, self.access_log.info)(
+            "%s - %s", self.address_string(), message % args
+        )
+
+
+class ProxyWSGIServer(BaseWSGIServer):
+    """
+    WSGI server that handles requests concurrently in a bounded pool of threads.
+    """
+
+    # Set before the server is initialized, so that responses without a known
+    # length can be chunked (HTTP/1.1) and the WSGI environment indicates that
+    # requests are handled concurrently
+    multithread = True
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        app: callable,
+        workers: int,
+        access_log: logging.Logger = log,
+    ) -> None:
+        """
+        Create the server and bind it to the given address.
+
+        Parameters
+        ----------
+        host: str
+            Host to listen on
+        port: int
+            Port to listen on
+        app: callable
+            WSGI application, i.e. the Flask app of the proxy server
+        workers: int
+            Maximum number of requests that are handled concurrently
+        access_log: logging.Logger
+            Logger to which the handled requests are logged
+        """
+        handler = type(
+            "ProxyRequestHandler", (ProxyRequestHandler,), {"access_log": access_log}
+        )
+        super().__init__(host, port, app, handler=handler)
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="proxy-request"
+        )
+
+    def process_request(self, request: socket, client_address: tuple) -> None:
+        """
+        Handle a new connection in one of the worker threads
+
+        Parameters
+        ----------
+        request: socket
+            Socket of the connection
+        client_address: tuple
+            Address of the client
+        """
+        self.executor.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request: socket, client_address: tuple) -> None:
+        """
+        Handle the request of a connection, and close the connection afterwards
+
+        Parameters
+        ----------
+        request: socket
+            Socket of the connection
+        client_address: tuple
+            Address of the client
+        """
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        """Stop accepting connections and stop the worker threads"""
+        super().server_close()
+        self.executor.shutdown(wait=False)
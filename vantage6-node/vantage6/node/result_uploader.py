@@ -0,0 +1,485 @@
+"""
+Uploader of algorithm results to the server
+
+When an algorithm run is finished, its result has to be encrypted for the
+organization that created the task and sent to the server. Doing this in the
+thread that collects finished algorithm containers means that containers wait for
+the server whenever it is slow or unreachable.
+
+The result uploader decouples these: finished results are written to a spool
+directory in the node's data directory, from which a pool of worker threads uploads
+them. Results are encrypted before they are written to the spool, so that they are
+not kept on disk unencrypted. Only if the public key of the organization that
+created the task cannot be obtained at that moment, e.g. because the server cannot
+be reached, the result is spooled as produced by the algorithm. It is then
+encrypted by the upload worker, and the spooled copy is replaced by the encrypted
+version, as soon as the public key is available.
+
+Results that could not be uploaded are retried with an exponential backoff, and
+results that are still in the spool when the node restarts are uploaded after the
+restart.
+"""
+
+import base64
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+from vantage6.common import logger_name
+from vantage6.common.client.node_client import NodeClient
+from vantage6.node.globals import (
+    DEFAULT_RESULT_UPLOAD_MAX_ATTEMPTS,
+    DEFAULT_RESULT_UPLOAD_WORKERS,
+    RESULT_UPLOAD_MAX_BACKOFF,
+    RESULT_UPLOAD_THROUGHPUT_WINDOW,
+)
+
+
+class ResultUploadStage:
+    """Stages of a spooled result"""
+
+    # result as produced by the algorithm
+    PLAIN = "plain"
+    # result encrypted for the organization that created the task
+    ENCRYPTED = "encrypted"
+    # result ready to be sent in the PATCH of the run, i.e. uploaded to the blob
+    # store if that is enabled
+    UPLOADED = "uploaded"
+
+
+class ResultUploader:
+    """
+    Upload results of algorithm runs to the server using a pool of workers and an
+    on-disk spool.
+    """
+
+    log = logging.getLogger(logger_name(__name__))
+
+    def __init__(
+        self,
+        client: NodeClient,
+        spool_dir: Path,
+        workers: int = DEFAULT_RESULT_UPLOAD_WORKERS,
+        max_attempts: int = DEFAULT_RESULT_UPLOAD_MAX_ATTEMPTS,
+    ) -> None:
+        """
+        Initialize the result uploader. Call `start` to start uploading.
+
+        Parameters
+        ----------
+        client: NodeClient
+            Client used to send the results to the server
+        spool_dir: Path
+            Directory in which results are kept until they are uploaded
+        workers: int
+            Number of results that are uploaded concurrently
+        max_attempts: int
+            Number of times the server may reject a result before it is discarded.
+            Results that cannot be uploaded because the server is unreachable are
+            retried until the upload succeeds.
+        """
+        self.client = client
+        self.spool_dir = Path(spool_dir)
+        self.workers = max(1, workers)
+        self.max_attempts = max_attempts
+
+        self._queue = queue.Queue()
+        # number of upload attempts per run, which are updated by the workers and
+        # the timers that retry uploads
+        self._retries: dict[int, int] = {}
+        self._rejections: dict[int, int] = {}
+        self._attempts_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._uploaded = 0
+        self._failed = 0
+        self._recent_uploads: deque[tuple[float, int]] = deque()
+
+    def start(self) -> None:
+        """
+        Start the upload workers, and queue the results that were left in the
+        spool when the node stopped.
+        """
+        self.spool_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        for spool_file in sorted(self.spool_dir.glob("*.json")):
+            try:
+                run_id = int(spool_file.stem)
+            except ValueError:
+                continue
+            self.log.info("Resuming upload of result of run %s", run_id)
+            self._queue.put(run_id)
+
+        for _ in range(self.workers):
+            threading.Thread(target=self._upload_worker, daemon=True).start()
+
+    def submit(
+        self,
+        run_id: int,
+        init_org_id: int | None,
+        result: bytes | str,
+        data: dict,
+        encrypt: bool = True,
+    ) -> None:
+        """
+        Add a result to the spool, from which it will be uploaded.
+
+        The result is encrypted before it is written to the spool. If that is not
+        possible because the public key of the organization that created the task
+        cannot be retrieved, the result is spooled unencrypted and encrypted by
+        the upload worker once the public key is available.
+
+        Parameters
+        ----------
+        run_id: int
+            ID of the algorithm run
+        init_org_id: int | None
+            ID of the organization that created the task, for which the result is
+            encrypted
+        result: bytes | str
+            Result of the algorithm run
+        data: dict
+            Other fields of the run that should be updated, e.g. the status and
+            logs
+        encrypt: bool
+            Whether the result should be encrypted and uploaded. If False, the
+            result is sent to the server as is, e.g. because it is a reference to
+            a result that is kept at the node.
+        """
+        entry = {
+            "run_id": run_id,
+            "init_org_id": init_org_id,
+            "stage": (
+                ResultUploadStage.PLAIN if encrypt else ResultUploadStage.UPLOADED
+            ),
+            "blob_store_enabled": None,
+            "result": None,
+            "size": len(result),
+            "data": data,
+        }
+        if encrypt and init_org_id:
+            try:
+                # don't wait for the server if it cannot be reached, as that would
+                # hold up collecting other finished algorithms
+                self._encrypt(entry, result, attempts_on_timeout=1)
+            except Exception as exc:
+                self.log.warning(
+                    "Could not encrypt the result of run %s before spooling it, it "
+                    "will be encrypted before it is uploaded: %s",
+                    run_id,
+                    exc,
+                )
+        if entry["result"] is None:
+            entry["result"] = self._encode(result)
+        self._write_spool_entry(run_id, entry)
+        self._queue.put(run_id)
+
+    def is_pending(self, run_id: int) -> bool:
+        """
+        Check if the result of a run is waiting to be uploaded.
+
+        Parameters
+        ----------
+        run_id: int
+            ID of the algorithm run
+
+        Returns
+        -------
+        bool
+            True if the result of the run is in the spool
+        """
+        return self._spool_file(run_id).exists()
+
+    def get_metrics(self) -> dict:
+        """
+        Get metrics on the result uploads.
+
+        Returns
+        -------
+        dict
+            Number of results waiting to be uploaded, total number of uploaded and
+            discarded results, and the number of bytes uploaded per second over
+            the last `RESULT_UPLOAD_THROUGHPUT_WINDOW` seconds.
+        """
+        with self._metrics_lock:
+            self._prune_recent_uploads()
+            uploaded_bytes = sum(size for _, size in self._recent_uploads)
+            return {
+                "result_upload_pending": len(list(self.spool_dir.glob("*.json"))),
+                "result_upload_count": self._uploaded,
+                "result_upload_failures": self._failed,
+                "result_upload_bytes_per_second": (
+                    uploaded_bytes / RESULT_UPLOAD_THROUGHPUT_WINDOW
+                ),
+            }
+
+    def _upload_worker(self) -> None:
+        """Upload results from the queue"""
+        while True:
+            run_id = self._queue.get()
+            try:
+                self._upload(run_id)
+            except Exception:
+                self.log.exception("Uploading result of run %s failed", run_id)
+                self._retry_later(run_id)
+
+    def _upload(self, run_id: int) -> None:
+        """
+        Encrypt and upload a spooled result, and update the run at the server.
+
+        Parameters
+        ----------
+        run_id: int
+            ID of the algorithm run
+        """
+        entry = self._read_spool_entry(run_id)
+        if entry is None:
+            return
+        if not entry["init_org_id"] and entry["stage"] == ResultUploadStage.PLAIN:
+            self.log.critical(
+                "Organization that created the task of run %s is unknown: cannot "
+                "send its result to the server as it cannot be encrypted",
+                run_id,
+            )
+            self._discard(run_id)
+            return
+
+        start = time.monotonic()
+        if entry["stage"] == ResultUploadStage.PLAIN:
+            self._encrypt(entry, self._decode(entry["result"]))
+            self._write_spool_entry(run_id, entry)
+
+        if entry["stage"] == ResultUploadStage.ENCRYPTED:
+            entry["result"] = self._encode(
+                self.client.run.upload_result(
+                    self._decode(entry["result"]), entry["blob_store_enabled"]
+                )
+            )
+            entry["stage"] = ResultUploadStage.UPLOADED
+            self._write_spool_entry(run_id, entry)
+
+        # the result is encrypted already, so the run is patched directly rather
+        # than via `client.run.patch`
+        response = self.client.request(
+            f"run/{run_id}",
+            json={**entry["data"], "result": self._decode(entry["result"])},
+            method="patch",
+            attempts_on_timeout=1,
+        )
+        if response and "id" in response:
+            self.log.info("Result of run %s sent to the server", run_id)
+            self._spool_file(run_id).unlink(missing_ok=True)
+            self._forget(run_id)
+            with self._metrics_lock:
+                self._uploaded += 1
+                self._recent_uploads.append((time.monotonic(), entry["size"]))
+            self.log.debug(
+                "Uploading result of run %s took %.2f seconds",
+                run_id,
+                time.monotonic() - start,
+            )
+        elif response and response.get("msg") != "Connection error":
+            # the server rejected the result. This may be temporary (e.g. while the
+            # server is restarting), so retry a limited number of times
+            with self._attempts_lock:
+                rejections = self._rejections.get(run_id, 0) + 1
+                self._rejections[run_id] = rejections
+            if rejections >= self.max_attempts:
+                self.log.error(
+                    "Server rejected the result of run %s %s times, discarding it",
+                    run_id,
+                    rejections,
+                )
+                self._discard(run_id)
+            else:
+                self._retry_later(run_id)
+        else:
+            self._retry_later(run_id)
+
+    def _encrypt(
+        self, entry: dict, result: bytes | str, attempts_on_timeout: int = None
+    ) -> None:
+        """
+        Encrypt the result of a spool entry for the organization that created the
+        task
+
+        Parameters
+        ----------
+        entry: dict
+            Spool entry, which is updated with the encrypted result
+        result: bytes | str
+            Result of the algorithm run
+        attempts_on_timeout: int, optional
+            Number of attempts to retrieve the public key if the server cannot be
+            reached. By default, it is retried until the server is reached.
+
+        Raises
+        ------
+        ValueError
+            If the public key of the organization could not be retrieved
+        """
+        blob_store_enabled = self.client.check_if_blob_store_enabled()
+        public_key = self.client.get_public_key(
+            entry["init_org_id"], attempts_on_timeout=attempts_on_timeout
+        )
+        if public_key is None:
+            raise ValueError(
+                f"Public key of organization {entry['init_org_id']} could not be "
+                "retrieved"
+            )
+        encrypted_result = self.client.run.encrypt_result(
+            result, entry["init_org_id"], blob_store_enabled
+        )
+        entry["blob_store_enabled"] = blob_store_enabled
+        entry["result"] = self._encode(encrypted_result)
+        entry["size"] = len(encrypted_result)
+        entry["stage"] = ResultUploadStage.ENCRYPTED
+
+    def _retry_later(self, run_id: int) -> None:
+        """
+        Queue a result again after an exponential backoff
+
+        Parameters
+        ----------
+        run_id: int
+            ID of the algorithm run
+        """
+        with self._attempts_lock:
+            retries = self._retries.get(run_id, 0)
+            self._retries[run_id] = retries + 1
+        delay = min(2**retries, RESULT_UPLOAD_MAX_BACKOFF)
+        self.log.info(
+            "Retrying upload of result of run %s in %s seconds", run_id, delay
+        )
+        timer = threading.Timer(delay, self._queue.put, args=(run_id,))
+        timer.daemon = True
+        timer.start()
+
+    def _discard(self, run_id: int) -> None:
+        """
+        Remove a result that cannot be uploaded from the spool
+
+        Parameters
+        ----------
+        run_id: int
+            ID of the algorithm run
+        """
+        self._spool_file(run_id).unlink(missing_ok=True)
+        self._forget(run_id)
+        with self._metrics_lock:
+            self._failed += 1
+
+    def _forget(self, run_id: int) -> None:
+        """
+        Forget the retries of a result that has left the spool
+
+        Parameters
+        ----------
+        run_id: int
+            ID of the algorithm run
+        """
+        with self._attempts_lock:
+            self._retries.pop(run_id, None)
+            self._rejections.pop(run_id, None)
+
+    def _prune_recent_uploads(self) -> None:
+        """Forget uploads that are older than the throughput window"""
+        threshold = time.monotonic() - RESULT_UPLOAD_THROUGHPUT_WINDOW
+        while self._recent_uploads and self._recent_uploads[0][0] < threshold:
+            self._recent_uploads.popleft()
+
+    def _spool_file(self, run_id: int) -> Path:
+        """
+        Get the path of the spool file of a run
+
+        Parameters
+        ----------
+        run_id: int
+            ID of the algorithm run
+
+        Returns
+        -------
+        Path
+            Path of the spool file
+        """
+        return self.spool_dir / f"{run_id}.json"
+
+    def _read_spool_entry(self, run_id: int) -> dict | None:
+        """
+        Read the spooled result of a run
+
+        Parameters
+        ----------
+        run_id: int
+            ID of the algorithm run
+
+        Returns
+        -------
+        dict | None
+            Spooled result, or None if it is no longer in the spool
+        """
+        try:
+            with open(self._spool_file(run_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_spool_entry(self, run_id: int, entry: dict) -> None:
+        """
+        Atomically write the spooled result of a run
+
+        Parameters
+        ----------
+        run_id: int
+            ID of the algorithm run
+        entry: dict
+            Spooled result
+        """
+        spool_file = self._spool_file(run_id)
+        tmp_file = spool_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, spool_file)
+
+    @staticmethod
+    def _encode(value: str | bytes) -> dict:
+        """
+        Encode a (possibly binary) result so that it can be stored as JSON
+
+        Parameters
+        ----------
+        value: str | bytes
+            Result to encode
+
+        Returns
+        -------
+        dict
+            JSON serializable representation of the result
+        """
+        if isinstance(value, bytes):
+            return {"bytes": base64.b64encode(value).decode("ascii")}
+        return {"str": value}
+
+    @staticmethod
+    def _decode(value: dict) -> str | bytes:
+        """
+        Decode a result that was encoded with `_encode`
+
+        Parameters
+        ----------
+        value: dict
+            Encoded result
+
+        Returns
+        -------
+        str | bytes
+            Decoded result
+        """
+        if "bytes" in value:
+            return base64.b64decode(value["bytes"])
+        return value["str"]
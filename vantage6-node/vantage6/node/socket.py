@@ -18,6 +18,26 @@ class NodeTaskNamespace(ClientNamespace):
         super().__init__(*args, **kwargs)
         self.log = logging.getLogger(logger_name(__name__))
 
+    def trigger_event(self, event: str, *args):
+        """
+        Dispatch an incoming event to its handler, and keep track of the
+        sequence number of the last event that was received from the server.
+
+        Parameters
+        ----------
+        event: str
+            Name of the event
+        *args
+            Arguments of the event
+        """
+        if self.node_worker_ref and args and isinstance(args[0], dict):
+            sequence = args[0].get("sequence")
+            if isinstance(sequence, int):
+                self.node_worker_ref.last_event_sequence = max(
+                    self.node_worker_ref.last_event_sequence, sequence
+                )
+        return super().trigger_event(event, *args)
+
     def on_message(self, msg):
         """
         Receive messages over socket connection
@@ -41,15 +61,56 @@ class NodeTaskNamespace(ClientNamespace):
         the server when the node connects to the socket namespace.
         """
         self.log.info("(Re)Connected to the /tasks namespace")
+        # public keys may have changed while the node was disconnected
+        self.node_worker_ref.client.invalidate_public_key()
         self.node_worker_ref.sync_task_queue_with_server()
         self.log.debug("Tasks synced again with the server...")
         self.node_worker_ref.share_node_details()
+        self.replay_missed_events()
+
+    def replay_missed_events(self) -> None:
+        """
+        Request the events that were sent while the node was disconnected, e.g.
+        instructions to kill containers.
+        """
+        since = self.node_worker_ref.last_event_sequence
+        if not since:
+            return
+
+        def on_replayed(ack: dict | None = None) -> None:
+            if ack is None:
+                # servers that do not keep an event log do not acknowledge
+                return
+            self.log.info(
+                "Replayed missed events up to sequence %s", ack.get("last_sequence")
+            )
+            if not ack.get("complete", True):
+                self.log.warning(
+                    "Not all events since sequence %s could be replayed, as the "
+                    "server no longer has all of them",
+                    since,
+                )
+
+        self.log.debug("Requesting events since sequence %s", since)
+        self.emit("replay_events", {"since": since}, callback=on_replayed)
 
     def on_disconnect(self):
         """Actions to be taken on socket disconnect event."""
         # self.node_worker_ref.socketIO.disconnect()
         self.log.info("Disconnected from the server")
 
+    def on_organization_public_key_updated(self, data: dict):
+        """
+        Forget the cached public key of an organization that has changed it
+
+        Parameters
+        ----------
+        data: dict
+            Dictionary with the ``id`` of the organization
+        """
+        self.log.debug("Public key of organization %s was updated", data.get("id"))
+        self.node_worker_ref.client.invalidate_public_key(data.get("id"))
+
     def on_new_task(self, data: dict):
         """
         Actions to be taken when node is notified of new task by server
@@ -62,16 +123,36 @@ class NodeTaskNamespace(ClientNamespace):
                 ID of the new task
             parent_id: int | None
                 ID of the parent task (if any)
-        """
-        if self.node_worker_ref:
-            task_id = data.get("id")
-            self.node_worker_ref.get_task_and_add_to_queue(task_id)
-            self.log.info(f"New task has been added task_id={task_id}")
-        else:
+            runs: list[dict], optional
+                The runs of the task that this node should execute. Only
+                included in the message that is sent to this node specifically.
+            organization_ids: list[int], optional
+                IDs of the organizations that participate in the task. Only
+                included in the message that is sent to the entire collaboration.
+            replayed: bool, optional
+                Whether the event was missed by the node and is sent again
+        """
+        if not self.node_worker_ref:
             self.log.critical(
                 "Node reference is not set in socket namespace; cannot create "
                 "new task!"
             )
+            return
+
+        task_id = data.get("id")
+        if "runs" in data:
+            # runs that were created while the node was disconnected have already
+            # been retrieved when syncing with the server, and are skipped
+            self.node_worker_ref.add_runs_to_queue(data["runs"])
+            self.log.info(f"New task has been added task_id={task_id}")
+        elif "organization_ids" in data:
+            # the server sends the runs for this node in a separate message, so
+            # this message to the entire collaboration can be ignored
+            self.log.debug(f"Collaboration received new task task_id={task_id}")
+        else:
+            # servers that do not send the runs to the nodes directly
+            self.node_worker_ref.get_task_and_add_to_queue(task_id)
+            self.log.info(f"New task has been added task_id={task_id}")
 
     def on_algorithm_status_change(self, data: dict):
         """
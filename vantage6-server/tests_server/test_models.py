@@ -3,7 +3,9 @@ import unittest
 import yaml
 import datetime
 
+from sqlalchemy import event, inspect
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload, undefer
 
 from vantage6.server.controller.fixture import load
 from vantage6.server.model.base import Database, DatabaseSessionManager
@@ -20,8 +22,10 @@ from vantage6.server.model import (
     Node,
     Rule,
     Role,
+    EventLog,
 )
 from vantage6.server.model.rule import Scope, Operation
+from vantage6.common.task_status import TaskStatus
 
 
 log = logging.getLogger(__name__.split(".")[-1])
@@ -163,6 +167,19 @@ class TestNodeModel(TestBaseModel):
         node.save()
         self.assertIsInstance(Node.get_by_api_key("some-secret-monkeys"), Node)
 
+    def test_get_by_api_key_without_index(self):
+        # nodes created before the API key index was introduced get an index when
+        # they are first looked up
+        node = Node(name="legacy node", api_key="legacy-api-key")
+        node.save()
+        node.api_key_index = None
+        node.save()
+
+        self.assertIsNone(Node.get_by_api_key("wrong-api-key"))
+        self.assertEqual(Node.get_by_api_key("legacy-api-key"), node)
+        self.assertEqual(node.api_key_index, Node.index_api_key("legacy-api-key"))
+        self.assertEqual(Node.get_by_api_key("legacy-api-key"), node)
+
     def test_relations(self):
         node = Node.get()[0]
         self.assertIsNotNone(node)
@@ -240,6 +257,101 @@ class TestRunModel(TestBaseModel):
     #     for result in Result.get():
     #         self.assertFalse(result.complete)
 
+    def test_append_log(self):
+        run = Run(task=Task(name="unit_task"), organization=Organization.get()[0])
+        run.save()
+        run.append_log("first line\n")
+        run.append_log("second line\n")
+        run.save()
+        self.assertEqual(run.log_segments.count(), 2)
+        self.assertEqual(run.log_size, 23)
+        self.assertEqual(run.get_log(), ("first line\nsecond line\n", 0, 23))
+        self.assertEqual(run.get_log(11), ("second line\n", 11, 23))
+
+        # oldest segments are removed when the log becomes too large
+        run.append_log("third line\n", max_size=20)
+        run.save()
+        self.assertEqual(run.log_segments.count(), 2)
+        self.assertEqual(run.get_log(), ("second line\nthird line\n", 11, 34))
+
+        # the complete log sent by the node when the run is finished takes
+        # precedence over the log segments
+        run.log = "complete log"
+        run.save()
+        self.assertEqual(run.get_log(9), ("log", 9, 12))
+
+    def test_node_query_count(self):
+        session = DatabaseSessionManager.get_session()
+        statements = []
+
+        def count_statement(*args):
+            statements.append(args[2])
+
+        def query_count(num_runs: int) -> int:
+            organizations = [Organization() for _ in range(num_runs)]
+            collaboration = Collaboration(organizations=organizations)
+            nodes = [
+                Node(organization=organization, collaboration=collaboration)
+                for organization in organizations
+            ]
+            task = Task(collaboration=collaboration)
+            for node in nodes:
+                node.save()
+                Run(task=task, organization=node.organization).save()
+            session.expire_all()
+
+            statements.clear()
+            event.listen(Database().engine, "before_cursor_execute", count_statement)
+            try:
+                runs = (
+                    session.query(Run)
+                    .filter(Run.task_id == task.id)
+                    .order_by(Run.id)
+                    .options(selectinload(Run.node))
+                    .all()
+                )
+                self.assertEqual(
+                    [run.node.id for run in runs], [node.id for node in nodes]
+                )
+            finally:
+                event.remove(
+                    Database().engine, "before_cursor_execute", count_statement
+                )
+            return len(statements)
+
+        self.assertEqual(query_count(2), query_count(10))
+
+    def test_payload_deferred(self):
+        run = Run(
+            task=Task(name="unit_task"),
+            organization=Organization.get()[0],
+            input="input",
+            result="result",
+            log="log",
+        )
+        run.save()
+        session = DatabaseSessionManager.get_session()
+        session.expire_all()
+
+        # the input, result and log are only loaded when they are accessed
+        run = session.query(Run).filter(Run.id == run.id).one()
+        unloaded = inspect(run).unloaded
+        self.assertTrue({"input", "result", "log"} <= unloaded)
+        self.assertNotIn("status", unloaded)
+        self.assertEqual(run.input, "input")
+        self.assertEqual(run.result, "result")
+        self.assertEqual(run.log, "log")
+
+        session.expire_all()
+        run = (
+            session.query(Run)
+            .filter(Run.id == run.id)
+            .options(undefer(Run.input))
+            .one()
+        )
+        self.assertNotIn("input", inspect(run).unloaded)
+        run.delete()
+
     def test_relations(self):
         run = Run.get()[0]
         self.assertIsInstance(run.organization, Organization)
@@ -301,6 +413,64 @@ class TestTaskModel(TestBaseModel):
         # Ensure ordering is by TaskDatabase.id.
         self.assertEqual(str(order_by[0]), str(TaskDatabase.id.expression))
 
+    def test_status_follows_runs(self):
+        collaboration = Collaboration.get()[0]
+        task = Task(name="status_task", collaboration=collaboration)
+        run1 = Run(task=task, status=TaskStatus.PENDING.value)
+        run2 = Run(task=task, status=TaskStatus.ACTIVE.value)
+        run1.save()
+        run2.save()
+        self.assertEqual(task.status, TaskStatus.ACTIVE.value)
+        self.assertIsNone(task.finished_at)
+
+        finished_at = datetime.datetime(2024, 1, 1, 12, 0)
+        for run in (run1, run2):
+            run.status = TaskStatus.COMPLETED.value
+            run.finished_at = finished_at
+            run.save()
+        self.assertEqual(Task.get(task.id).status, TaskStatus.COMPLETED.value)
+        self.assertEqual(Task.get(task.id).finished_at, finished_at)
+
+        run2.status = TaskStatus.CRASHED.value
+        run2.save()
+        self.assertEqual(Task.get(task.id).status, TaskStatus.CRASHED.value)
+        self.assertIsNone(Task.get(task.id).finished_at)
+
+        # tasks can be filtered on their status in the database
+        session = DatabaseSessionManager.get_session()
+        crashed = session.query(Task).filter(Task.status == TaskStatus.CRASHED.value)
+        self.assertIn(task.id, [task_.id for task_ in crashed])
+
+        run2.delete()
+        self.assertEqual(Task.get(task.id).status, TaskStatus.COMPLETED.value)
+
+
+class TestEventLogModel(TestBaseModel):
+    def test_add_and_get_since(self):
+        collaboration = Collaboration(name="event_log_collaboration")
+        collaboration.save()
+        room = f"collaboration_{collaboration.id}"
+        ids = [
+            EventLog.add(collaboration.id, room, "status_update", {"run_id": i}).id
+            for i in range(3)
+        ]
+
+        events = EventLog.get_since(ids[0], [room])
+        self.assertEqual([event.id for event in events], ids[1:])
+        self.assertEqual(events[0].event, "status_update")
+        self.assertEqual(events[0].payload, {"run_id": 1, "sequence": ids[1]})
+        self.assertEqual(EventLog.get_since(0, ["other_room"]), [])
+        self.assertFalse(EventLog.is_truncated(collaboration.id, 0))
+
+        # oldest events are removed when the collaboration has too many events
+        entry = EventLog.add(
+            collaboration.id, room, "status_update", {"run_id": 3}, max_events=2
+        )
+        events = EventLog.get_since(0, [room])
+        self.assertEqual([event.id for event in events], [ids[2], entry.id])
+        self.assertTrue(EventLog.is_truncated(collaboration.id, 0, max_events=2))
+        self.assertFalse(EventLog.is_truncated(collaboration.id, ids[1], max_events=2))
+
 
 class TestRuleModel(TestBaseModel):
     def test_read(self):
@@ -1,5 +1,6 @@
 from uuid import uuid1
 import unittest
+import gzip
 import logging
 import json
 import uuid
@@ -7,24 +8,34 @@ import random
 import string
 import yaml
 import datetime
+import tempfile
 
 from http import HTTPStatus
+from pathlib import Path
 from unittest.mock import MagicMock, patch
+import brotli
 from flask import Response as BaseResponse
 from flask.testing import FlaskClient
 from flask_socketio import SocketIO
+from sqlalchemy import event
 from werkzeug.utils import cached_property
 
 from vantage6.common import logger_name
-from vantage6.common.globals import APPNAME, InstanceType
+from vantage6.common.globals import (
+    APPNAME,
+    LOCAL_SUBTASK_INPUT_PREFIX,
+    InstanceType,
+)
 from vantage6.common.task_status import TaskStatus
 from vantage6.common.serialization import serialize
-from vantage6.common import bytes_to_base64s
+from vantage6.common import base64s_to_bytes, bytes_to_base64s
 from vantage6.backend.common import test_context
 from vantage6.server.globals import PACKAGE_FOLDER
 from vantage6.server import ServerApp
 from vantage6.server.default_roles import DefaultRole
 from vantage6.backend.common import session
+from vantage6.server.resource import ServicesResources
+from vantage6.server.resource.common.output_schema import OrganizationSchema
 from vantage6.server.resource.event import kill_task
 from vantage6.server.model import (
     Rule,
@@ -43,6 +54,13 @@ from vantage6.server._version import __version__
 from vantage6.server.model.base import Database, DatabaseSessionManager
 from vantage6.server.controller.fixture import load
 
+try:
+    from vantage6.common.client.node_client import NodeClient
+    from vantage6.node import proxy_server
+    from vantage6.node.local_subtasks import LocalSubtaskStore
+except ImportError:
+    proxy_server = None
+
 
 logger = logger_name(__name__)
 log = logging.getLogger(logger)
@@ -54,6 +72,18 @@ class Response(BaseResponse):
         return json.loads(self.data)
 
 
+class ProxiedResponse:
+    """Response of the test client, in the form in which `requests` returns it"""
+
+    def __init__(self, response: Response):
+        self.status_code = response.status_code
+        self.content = response.data
+        self.headers = response.headers
+
+    def json(self):
+        return json.loads(self.content)
+
+
 class TestNode(FlaskClient):
     def open(self, *args, **kwargs):
         if "json" in kwargs:
@@ -399,6 +429,45 @@ class TestResources(unittest.TestCase):
         run = self.app.get("/api/run/1?include=task", headers=headers)
         self.assertEqual(run.status_code, 200)
 
+    def test_run_log(self):
+        org = Organization(name=str(uuid.uuid1()))
+        col = Collaboration(name=str(uuid.uuid1()), organizations=[org])
+        task = Task(collaboration=col, init_org=org)
+        run = Run(task=task, organization=org, status=TaskStatus.ACTIVE.value)
+        run.save()
+        run.append_log("first line\n")
+        run.append_log("second line\n")
+        run.save()
+
+        headers = self.login("root")
+        response = self.app.get(f"/api/run/{run.id}/log", headers=headers)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json["log"], "first line\nsecond line\n")
+        self.assertEqual(response.json["next_offset"], 23)
+        self.assertFalse(response.json["complete"])
+
+        # only new log lines are returned when following the log
+        run.append_log("third line\n")
+        run.save()
+        response = self.app.get(f"/api/run/{run.id}/log?offset=23", headers=headers)
+        self.assertEqual(response.json["log"], "third line\n")
+        self.assertEqual(response.json["offset"], 23)
+        self.assertEqual(response.json["next_offset"], 34)
+
+        response = self.app.get(f"/api/run/{run.id}/log?offset=6", headers=headers)
+        self.assertEqual(response.json["log"], "line\nsecond line\nthird line\n")
+
+        response = self.app.get(f"/api/run/{run.id}/log?offset=a", headers=headers)
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+        response = self.app.get("/api/run/9999/log", headers=headers)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+        run.delete()
+        task.delete()
+        col.delete()
+        org.delete()
+
     def test_run_without_id(self):
         headers = self.login("root")
         result1 = self.app.get("/api/run", headers=headers)
@@ -410,6 +479,41 @@ class TestResources(unittest.TestCase):
         result3 = self.app.get("/api/run?task_id=1", headers=headers)
         self.assertEqual(result3.status_code, 200)
 
+    def test_run_list_query_count(self):
+        headers = self.login("root")
+        statements = []
+
+        def count_statement(*args):
+            statements.append(args[2])
+
+        def query_count(endpoint: str, num_runs: int) -> int:
+            organizations = [Organization() for _ in range(num_runs)]
+            collaboration = Collaboration(organizations=organizations)
+            task = Task(collaboration=collaboration, image="some-image")
+            for organization in organizations:
+                Node(organization=organization, collaboration=collaboration).save()
+                Run(task=task, organization=organization).save()
+
+            statements.clear()
+            event.listen(Database().engine, "before_cursor_execute", count_statement)
+            try:
+                result = self.app.get(
+                    f"/api/{endpoint}?task_id={task.id}&per_page={num_runs}"
+                    "&include=task",
+                    headers=headers,
+                )
+            finally:
+                event.remove(
+                    Database().engine, "before_cursor_execute", count_statement
+                )
+            self.assertEqual(result.status_code, HTTPStatus.OK)
+            self.assertEqual(len(result.json["data"]), num_runs)
+            return len(statements)
+
+        # the number of queries does not depend on the number of runs in a page
+        for endpoint in ("run", "result"):
+            self.assertEqual(query_count(endpoint, 2), query_count(endpoint, 10))
+
     def test_run_patch_fails_pending_siblings(self):
         org1 = Organization(name=str(uuid.uuid1()))
         org2 = Organization(name=str(uuid.uuid1()))
@@ -675,6 +779,144 @@ class TestResources(unittest.TestCase):
         result = self.app.get("/api/rule", headers=headers)
         self.assertEqual(result.status_code, 200)
 
+    def test_cursor_pagination(self):
+        headers = self.login("root")
+        _, rules = self.paginated_list("/api/rule?per_page=7", headers)
+        rule_ids = sorted(rule["id"] for rule in rules)
+
+        # browse all rules with a cursor, following the 'next' links
+        result = self.app.get("/api/rule?per_page=7&cursor=", headers=headers)
+        self.assertEqual(result.status_code, HTTPStatus.OK)
+        self.assertNotIn("total-count", result.headers)
+        self.assertNotIn("last", result.json["links"])
+        cursor_ids = [rule["id"] for rule in result.json["data"]]
+        while "next" in result.json["links"]:
+            result = self.app.get(result.json["links"]["next"], headers=headers)
+            self.assertEqual(result.status_code, HTTPStatus.OK)
+            cursor_ids += [rule["id"] for rule in result.json["data"]]
+        self.assertEqual(cursor_ids, rule_ids)
+
+        # descending order, and the total count on request
+        result = self.app.get(
+            f"/api/rule?per_page=7&sort=-id&total=true&cursor={rule_ids[10]}",
+            headers=headers,
+        )
+        self.assertEqual([rule["id"] for rule in result.json["data"]], rule_ids[9:2:-1])
+        self.assertEqual(int(result.headers["total-count"]), len(rule_ids))
+
+        # only the id can be used as ordering key, and the cursor is an id
+        for args in ("cursor=&sort=name", "cursor=abc", "cursor=&per_page=0"):
+            result = self.app.get(f"/api/rule?{args}", headers=headers)
+            self.assertEqual(result.status_code, HTTPStatus.BAD_REQUEST)
+            self.assertIn("msg", result.json)
+
+    def test_cursor_pagination_of_runs(self):
+        headers = self.login("root")
+        for endpoint in ("run", "result"):
+            result = self.app.get(f"/api/{endpoint}?cursor=", headers=headers)
+            self.assertEqual(result.status_code, HTTPStatus.OK)
+
+            for args in ("cursor=&sort=task_id", "cursor=1.5"):
+                result = self.app.get(f"/api/{endpoint}?{args}", headers=headers)
+                self.assertEqual(result.status_code, HTTPStatus.BAD_REQUEST)
+                self.assertIn("cursor", result.json["msg"])
+
+    def test_sparse_fieldsets(self):
+        headers = self.login("root")
+        org = Organization.get()[0]
+
+        # only the requested fields are returned, unknown fields are ignored
+        result = self.app.get(
+            f"/api/organization/{org.id}?fields=id,name,unknown", headers=headers
+        )
+        self.assertEqual(result.status_code, HTTPStatus.OK)
+        self.assertEqual(result.json, {"id": org.id, "name": org.name})
+
+        # fields can be given like the include argument, also for listings
+        result = self.app.get(
+            "/api/rule?fields=id&fields=name,scope&per_page=3", headers=headers
+        )
+        self.assertEqual(result.status_code, HTTPStatus.OK)
+        for rule in result.json["data"]:
+            self.assertEqual(set(rule), {"id", "name", "scope"})
+
+        # without (known) fields, everything is returned
+        for args in ("", "?fields=unknown"):
+            result = self.app.get(f"/api/organization/{org.id}{args}", headers=headers)
+            self.assertEqual(result.status_code, HTTPStatus.OK)
+            self.assertIn("collaborations", result.json)
+
+        # the limited schema is created with the same options as the given one
+        with self.server.app.test_request_context("/?fields=id,name"):
+            for schema in (
+                OrganizationSchema(many=True, dump_only=("name",)),
+                OrganizationSchema(context={"request": "context"}),
+            ):
+                limited = ServicesResources.select_fields(schema)
+                self.assertEqual(set(limited.fields), {"id", "name"})
+                self.assertEqual(limited.many, schema.many)
+                self.assertEqual(limited.dump_only, schema.dump_only)
+                self.assertEqual(limited.context, schema.context)
+
+    def test_compressed_response(self):
+        headers = self.login("root")
+        uncompressed = self.app.get("/api/rule?per_page=50", headers=headers)
+        self.assertNotIn("Content-Encoding", uncompressed.headers)
+
+        for encoding, decompress in (
+            ("gzip", gzip.decompress),
+            ("br", brotli.decompress),
+        ):
+            result = self.app.get(
+                "/api/rule?per_page=50",
+                headers={**headers, "Accept-Encoding": f"{encoding}, deflate"},
+            )
+            self.assertEqual(result.status_code, HTTPStatus.OK)
+            self.assertEqual(result.headers["Content-Encoding"], encoding)
+            self.assertIn("Accept-Encoding", result.headers["Vary"])
+            self.assertLess(len(result.data), len(uncompressed.data))
+            self.assertEqual(json.loads(decompress(result.data)), uncompressed.json)
+
+        # small responses are not compressed
+        result = self.app.get(
+            "/api/rule?per_page=1&fields=id",
+            headers={**headers, "Accept-Encoding": "gzip"},
+        )
+        self.assertNotIn("Content-Encoding", result.headers)
+
+    def test_conditional_get(self):
+        headers = self.login("root")
+        org = Organization(name="etag organization")
+        org.save()
+        url = f"/api/organization/{org.id}"
+
+        result = self.app.get(url, headers=headers)
+        self.assertEqual(result.status_code, HTTPStatus.OK)
+        etag = result.headers["ETag"]
+
+        # the resource did not change: no body is sent
+        result = self.app.get(url, headers={**headers, "If-None-Match": etag})
+        self.assertEqual(result.status_code, HTTPStatus.NOT_MODIFIED)
+        self.assertEqual(result.data, b"")
+
+        # the resource changed: it is sent again, with a new ETag
+        result = self.app.patch(url, headers=headers, json={"name": "new name"})
+        self.assertEqual(result.status_code, HTTPStatus.OK)
+        self.assertNotIn("ETag", result.headers)
+        result = self.app.get(url, headers={**headers, "If-None-Match": etag})
+        self.assertEqual(result.status_code, HTTPStatus.OK)
+        self.assertEqual(result.json["name"], "new name")
+        self.assertNotEqual(result.headers["ETag"], etag)
+
+        # lists have an ETag as well
+        result = self.app.get("/api/rule", headers=headers)
+        result = self.app.get(
+            "/api/rule", headers={**headers, "If-None-Match": result.headers["ETag"]}
+        )
+        self.assertEqual(result.status_code, HTTPStatus.NOT_MODIFIED)
+
+        org.delete()
+
     def test_view_roles(self):
         headers = self.login("root")
         result = self.app.get("/api/role", headers=headers)
@@ -1926,6 +2168,37 @@ class TestResources(unittest.TestCase):
         org3.delete()
         col.delete()
 
+    def test_cached_permissions_follow_rule_changes(self):
+        rule = Rule.get_by_("organization", Scope.ORGANIZATION, Operation.VIEW)
+        user = self.create_user(rules=[rule])
+        headers = self.login(user.username)
+        url = f"/api/organization/{user.organization.id}"
+        result = self.app.get(url, headers=headers)
+        self.assertEqual(result.status_code, HTTPStatus.OK)
+
+        # the permissions of the user are cached, but removing the rule takes
+        # effect immediately
+        user.rules = []
+        user.save()
+        result = self.app.get(url, headers=headers)
+        self.assertEqual(result.status_code, HTTPStatus.UNAUTHORIZED)
+
+        # the same holds for rules that the user has through a role
+        role = Role(name=str(uuid.uuid1()), rules=[rule])
+        user.roles = [role]
+        user.save()
+        result = self.app.get(url, headers=headers)
+        self.assertEqual(result.status_code, HTTPStatus.OK)
+
+        role.rules = []
+        role.save()
+        result = self.app.get(url, headers=headers)
+        self.assertEqual(result.status_code, HTTPStatus.UNAUTHORIZED)
+
+        # cleanup
+        user.delete()
+        role.delete()
+
     def test_view_organization_as_node_permission(self):
         node, api_key = self.create_node()
         headers = self.login_node(api_key)
@@ -3369,6 +3642,195 @@ class TestResources(unittest.TestCase):
         col2.delete()
         study.delete()
 
+    def test_create_task_notifies_targeted_nodes(self):
+        org = Organization()
+        org2 = Organization()
+        col = Collaboration(organizations=[org, org2], encrypted=False)
+        col.save()
+        node = Node(organization=org, collaboration=col)
+        node.save()
+        node2 = Node(organization=org2, collaboration=col)
+        node2.save()
+
+        rule = Rule.get_by_("task", Scope.COLLABORATION, Operation.CREATE)
+        headers = self.create_user_and_login(org, rules=[rule])
+        task_json = {
+            "collaboration_id": col.id,
+            "organizations": [
+                {"id": org.id, "input": bytes_to_base64s(serialize({"x": 1}))}
+            ],
+            "image": "some-image",
+        }
+        with patch.object(self.server.socketio, "emit") as emit:
+            results = self.app.post("/api/task", headers=headers, json=task_json)
+        self.assertEqual(results.status_code, HTTPStatus.CREATED)
+
+        # the collaboration is told which organizations participate, and only the
+        # node of the participating organization receives its run
+        events = {call.kwargs["room"]: call.args for call in emit.call_args_list}
+        self.assertEqual(
+            events[f"collaboration_{col.id}"][1]["organization_ids"], [org.id]
+        )
+        self.assertNotIn(f"node_{node2.id}", events)
+        runs = events[f"node_{node.id}"][1]["runs"]
+        self.assertEqual(len(runs), 1)
+        self.assertEqual(runs[0]["task"]["id"], results.json["id"])
+        self.assertIn("input", runs[0])
+
+        # cleanup
+        Task.get(results.json["id"]).delete()
+        node.delete()
+        node2.delete()
+        org.delete()
+        org2.delete()
+        col.delete()
+
+    def test_create_task_with_local_input_as_container(self):
+        org = Organization()
+        org2 = Organization()
+        col = Collaboration(organizations=[org, org2], encrypted=False)
+        parent_task = Task(collaboration=col, image="some-image")
+        parent_task.save()
+        Run(organization=org, task=parent_task, status=TaskStatus.PENDING).save()
+        self.create_node(organization=org2, collaboration=col)
+        headers = self.login_container(
+            collaboration=col, organization=org, task=parent_task
+        )
+        input_ = bytes_to_base64s(serialize({"method": "dummy"}))
+        reference = f"{LOCAL_SUBTASK_INPUT_PREFIX}{uuid.uuid4().hex}"
+
+        def post_task(organizations: list[dict], headers: dict) -> Response:
+            return self.app.post(
+                "/api/task",
+                headers=headers,
+                json={
+                    "organizations": organizations,
+                    "collaboration_id": col.id,
+                    "image": "some-image",
+                },
+            )
+
+        # the node of the container keeps the input for its own organization
+        results = post_task(
+            [{"id": org.id, "input": reference}, {"id": org2.id, "input": input_}],
+            headers,
+        )
+        self.assertEqual(results.status_code, HTTPStatus.CREATED)
+        task = Task.get(results.json["id"])
+        inputs = {run.organization_id: run.input for run in task.runs}
+        self.assertEqual(inputs, {org.id: reference, org2.id: input_})
+
+        # the input for other organizations cannot be kept locally
+        results = post_task([{"id": org2.id, "input": reference}], headers)
+        self.assertEqual(results.status_code, HTTPStatus.BAD_REQUEST)
+
+        # users cannot send references to input kept by a node
+        rule = Rule.get_by_("task", Scope.COLLABORATION, Operation.CREATE)
+        user_headers = self.create_user_and_login(org, rules=[rule])
+        results = post_task([{"id": org.id, "input": reference}], user_headers)
+        self.assertEqual(results.status_code, HTTPStatus.BAD_REQUEST)
+
+    @unittest.skipIf(proxy_server is None, "vantage6-node is not installed")
+    def test_local_subtask_through_node_proxy(self):
+        org = Organization()
+        org2 = Organization()
+        col = Collaboration(organizations=[org, org2], encrypted=False)
+        parent_task = Task(collaboration=col, image="some-image")
+        parent_task.save()
+        Run(organization=org, task=parent_task, status=TaskStatus.PENDING).save()
+        node, api_key = self.create_node(organization=org, collaboration=col)
+        self.create_node(organization=org2, collaboration=col)
+        node_headers = self.login_node(api_key)
+        container_headers = self.login_container(
+            node=node, task=parent_task, api_key=api_key
+        )
+
+        # the proxy server of the node, which keeps the input for its own
+        # organization locally and forwards its requests to this server
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        local_subtasks = LocalSubtaskStore(Path(temp_dir.name), retention=3600)
+        local_subtasks.start()
+        client = NodeClient("http://server", 80)
+        client.whoami = MagicMock(organization_id=org.id)
+        client.cryptor = MagicMock()
+        client.cryptor.decrypt.side_effect = base64s_to_bytes
+
+        def get_method(method: str) -> callable:
+            def send(url, json=None, params=None, headers=None, stream=False):
+                path = url.removeprefix("http://server")
+                response = self.app.open(
+                    path,
+                    method=method.upper(),
+                    json=json,
+                    query_string=None if "?" in path else params,
+                    headers=headers,
+                )
+                return ProxiedResponse(response)
+
+            return send
+
+        patchers = [
+            patch.object(client, "is_encrypted_collaboration", return_value=False),
+            patch.object(client, "check_if_blob_store_enabled", return_value=False),
+            patch.object(proxy_server, "get_method", side_effect=get_method),
+            patch.object(proxy_server, "server_url", "http://server/api"),
+            patch.object(proxy_server, "sleep"),
+            patch.dict(
+                proxy_server.app.config,
+                {"SERVER_IO": client, "LOCAL_SUBTASKS": local_subtasks},
+            ),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        proxy = proxy_server.app.test_client()
+
+        # the algorithm creates a subtask through the proxy server
+        own_input = serialize({"method": "partial", "kwargs": {"local": True}})
+        other_input = bytes_to_base64s(serialize({"method": "partial"}))
+        response = proxy.post(
+            "/task",
+            json={
+                "organizations": [
+                    {"id": org.id, "input": bytes_to_base64s(own_input)},
+                    {"id": org2.id, "input": other_input},
+                ],
+                "collaboration_id": col.id,
+                "image": "some-image",
+            },
+            headers=container_headers,
+        )
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        task = Task.get(json.loads(response.data)["id"])
+
+        # the server received the input of the other organization, but only a
+        # reference to the input of the node's own organization
+        runs = {run.organization_id: run for run in task.runs}
+        self.assertEqual(runs[org2.id].input, other_input)
+        own_run = runs[org.id]
+        self.assertTrue(local_subtasks.is_input_reference(own_run.input))
+
+        # the node starts the run with the input that it kept, and keeps the
+        # result as well
+        self.assertEqual(local_subtasks.start_run(own_run.id, own_run.input), own_input)
+        reference = local_subtasks.store_result(own_run.id, b"local result")
+        response = self.app.patch(
+            f"/api/run/{own_run.id}",
+            headers=node_headers,
+            json={"result": reference, "status": TaskStatus.COMPLETED.value},
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+        # the proxy server resolves the reference when the algorithm retrieves
+        # the result
+        response = self.app.get(f"/api/result/{own_run.id}", headers=container_headers)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json["result"], reference)
+        with proxy_server.app.app_context():
+            run = proxy_server.decrypt_result(response.json)
+        self.assertEqual(run["result"], bytes_to_base64s(b"local result"))
+
     def test_create_task_permissions_as_container(self):
         org = Organization()
         col = Collaboration(organizations=[org], encrypted=False)
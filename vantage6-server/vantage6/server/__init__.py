@@ -19,7 +19,6 @@ import enum
 import importlib
 import logging
 import uuid
-import json
 import time
 import datetime as dt
 import traceback
@@ -55,14 +54,18 @@ from vantage6.common.globals import (
     AuthStatus,
     DEFAULT_PROMETHEUS_EXPORTER_PORT,
 )
-from vantage6.backend.common.globals import HOST_URI_ENV, DEFAULT_SUPPORT_EMAIL_ADDRESS
+from vantage6.backend.common.globals import (
+    HOST_URI_ENV,
+    DEFAULT_COMPRESSION_MIN_SIZE,
+    DEFAULT_SUPPORT_EMAIL_ADDRESS,
+)
 from vantage6.backend.common.jsonable import jsonable
-from vantage6.backend.common.permission import RuleNeed
+from vantage6.backend.common.json_response import make_json_response
 from vantage6.backend.common.metrics import Metrics, start_prometheus_exporter
 from vantage6.backend.common.mail_service import MailService
 from vantage6.cli.context.server import ServerContext
 from vantage6.server.model.base import DatabaseSessionManager, Database
-from vantage6.server.permission import PermissionManager
+from vantage6.server.permission import PermissionManager, RuleNeedCache
 from vantage6.server import db
 from vantage6.server.resource.common.output_schema import HATEOASModelSchema
 from vantage6.server.globals import (
@@ -75,6 +78,7 @@ from vantage6.server.globals import (
     MIN_TOKEN_VALIDITY_SECONDS,
     MIN_REFRESH_TOKEN_EXPIRY_DELTA,
     SERVER_MODULE_NAME,
+    DEFAULT_PERMISSION_CACHE_SECONDS,
 )
 from vantage6.server.websockets import DefaultSocketNamespace
 from vantage6.server.default_roles import get_default_roles, DefaultRole
@@ -119,6 +123,14 @@ class ServerApp:
         # Setup SQLAlchemy and Marshmallow for marshalling/serializing
         self.ma = Marshmallow(self.app)
 
+        # Cache of the rules of users, nodes and containers, used when
+        # authenticating requests
+        self.rule_needs = RuleNeedCache(
+            self.ctx.config.get(
+                "permission_cache_seconds", DEFAULT_PERMISSION_CACHE_SECONDS
+            )
+        )
+
         # Setup the Flask-JWT-Extended extension (JWT: JSON Web Token)
         self.jwt = JWTManager(self.app)
         self.configure_jwt()
@@ -517,6 +529,11 @@ class ServerApp:
         # helper to create HATEOAS schemas
         HATEOASModelSchema.api = self.api
 
+        # responses larger than this are compressed, if the client accepts it
+        compression_min_size = self.ctx.config.get(
+            "compression_min_size", DEFAULT_COMPRESSION_MIN_SIZE
+        )
+
         # whatever you get try to json it
         @self.api.representation("application/json")
         # pylint: disable=unused-argument
@@ -545,9 +562,7 @@ class ServerApp:
                 resp = make_response(data, code)
                 return resp
 
-            resp = make_response(json.dumps(data), code)
-            resp.headers.extend(headers or {})
-            return resp
+            return make_json_response(data, code, headers, compression_min_size)
 
     def configure_jwt(self):
         """Configure JWT authentication."""
@@ -647,36 +662,22 @@ class ServerApp:
                 auth = db.Authenticatable.get(identity)
 
                 if isinstance(auth, db.Node):
-                    for rule in db.Role.get_by_name(DefaultRole.NODE).rules:
-                        auth_identity.provides.add(
-                            RuleNeed(
-                                name=rule.name,
-                                scope=rule.scope,
-                                operation=rule.operation,
-                            )
+                    auth_identity.provides.update(
+                        self.rule_needs.get(
+                            DefaultRole.NODE,
+                            lambda: db.Role.get_by_name(DefaultRole.NODE).rules,
                         )
+                    )
 
                 if isinstance(auth, db.User):
-                    # add role permissions
-                    for role in auth.roles:
-                        for rule in role.rules:
-                            auth_identity.provides.add(
-                                RuleNeed(
-                                    name=rule.name,
-                                    scope=rule.scope,
-                                    operation=rule.operation,
-                                )
-                            )
-
-                    # add 'extra' permissions
-                    for rule in auth.rules:
-                        auth_identity.provides.add(
-                            RuleNeed(
-                                name=rule.name,
-                                scope=rule.scope,
-                                operation=rule.operation,
-                            )
+                    # add role permissions and 'extra' permissions
+                    auth_identity.provides.update(
+                        self.rule_needs.get(
+                            ("user", auth.id),
+                            lambda: [rule for role in auth.roles for rule in role.rules]
+                            + list(auth.rules),
                         )
+                    )
 
                 identity_changed.send(
                     current_app._get_current_object(), identity=auth_identity
@@ -685,13 +686,12 @@ class ServerApp:
                 return auth
             else:
                 # container identity
-
-                for rule in db.Role.get_by_name(DefaultRole.CONTAINER).rules:
-                    auth_identity.provides.add(
-                        RuleNeed(
-                            name=rule.name, scope=rule.scope, operation=rule.operation
-                        )
+                auth_identity.provides.update(
+                    self.rule_needs.get(
+                        DefaultRole.CONTAINER,
+                        lambda: db.Role.get_by_name(DefaultRole.CONTAINER).rules,
                     )
+                )
                 identity_changed.send(
                     current_app._get_current_object(), identity=auth_identity
                 )
@@ -777,6 +777,9 @@ class ServerApp:
             log.warning("No root user found! Is this the first run?")
             self._create_super_user()
 
+        # store the status of tasks that were created before it was stored
+        db.Run.initialize_task_status()
+
         return self
 
     def _create_super_user(self) -> None:
@@ -5,6 +5,7 @@ from flask import Response, request
 from http import HTTPStatus
 
 from vantage6.common.enum import AlgorithmViewPolicies, StorePolicies
+from vantage6.common.http_session import get_session
 from vantage6.backend.common.globals import HOST_URI_ENV
 from vantage6.backend.common import get_server_url
 from vantage6.server import db
@@ -317,14 +318,15 @@ def _execute_algo_store_request(
     params = None
     json = None
     method = method.lower()
+    session = get_session("algorithm_store")
     if method == "get":
-        request_function = requests.get
+        request_function = session.get
         params = param_dict
     elif method == "post":
-        request_function = requests.post
+        request_function = session.post
         json = param_dict
     elif method == "delete":
-        request_function = requests.delete
+        request_function = session.delete
         params = param_dict
     else:
         raise ValueError(f"Method {method} not supported")
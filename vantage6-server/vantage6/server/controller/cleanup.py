@@ -2,6 +2,8 @@ import logging
 
 from datetime import datetime, timedelta, timezone
 
+from sqlalchemy.orm import undefer
+
 from vantage6.common.task_status import TaskStatus
 from vantage6.server.model import Run
 from vantage6.server.model.base import DatabaseSessionManager
@@ -34,6 +36,14 @@ def cleanup_runs_data(config: dict, include_input: bool = False):
         )
         return
 
+    # the input and result of runs are only loaded when accessed. They are only
+    # read to delete them from blob storage, so only load them if that is used
+    payload_options = []
+    if azure_config:
+        payload_options.append(undefer(Run.result))
+        if include_input:
+            payload_options.append(undefer(Run.input))
+
     try:
         with session.begin():
             runs = (
@@ -43,14 +53,15 @@ def cleanup_runs_data(config: dict, include_input: bool = False):
                     Run.cleanup_at == None,
                     Run.status == TaskStatus.COMPLETED,
                 )
+                .options(*payload_options)
                 .all()
             )
 
             for run in runs:
                 if (
-                    run.result is not None
-                    and run.blob_storage_used == True
+                    run.blob_storage_used == True
                     and storage_adapter
+                    and run.result is not None
                 ):
                     log.debug(f"Deleting blob: {run.result}")
                     try:
@@ -60,9 +71,9 @@ def cleanup_runs_data(config: dict, include_input: bool = False):
                 run.result = ""
                 if include_input:
                     if (
-                        run.input is not None
-                        and run.blob_storage_used == True
+                        run.blob_storage_used == True
                         and storage_adapter
+                        and run.input is not None
                     ):
                         log.debug(f"Deleting blob: {run.input}")
                         try:
@@ -5,6 +5,7 @@ from vantage6.server.model import (
     AlgorithmStore,
     Authenticatable,
     Collaboration,
+    EventLog,
     Member,
     Node,
     NodeConfig,
@@ -13,6 +14,7 @@ from vantage6.server.model import (
     Role,
     Rule,
     Run,
+    RunLog,
     Study,
     StudyMember,
     Task,
@@ -67,3 +67,19 @@ DEFAULT_EMAILED_TOKEN_VALIDITY_MINUTES = 60
 DEFAULT_MAX_FAILED_ATTEMPTS = 5
 DEFAULT_INACTIVATION_MINUTES = 15
 DEFAULT_BETWEEN_USER_EMAILS_MINUTES = 60
+
+# maximum number of characters of algorithm logs that are stored for a run while
+# it is running. When logs are appended beyond this size, the oldest log segments
+# are removed.
+MAX_RUN_LOG_SIZE = 1_000_000
+
+# maximum number of characters of the input of a run that is sent to the node in the
+# `new_task` event. Larger inputs are retrieved by the node when it starts the run.
+NEW_TASK_EVENT_MAX_INPUT_SIZE = 64 * 1024
+
+# maximum number of websocket events that are kept per collaboration, so that nodes
+# and users that reconnect can request the events they missed
+MAX_EVENTS_PER_COLLABORATION = 1000
+
+# default number of seconds that the rules of a user, node or container are cached
+DEFAULT_PERMISSION_CACHE_SECONDS = 30
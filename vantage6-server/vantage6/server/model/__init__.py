@@ -8,6 +8,7 @@ from vantage6.server.model.member import Member, StudyMember
 from vantage6.server.model.node_config import NodeConfig
 from vantage6.server.model.node import Node
 from vantage6.server.model.task import Task
+from vantage6.server.model.run_log import RunLog
 from vantage6.server.model.run import Run
 from vantage6.server.model.permission import Permission, UserPermission
 from vantage6.server.model.role import Role
@@ -16,3 +17,4 @@ from vantage6.server.model.algorithm_port import AlgorithmPort
 from vantage6.server.model.task_database import TaskDatabase
 from vantage6.server.model.algorithm_store import AlgorithmStore
 from vantage6.server.model.study import Study
+from vantage6.server.model.event_log import EventLog
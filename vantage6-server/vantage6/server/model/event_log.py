@@ -0,0 +1,222 @@
+import datetime
+import json
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, desc, func
+
+from vantage6.server.globals import MAX_EVENTS_PER_COLLABORATION
+from vantage6.server.model.base import Base, DatabaseSessionManager
+
+
+class EventLog(Base):
+    """
+    Websocket event that was sent to the nodes and users of a collaboration
+
+    Events are kept so that nodes and users that were disconnected can request the
+    events they missed. The ID of an event is its sequence number: events that are
+    sent later have a higher ID. Only the most recent events of each collaboration
+    are kept.
+
+    Attributes
+    ----------
+    collaboration_id: int
+        ID of the collaboration in which the event was sent
+    room: str
+        Websocket room to which the event was sent
+    event: str
+        Name of the event
+    data: str
+        JSON encoded data of the event
+    created_at: datetime.datetime
+        Time at which the event was sent
+    """
+
+    # fields
+    collaboration_id = Column(Integer, ForeignKey("collaboration.id"), index=True)
+    room = Column(String, index=True)
+    event = Column(String)
+    data = Column(Text)
+    created_at = Column(
+        DateTime, default=lambda: datetime.datetime.now(datetime.timezone.utc)
+    )
+
+    @property
+    def payload(self) -> dict:
+        """
+        Data of the event, including its sequence number
+
+        Returns
+        -------
+        dict
+            Data of the event with the sequence number as ``sequence``
+        """
+        return {**json.loads(self.data), "sequence": self.id}
+
+    @classmethod
+    def add(
+        cls,
+        collaboration_id: int,
+        room: str,
+        event: str,
+        data: dict,
+        max_events: int = MAX_EVENTS_PER_COLLABORATION,
+    ) -> "EventLog":
+        """
+        Store an event, and remove the oldest events of the collaboration if it
+        has more than `max_events` events.
+
+        Parameters
+        ----------
+        collaboration_id: int
+            ID of the collaboration in which the event is sent
+        room: str
+            Websocket room to which the event is sent
+        event: str
+            Name of the event
+        data: dict
+            Data of the event
+        max_events: int
+            Maximum number of events that are kept per collaboration
+
+        Returns
+        -------
+        EventLog
+            The stored event
+        """
+        return cls.add_many(
+            collaboration_id,
+            [{"room": room, "event": event, "data": data}],
+            max_events=max_events,
+        )[0]
+
+    @classmethod
+    def add_many(
+        cls,
+        collaboration_id: int,
+        events: list[dict],
+        max_events: int = MAX_EVENTS_PER_COLLABORATION,
+    ) -> list["EventLog"]:
+        """
+        Store several events of a collaboration in a single transaction, and
+        remove the oldest events of the collaboration if it has more than
+        `max_events` events.
+
+        Parameters
+        ----------
+        collaboration_id: int
+            ID of the collaboration in which the events are sent
+        events: list[dict]
+            Events to store, each with a ``room``, ``event`` and ``data`` key
+        max_events: int
+            Maximum number of events that are kept per collaboration
+
+        Returns
+        -------
+        list[EventLog]
+            The stored events, in the given order
+        """
+        session = DatabaseSessionManager.get_session()
+        entries = [
+            cls(
+                collaboration_id=collaboration_id,
+                room=event["room"],
+                event=event["event"],
+                data=json.dumps(event["data"]),
+            )
+            for event in events
+        ]
+        session.add_all(entries)
+        session.flush()
+        ids = [entry.id for entry in entries]
+        session.commit()
+        # the committed entries are expired: load them again in a single query
+        # rather than one query per entry
+        session.query(cls).filter(cls.id.in_(ids)).all()
+
+        cutoff = (
+            session.query(cls.id)
+            .filter(cls.collaboration_id == collaboration_id)
+            .order_by(desc(cls.id))
+            .offset(max_events)
+            .limit(1)
+            .scalar()
+        )
+        if cutoff is not None:
+            session.query(cls).filter(cls.collaboration_id == collaboration_id).filter(
+                cls.id <= cutoff
+            ).delete(synchronize_session=False)
+            session.commit()
+        return entries
+
+    @classmethod
+    def get_since(cls, sequence: int, rooms: list[str]) -> list["EventLog"]:
+        """
+        Get the events that were sent to any of the given rooms after the event
+        with the given sequence number.
+
+        Parameters
+        ----------
+        sequence: int
+            Sequence number of the last event that was received
+        rooms: list[str]
+            Rooms for which to return the events
+
+        Returns
+        -------
+        list[EventLog]
+            The events, oldest first
+        """
+        session = DatabaseSessionManager.get_session()
+        return (
+            session.query(cls)
+            .filter(cls.id > sequence)
+            .filter(cls.room.in_(rooms))
+            .order_by(cls.id)
+            .all()
+        )
+
+    @classmethod
+    def is_truncated(
+        cls,
+        collaboration_id: int,
+        sequence: int,
+        max_events: int = MAX_EVENTS_PER_COLLABORATION,
+    ) -> bool:
+        """
+        Check whether events of a collaboration that were sent after the event with
+        the given sequence number may have been removed.
+
+        Parameters
+        ----------
+        collaboration_id: int
+            ID of the collaboration
+        sequence: int
+            Sequence number of the last event that was received
+        max_events: int
+            Maximum number of events that are kept per collaboration
+
+        Returns
+        -------
+        bool
+            True if events after `sequence` may have been removed
+        """
+        session = DatabaseSessionManager.get_session()
+        count, oldest = (
+            session.query(func.count(cls.id), func.min(cls.id))
+            .filter(cls.collaboration_id == collaboration_id)
+            .one()
+        )
+        return count >= max_events and oldest > sequence + 1
+
+    def __repr__(self) -> str:
+        """
+        Returns a string representation of the event.
+
+        Returns
+        -------
+        str
+            String representation of the event.
+        """
+        return (
+            f"<EventLog {self.id}: collaboration: {self.collaboration_id}, "
+            f"room: {self.room}, event: {self.event}>"
+        )
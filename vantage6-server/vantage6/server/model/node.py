@@ -1,4 +1,5 @@
 from __future__ import annotations
+import hashlib
 import bcrypt
 
 from sqlalchemy.orm import relationship, validates
@@ -21,19 +22,22 @@ class Node(Authenticatable):
         Name of the node
     api_key : str
         API key of the node
+    api_key_index : str
+        SHA-256 digest of the API key, used to look up the node by its API key
     collaboration : :class:`~.model.collaboration.Collaboration`
         Collaboration that the node belongs to
     organization : :class:`~.model.organization.Organization`
         Organization that the node belongs to
     """
 
-    _hidden_attributes = ["api_key"]
+    _hidden_attributes = ["api_key", "api_key_index"]
 
     id = Column(Integer, ForeignKey("authenticatable.id"), primary_key=True)
 
     # fields
     name = Column(String, unique=True)
     api_key = Column(String)
+    api_key_index = Column(String, index=True)
     collaboration_id = Column(Integer, ForeignKey("collaboration.id"))
     organization_id = Column(Integer, ForeignKey("organization.id"))
 
@@ -50,7 +54,8 @@ class Node(Authenticatable):
     @validates("api_key")
     def _validate_api_key(self, key: str, api_key: str) -> str:
         """
-        Hashes the api_key before storing it in the database.
+        Hashes the api_key before storing it in the database, and stores the
+        index by which the node can be looked up by its api_key.
 
         Parameters
         ----------
@@ -64,8 +69,30 @@ class Node(Authenticatable):
         str
             The hashed api_key
         """
+        self.api_key_index = self.index_api_key(api_key)
         return self.hash(api_key)
 
+    @staticmethod
+    def index_api_key(api_key: str) -> str:
+        """
+        Compute the index by which a node can be looked up by its API key.
+
+        API keys are random UUIDs, so unlike passwords they cannot be guessed from
+        a fast hash. The index is therefore a plain SHA-256 digest. The API key
+        itself is still verified against its bcrypt hash.
+
+        Parameters
+        ----------
+        api_key : str
+            The API key
+
+        Returns
+        -------
+        str
+            Hexadecimal SHA-256 digest of the API key
+        """
+        return hashlib.sha256(api_key.encode("utf8")).hexdigest()
+
     def check_key(self, key: str) -> bool:
         """
         Checks if the provided key matches the stored key.
@@ -103,11 +130,21 @@ class Node(Authenticatable):
         """
         session = DatabaseSessionManager.get_session()
 
-        nodes = session.query(cls).all()
+        index = cls.index_api_key(api_key)
+        node = session.query(cls).filter_by(api_key_index=index).first()
+        session.commit()
+        if node:
+            return node if node.check_key(api_key) else None
+
+        # Nodes whose API key was set before the index was introduced do not have
+        # an index yet. Find these by checking their keys one by one, and store
+        # the index of the matching node so that it is found directly next time.
+        legacy_nodes = session.query(cls).filter(cls.api_key_index.is_(None)).all()
         session.commit()
-        for node in nodes:
-            is_correct_key = node.check_key(api_key)
-            if is_correct_key:
+        for node in legacy_nodes:
+            if node.check_key(api_key):
+                node.api_key_index = index
+                node.save()
                 return node
         # no node found with matching API key
         return None
@@ -1,17 +1,51 @@
 import datetime
 import logging
 
-from sqlalchemy import Column, Text, DateTime, Integer, ForeignKey, Boolean
-from sqlalchemy.orm import relationship
-from sqlalchemy.orm.exc import NoResultFound, MultipleResultsFound
+from sqlalchemy import (
+    Column,
+    Text,
+    DateTime,
+    Integer,
+    ForeignKey,
+    Boolean,
+    and_,
+    bindparam,
+    event,
+    func,
+    join,
+    select,
+    update,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import (
+    Session,
+    aliased,
+    attributes,
+    deferred,
+    foreign,
+    relationship,
+)
+from sqlalchemy.orm.util import identity_key
 
 from vantage6.common import logger_name
+from vantage6.common.task_status import TaskStatus
 from vantage6.server.model.base import Base, DatabaseSessionManager
-from vantage6.server.model import Node, Collaboration, Organization
+from vantage6.server.model import Node
+from vantage6.server.model.authenticatable import Authenticatable
 from vantage6.server.model.task import Task
+from vantage6.server.model.run_log import RunLog
+from vantage6.server.globals import MAX_RUN_LOG_SIZE
 
 log_ = logging.getLogger(logger_name(__name__))
 
+# Nodes joined with the tasks of their collaboration. A run is executed by the node
+# of its organization in the collaboration of its task, see `Run.node`.
+_task_nodes = join(
+    Task.__table__,
+    join(Authenticatable.__table__, Node.__table__),
+    Task.collaboration_id == Node.collaboration_id,
+)
+
 
 class Run(Base):
     """
@@ -42,28 +76,38 @@ class Run(Base):
     status : str
         Status of the task
     log : str
-        Log of the task
+        Complete log of the task, as sent by the node when the task is finished
+    log_size : int
+        Number of characters of log lines that have been appended to the log
+        segments of this run while it was running
     task : :class:`.~vantage6.server.model.task.Task`
         Task that was executed
     organization : :class:`.~vantage6.server.model.organization.Organization`
         Organization that executed the task
     ports : list[:class:`.~vantage6.server.model.algorithm_port.AlgorithmPort`]
         List of ports that are part of this result
+    log_segments : list[:class:`.~vantage6.server.model.run_log.RunLog`]
+        Segments of the log that were sent while the task was running
+    node : :class:`.~vantage6.server.model.node.Node`
+        Node that executes the task, None if the organization has no node in
+        the collaboration
     blob_storage_used : bool
         Whether blob storage is used for the input and result data
         Defaults to False
     """
 
-    # fields
-    input = Column(Text)
+    # fields. The input, result and log can be large, so they are only loaded
+    # when they are accessed. Use `undefer` to load them with a query.
+    input = deferred(Column(Text))
     task_id = Column(Integer, ForeignKey("task.id"))
     organization_id = Column(Integer, ForeignKey("organization.id"))
-    result = Column(Text)
+    result = deferred(Column(Text))
     assigned_at = Column(DateTime, default=datetime.datetime.now(datetime.timezone.utc))
     started_at = Column(DateTime)
     finished_at = Column(DateTime)
     status = Column(Text)
-    log = Column(Text)
+    log = deferred(Column(Text))
+    log_size = Column(Integer, default=0)
     cleanup_at = Column(DateTime, nullable=True)
     blob_storage_used = Column(
         "blob_storage_used", Boolean, default=False, nullable=True
@@ -73,47 +117,187 @@ class Run(Base):
     task = relationship("Task", back_populates="runs")
     organization = relationship("Organization", back_populates="runs")
     ports = relationship("AlgorithmPort", back_populates="run")
+    log_segments = relationship(
+        "RunLog",
+        back_populates="run",
+        lazy="dynamic",
+        order_by="RunLog.position",
+        cascade="all, delete-orphan",
+    )
+    # Node that executes the run. This is a relationship rather than a query, so
+    # that the nodes of many runs can be loaded at once, e.g. with `selectinload`.
+    node = relationship(
+        lambda: aliased(Node, _task_nodes, flat=True),
+        primaryjoin=lambda: and_(
+            foreign(Run.task_id) == _task_nodes.c.task_id,
+            foreign(Run.organization_id) == _task_nodes.c.node_organization_id,
+        ),
+        viewonly=True,
+        uselist=False,
+    )
 
-    @property
-    def node(self) -> Node:
+    def append_log(self, log_message: str, max_size: int = MAX_RUN_LOG_SIZE) -> None:
         """
-        Returns the node that is associated with this result.
+        Append algorithm log lines to the log segments of this run.
+
+        The log lines are added as a new segment, so that the existing log is not
+        rewritten. The changes are not saved to the database: call `save()`
+        afterwards.
+
+        Parameters
+        ----------
+        log_message : str
+            One or more log lines to append
+        max_size : int
+            Maximum number of characters of log segments that are kept. If the log
+            becomes longer, its oldest segments are removed.
+        """
+        position = self.log_size or 0
+        self.log_segments.append(RunLog(position=position, log=log_message))
+        self.log_size = position + len(log_message)
+
+        cutoff = self.log_size - max_size
+        if cutoff > 0 and self.id is not None:
+            session = DatabaseSessionManager.get_session()
+            session.query(RunLog).filter(RunLog.run_id == self.id).filter(
+                RunLog.position + func.length(RunLog.log) <= cutoff
+            ).delete(synchronize_session=False)
+
+    def get_log(self, offset: int = 0) -> tuple[str, int, int]:
+        """
+        Get the log of this run, starting at a certain offset.
+
+        When the node has sent the complete log of a finished run, that log is
+        returned. Otherwise, the log segments that were sent while the algorithm
+        was running are returned.
+
+        Parameters
+        ----------
+        offset : int
+            Offset (in characters) from which to return the log
 
         Returns
         -------
-        model.node.Node
-            The node that is associated with this result.
+        tuple[str, int, int]
+            The log from the offset onwards, the offset at which the returned log
+            starts (which is larger than the requested offset if the older part of
+            the log has been removed), and the offset at which the next read
+            should start
         """
-        session = DatabaseSessionManager.get_session()
-        try:
-            node = (
-                session.query(Node)
-                .join(Collaboration)
-                .join(Organization)
-                .join(Run)
-                .join(Task)
-                .filter(Run.id == self.id)
-                .filter(self.organization_id == Node.organization_id)
-                .filter(Task.collaboration_id == Node.collaboration_id)
-                .one()
-            )
-            session.commit()
-        # FIXME 2022-03-03 BvB: the following errors are not currently
-        # forwarded to the user as request response. Make that happen.
-        except NoResultFound:
-            log_.warn(
-                "No node exists for organization_id "
-                f"{self.organization_id} in the current collaboration!"
+        offset = max(offset, 0)
+        if self.log is not None:
+            start = min(offset, len(self.log))
+            return self.log[start:], start, len(self.log)
+
+        segments = self.log_segments.filter(
+            RunLog.position + func.length(RunLog.log) > offset
+        ).all()
+        if not segments:
+            end = self.log_size or 0
+            return "", min(offset, end), end
+        start = max(offset, segments[0].position)
+        log = "".join(segment.log for segment in segments)
+        return log[start - segments[0].position :], start, self.log_size
+
+    @classmethod
+    def update_task_status(
+        cls, connection: Connection, task_ids: set[int]
+    ) -> dict[int, tuple[str, datetime.datetime | None]]:
+        """
+        Derive the status and finish time of tasks from their runs, and store
+        them in the task table.
+
+        Parameters
+        ----------
+        connection : Connection
+            Connection, within the current transaction, on which to execute the
+            queries
+        task_ids : set[int]
+            IDs of the tasks to update
+
+        Returns
+        -------
+        dict[int, tuple[str, datetime.datetime | None]]
+            The new status and finish time per task ID
+        """
+        task_ids = sorted(task_ids)
+        if not task_ids:
+            return {}
+        task_table = Task.__table__
+        # lock the tasks, so that runs of the same task that are updated
+        # concurrently do not overwrite each other's task status
+        connection.execute(
+            select(task_table.c.id)
+            .where(task_table.c.id.in_(task_ids))
+            .order_by(task_table.c.id)
+            .with_for_update()
+        )
+        run_statuses = {task_id: set() for task_id in task_ids}
+        finished_at = {}
+        rows = connection.execute(
+            select(cls.task_id, cls.status, func.max(cls.finished_at))
+            .where(cls.task_id.in_(task_ids))
+            .group_by(cls.task_id, cls.status)
+        )
+        for task_id, status, last_finished_at in rows:
+            run_statuses[task_id].add(status)
+            if last_finished_at is not None:
+                finished_at[task_id] = max(
+                    last_finished_at, finished_at.get(task_id, last_finished_at)
+                )
+
+        updates = {}
+        for task_id, statuses in run_statuses.items():
+            status = Task.derive_status(statuses)
+            updates[task_id] = (
+                status,
+                (
+                    finished_at.get(task_id)
+                    if status == TaskStatus.COMPLETED.value
+                    else None
+                ),
             )
-            return None
-        except MultipleResultsFound:
-            log_.error(
-                "Multiple nodes are registered for organization_id "
-                f"{self.organization_id} in the current collaboration. "
-                "Please delete all nodes but one."
+        connection.execute(
+            update(task_table)
+            .where(task_table.c.id == bindparam("task_id"))
+            .values(
+                status=bindparam("new_status"),
+                finished_at=bindparam("new_finished_at"),
+            ),
+            [
+                {
+                    "task_id": task_id,
+                    "new_status": status,
+                    "new_finished_at": finished_at_,
+                }
+                for task_id, (status, finished_at_) in updates.items()
+            ],
+        )
+        return updates
+
+    @classmethod
+    def initialize_task_status(cls, batch_size: int = 500) -> None:
+        """
+        Store the status and finish time of tasks that do not have them yet,
+        e.g. because they were created by a server version that did not store
+        them.
+
+        Parameters
+        ----------
+        batch_size : int
+            Number of tasks to update per query
+        """
+        session = DatabaseSessionManager.get_session()
+        task_ids = [
+            id_ for (id_,) in session.query(Task.id).filter(Task.status.is_(None))
+        ]
+        if task_ids:
+            log_.info("Storing the status of %s tasks", len(task_ids))
+        for index in range(0, len(task_ids), batch_size):
+            cls.update_task_status(
+                session.connection(), set(task_ids[index : index + batch_size])
             )
-            raise
-        return node
+        session.commit()
 
     def __repr__(self) -> str:
         """
@@ -132,3 +316,82 @@ class Run(Base):
             f"status: {self.status}"
             ">"
         )
+
+
+def _remember_tasks_of_deleted_runs(session: Session, flush_context, instances) -> None:
+    """
+    Remember the tasks of runs that are deleted in a flush, while the runs can
+    still be loaded.
+
+    Parameters
+    ----------
+    session : Session
+        Session that is flushed
+    flush_context
+        Internal state of the flush
+    instances
+        Deprecated, always None
+    """
+    task_ids = {obj.task_id for obj in session.deleted if isinstance(obj, Run)}
+    if task_ids:
+        session.info.setdefault("deleted_run_task_ids", set()).update(task_ids)
+
+
+def _update_status_of_changed_tasks(session: Session, flush_context) -> None:
+    """
+    Update the status of the tasks of which runs were added, changed or deleted
+    in a flush.
+
+    Parameters
+    ----------
+    session : Session
+        Session that was flushed
+    flush_context
+        Internal state of the flush
+    """
+    task_ids = session.info.pop("deleted_run_task_ids", set())
+    for obj in session.new:
+        if isinstance(obj, Task):
+            task_ids.add(obj.id)
+    for obj in session.new | session.dirty:
+        if not isinstance(obj, Run):
+            continue
+        if (
+            obj in session.dirty
+            and not attributes.get_history(obj, "status").has_changes()
+            and not attributes.get_history(obj, "finished_at").has_changes()
+            and not attributes.get_history(obj, "task_id").has_changes()
+        ):
+            continue
+        task_ids.add(obj.task_id)
+        task_ids.update(attributes.get_history(obj, "task_id").deleted)
+    task_ids.discard(None)
+    if task_ids:
+        session.info.setdefault("task_status_updates", {}).update(
+            Run.update_task_status(session.connection(), task_ids)
+        )
+
+
+def _set_status_of_loaded_tasks(session: Session, flush_context) -> None:
+    """
+    Set the status that was stored for tasks in a flush on the tasks that are
+    loaded in the session.
+
+    Parameters
+    ----------
+    session : Session
+        Session that was flushed
+    flush_context
+        Internal state of the flush
+    """
+    updates = session.info.pop("task_status_updates", {})
+    for task_id, (status, finished_at) in updates.items():
+        task = session.identity_map.get(identity_key(Task, task_id))
+        if task is not None:
+            attributes.set_committed_value(task, "status", status)
+            attributes.set_committed_value(task, "finished_at", finished_at)
+
+
+event.listen(Session, "before_flush", _remember_tasks_of_deleted_runs)
+event.listen(Session, "after_flush", _update_status_of_changed_tasks)
+event.listen(Session, "after_flush_postexec", _set_status_of_loaded_tasks)
@@ -0,0 +1,49 @@
+from sqlalchemy import Column, Text, Integer, ForeignKey
+from sqlalchemy.orm import relationship
+
+from vantage6.server.model.base import Base
+
+
+class RunLog(Base):
+    """
+    Segment of the algorithm logs of a :class:`~vantage6.server.model.run.Run`
+
+    Algorithm logs are sent to the server in batches while the algorithm is
+    running. Each batch is stored as a new segment, so that existing logs never
+    have to be rewritten and clients can read only the part of the logs that they
+    have not seen yet.
+
+    Attributes
+    ----------
+    run_id: int
+        The id of the :class:`~vantage6.server.model.run.Run` that this segment
+        belongs to
+    position: int
+        Offset (in characters) of the start of this segment in the complete log
+        of the run
+    log: str
+        The log lines in this segment
+    run: :class:`~vantage6.server.model.run.Run`
+        The :class:`~vantage6.server.model.run.Run` that this segment belongs to
+    """
+
+    # fields
+    run_id = Column(Integer, ForeignKey("run.id"), index=True)
+    position = Column(Integer)
+    log = Column(Text)
+
+    run = relationship("Run", back_populates="log_segments")
+
+    def __repr__(self) -> str:
+        """
+        Returns a string representation of the log segment.
+
+        Returns
+        -------
+        str
+            String representation of the log segment.
+        """
+        return (
+            f"<RunLog {self.id}: run: {self.run_id}, position: {self.position}, "
+            f"length: {len(self.log or '')}>"
+        )
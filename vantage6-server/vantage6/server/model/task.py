@@ -1,9 +1,7 @@
 import datetime
-import os
 
 from sqlalchemy import Column, String, ForeignKey, Integer, sql, DateTime
 from sqlalchemy.orm import relationship
-from sqlalchemy.ext.hybrid import hybrid_property
 
 from vantage6.common.task_status import TaskStatus, has_task_failed
 from vantage6.server.model.base import Base, DatabaseSessionManager
@@ -43,6 +41,11 @@ class Task(Base):
         Time at which this task was created
     algorithm_store_id : int
         Id of the algorithm store that this task belongs to
+    status : str
+        Status of the task, derived from the statuses of its runs
+    finished_at : datetime.datetime
+        Time at which the last run of the task was completed, None if the task
+        is not completed
 
     collaboration : :class:`~.model.collaboration.Collaboration`
         Collaboration that this task belongs to
@@ -76,6 +79,12 @@ class Task(Base):
     init_user_id = Column(Integer, ForeignKey("user.id"))
     created_at = Column(DateTime, default=datetime.datetime.now(datetime.timezone.utc))
     algorithm_store_id = Column(Integer, ForeignKey("algorithmstore.id"))
+    # The status and finish time are derived from the runs of the task. They are
+    # stored so that tasks can be listed and filtered without loading their runs,
+    # and are updated whenever runs of the task are changed, see
+    # `Run.update_task_status`.
+    status = Column(String, index=True)
+    finished_at = Column(DateTime)
 
     # relationships
     collaboration = relationship("Collaboration", back_populates="tasks")
@@ -97,55 +106,35 @@ class Task(Base):
     study = relationship("Study", back_populates="tasks")
     algorithm_store = relationship("AlgorithmStore", back_populates="tasks")
 
-    # TODO update in v4+, with renaming to 'run'
-    @hybrid_property
-    def finished_at(self) -> datetime.datetime | None:
+    @staticmethod
+    def derive_status(run_statuses: set[str]) -> str:
         """
-        Determine the time at which a task was completed. This is the time at
-        which the last algorithm run was completed.
+        Derive the status of a task from the statuses of its algorithm runs.
 
-        Returns
-        -------
-        datetime.datetime | None
-            Time at which task was completed, None if task is not completed
-        """
-        return (
-            max([r.finished_at for r in self.results])
-            if self.status == TaskStatus.COMPLETED.value and self.results
-            else None
-        )
-
-    @hybrid_property
-    def status(self) -> str:
-        """
-        Returns the status of a task, which is derived from the statuses of
-        the underlying algorithm runs.
+        Parameters
+        ----------
+        run_statuses : set[str]
+            Distinct statuses of the runs of the task
 
         Returns
         -------
         str
             Status of task
         """
-        # The following is necessary because if readthedocs executes this code to
-        # generate function docs, it will fail with a sqlalchemy error (because there
-        # are no runs?).
-        if os.environ.get("READTHEDOCS"):
-            return ""
-        # TODO what if there are no result ids? -> currently returns unknown
-        run_statuses = [r.status for r in self.runs]
-        if any([has_task_failed(status) for status in run_statuses]):
+        # TODO what if there are no result ids? -> currently returns completed
+        failed_statuses = {status for status in run_statuses if has_task_failed(status)}
+        if failed_statuses:
             # check if all runs that have failed have failed for the same reason - if
             # so, return that reason. If not, return generic failed status
-            failed_runs = [r for r in self.runs if has_task_failed(r.status)]
-            if len(set([r.status for r in failed_runs])) == 1:
-                return failed_runs[0].status
+            if len(failed_statuses) == 1:
+                return failed_statuses.pop()
             else:
                 return TaskStatus.FAILED.value
-        elif TaskStatus.ACTIVE in run_statuses:
+        elif TaskStatus.ACTIVE.value in run_statuses:
             return TaskStatus.ACTIVE.value
-        elif TaskStatus.INITIALIZING in run_statuses:
+        elif TaskStatus.INITIALIZING.value in run_statuses:
             return TaskStatus.INITIALIZING.value
-        elif TaskStatus.PENDING in run_statuses:
+        elif TaskStatus.PENDING.value in run_statuses:
             return TaskStatus.PENDING.value
         else:
             return TaskStatus.COMPLETED.value
@@ -1,9 +1,18 @@
 import logging
+import time
+import weakref
+from typing import Callable, Hashable, Iterable
 
 from flask import g
+from sqlalchemy import event
+from sqlalchemy.orm import Session, attributes
 from vantage6.server import db
 
-from vantage6.backend.common.permission import RuleCollectionBase, PermissionManagerBase
+from vantage6.backend.common.permission import (
+    RuleCollectionBase,
+    PermissionManagerBase,
+    RuleNeed,
+)
 from vantage6.backend.common.resource.error_handling import UnauthorizedError
 from vantage6.server.model.base import Base
 from vantage6.server.model.role import Role
@@ -235,6 +244,129 @@ class RuleCollection(RuleCollectionBase):
             raise ValueError(f"Unknown scope '{minimal_scope}'")
 
 
+class RuleNeedCache:
+    """
+    In-process cache of the rules that users, nodes and containers have.
+
+    Computing the rules of an identity takes several queries on every request.
+    The computed rules are therefore cached per identity. The cache is cleared
+    when roles, rules or the roles and rules of users are changed by this server
+    instance. Changes made by other server instances (when the server is scaled
+    horizontally) are picked up when the cached rules expire.
+    """
+
+    # caches of all server apps in this process, which are cleared when
+    # permissions change
+    _instances: "weakref.WeakSet[RuleNeedCache]" = weakref.WeakSet()
+
+    def __init__(self, ttl: float) -> None:
+        """
+        Create the cache.
+
+        Parameters
+        ----------
+        ttl: float
+            Number of seconds that the rules of an identity are cached. If this
+            is 0 or less, nothing is cached.
+        """
+        self.ttl = ttl
+        self._cache: dict[Hashable, tuple[float, frozenset[RuleNeed]]] = {}
+        RuleNeedCache._instances.add(self)
+
+    def get(self, key: Hashable, load_rules: Callable[[], Iterable[Rule]]) -> frozenset:
+        """
+        Get the rules of an identity, and cache them if they are not cached yet.
+
+        Parameters
+        ----------
+        key: Hashable
+            Key of the identity, e.g. ``("user", 1)``
+        load_rules: Callable[[], Iterable[Rule]]
+            Function that loads the rules of the identity from the database
+
+        Returns
+        -------
+        frozenset[RuleNeed]
+            The rules of the identity
+        """
+        now = time.monotonic()
+        cached = self._cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+        needs = frozenset(
+            RuleNeed(name=rule.name, scope=rule.scope, operation=rule.operation)
+            for rule in load_rules()
+        )
+        if self.ttl > 0:
+            self._cache[key] = (now + self.ttl, needs)
+        return needs
+
+    def clear(self) -> None:
+        """Remove all cached rules"""
+        self._cache.clear()
+
+    @classmethod
+    def clear_all(cls) -> None:
+        """Remove all cached rules of all caches in this process"""
+        for cache in list(cls._instances):
+            cache.clear()
+
+
+def _detect_permission_changes(session: Session, flush_context) -> None:
+    """
+    Mark the session if a flush changes roles, rules, or the roles or rules of
+    users, so that the cached rules are cleared when the changes are committed.
+
+    Parameters
+    ----------
+    session: Session
+        Session that was flushed
+    flush_context
+        Internal state of the flush
+    """
+    for obj in session.new | session.dirty | session.deleted:
+        if isinstance(obj, (Role, Rule)) or (
+            isinstance(obj, db.User)
+            and (
+                obj in session.deleted
+                or attributes.get_history(obj, "roles").has_changes()
+                or attributes.get_history(obj, "rules").has_changes()
+            )
+        ):
+            session.info["permissions_changed"] = True
+            return
+
+
+def _clear_rule_needs_on_commit(session: Session) -> None:
+    """
+    Clear the cached rules if the committed changes changed permissions.
+
+    Parameters
+    ----------
+    session: Session
+        Session that was committed
+    """
+    if session.info.pop("permissions_changed", False):
+        RuleNeedCache.clear_all()
+
+
+def _forget_permission_changes(session: Session) -> None:
+    """
+    Forget about permission changes that were rolled back.
+
+    Parameters
+    ----------
+    session: Session
+        Session that was rolled back
+    """
+    session.info.pop("permissions_changed", None)
+
+
+event.listen(Session, "after_flush", _detect_permission_changes)
+event.listen(Session, "after_commit", _clear_rule_needs_on_commit)
+event.listen(Session, "after_rollback", _forget_permission_changes)
+
+
 class PermissionManager(PermissionManagerBase):
     def assign_rule_to_node(
         self, resource: str, scope: Scope, operation: Operation
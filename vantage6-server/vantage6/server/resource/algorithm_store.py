@@ -214,7 +214,7 @@ class AlgorithmStores(AlgorithmStoreBase):
         try:
             page = Pagination.from_query(q, request, db.AlgorithmStore)
         except (ValueError, AttributeError) as e:
-            return {"msg": str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR
+            return {"msg": str(e)}, HTTPStatus.BAD_REQUEST
 
         # serialize models
         return self.response(page, algorithm_store_schema)
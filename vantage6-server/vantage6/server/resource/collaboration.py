@@ -293,7 +293,7 @@ class Collaborations(CollaborationBase):
         try:
             page = Pagination.from_query(q, request, db.Collaboration)
         except (ValueError, AttributeError) as e:
-            return {"msg": str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR
+            return {"msg": str(e)}, HTTPStatus.BAD_REQUEST
 
         schema = self._select_schema()
 
@@ -11,6 +11,7 @@ from vantage6.common.globals import AuthStatus
 from vantage6.common.task_status import has_task_finished, TaskStatus
 from vantage6.server.resource import ServicesResources, with_user
 from vantage6.server import db
+from vantage6.server.websockets import emit_logged_event
 from vantage6.server.permission import Scope, Operation, PermissionManager
 from vantage6.server.resource.common.input_schema import (
     KillNodeTasksInputSchema,
@@ -274,11 +275,12 @@ class KillNodeTasks(ServicesResources):
                     "msg": "You lack the permission to do that!"
                 }, HTTPStatus.UNAUTHORIZED
 
-        self.socketio.emit(
+        emit_logged_event(
+            self.socketio,
             "kill_containers",
             {"node_id": node.id, "collaboration_id": node.collaboration_id},
-            namespace="/tasks",
             room=f"collaboration_{node.collaboration_id}",
+            collaboration_id=node.collaboration_id,
         )
 
         return {
@@ -311,11 +313,12 @@ def kill_task(task: db.Task, socket: SocketIO) -> None:
     ]
 
     # emit socket event to the node to execute the container kills
-    socket.emit(
+    emit_logged_event(
+        socket,
         "kill_containers",
         {"kill_list": kill_list, "collaboration_id": task.collaboration.id},
-        namespace="/tasks",
         room=f"collaboration_{task.collaboration_id}",
+        collaboration_id=task.collaboration_id,
     )
 
     # set tasks and subtasks status to killed
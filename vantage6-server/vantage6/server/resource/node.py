@@ -307,7 +307,7 @@ class Nodes(NodeBase):
         try:
             page = Pagination.from_query(q, request, db.Node)
         except (ValueError, AttributeError) as e:
-            return {"msg": str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR
+            return {"msg": str(e)}, HTTPStatus.BAD_REQUEST
 
         # model serialization
         return self.response(page, node_schema)
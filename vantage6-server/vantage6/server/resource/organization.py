@@ -6,6 +6,7 @@ from http import HTTPStatus
 
 from vantage6.common import logger_name
 from vantage6.server import db
+from vantage6.server.websockets import emit_logged_event
 from vantage6.backend.common.resource.pagination import Pagination
 from vantage6.server.permission import (
     Scope as S,
@@ -182,6 +183,14 @@ class Organizations(OrganizationBase):
             description: >-
               Sort by one or more fields, separated by a comma. Use a minus
               sign (-) in front of the field to sort in descending order.
+          - in: query
+            name: fields
+            schema:
+              type: string
+            description: >-
+              Fields to return, separated by a comma, e.g. `fields=id,name`.
+              Other fields are left out of the response. By default, all
+              fields are returned.
 
         responses:
           200:
@@ -270,7 +279,7 @@ class Organizations(OrganizationBase):
         try:
             page = Pagination.from_query(q, request, db.Organization)
         except (ValueError, AttributeError) as e:
-            return {"msg": str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR
+            return {"msg": str(e)}, HTTPStatus.BAD_REQUEST
 
         # serialization of DB model
         return self.response(page, org_schema)
@@ -371,6 +380,14 @@ class Organization(OrganizationBase):
               type: integer
             description: Organization id
             required: true
+          - in: query
+            name: fields
+            schema:
+              type: string
+            description: >-
+              Fields to return, separated by a comma, e.g. `fields=id,name`.
+              Other fields are left out of the response. By default, all
+              fields are returned.
 
         responses:
           200:
@@ -397,7 +414,7 @@ class Organization(OrganizationBase):
                 "msg": "You do not have permission to do that!"
             }, HTTPStatus.UNAUTHORIZED
 
-        return org_schema.dump(req_org, many=False), HTTPStatus.OK
+        return self.select_fields(org_schema).dump(req_org, many=False), HTTPStatus.OK
 
     @only_for(("user", "node"))
     def patch(self, id):
@@ -474,12 +491,28 @@ class Organization(OrganizationBase):
                 }, HTTPStatus.BAD_REQUEST
             organization.name = name
 
+        public_key_updated = (
+            data.get("public_key") is not None
+            and data["public_key"] != organization.public_key
+        )
         fields = ["address1", "address2", "zipcode", "country", "public_key", "domain"]
         for field in fields:
             if field in data and data[field] is not None:
                 setattr(organization, field, data[field])
 
         organization.save()
+
+        # nodes cache public keys to encrypt task input and results, so notify them
+        # that the key has changed
+        if public_key_updated:
+            for collaboration in organization.collaborations:
+                emit_logged_event(
+                    self.socketio,
+                    "organization_public_key_updated",
+                    {"id": organization.id},
+                    room=f"collaboration_{collaboration.id}",
+                    collaboration_id=collaboration.id,
+                )
         return org_schema.dump(organization, many=False), HTTPStatus.OK
 
     @with_user
@@ -376,7 +376,10 @@ class Roles(RoleBase):
         if not self.rule_collection.v_glo.can():
             q = self._filter_by_user_permissions(q, auth_org)
 
-        page = Pagination.from_query(q, request, db.Role)
+        try:
+            page = Pagination.from_query(q, request, db.Role)
+        except (ValueError, AttributeError) as e:
+            return {"msg": str(e)}, HTTPStatus.BAD_REQUEST
         return self.response(page, role_schema)
 
     @with_user
@@ -8,6 +8,7 @@ from flask import g, request
 from flask_restful import Api
 from http import HTTPStatus
 from sqlalchemy import desc
+from sqlalchemy.orm import selectinload, undefer
 
 from vantage6.common import logger_name
 from vantage6.common.task_status import TaskStatus, has_task_failed
@@ -25,6 +26,7 @@ from vantage6.server.resource import (
 )
 from vantage6.server.resource.common.input_schema import RunInputSchema
 from vantage6.server.utils import parse_datetime
+from vantage6.server.websockets import emit_logged_event
 from vantage6.backend.common.resource.pagination import Pagination
 from vantage6.server.resource.common.output_schema import (
     RunSchema,
@@ -68,6 +70,13 @@ def setup(api: Api, api_base: str, services: dict) -> None:
         methods=("GET", "PATCH"),
         resource_class_kwargs=services,
     )
+    api.add_resource(
+        RunLogEndpoint,
+        path + "/<int:id>/log",
+        endpoint="run_log",
+        methods=("GET",),
+        resource_class_kwargs=services,
+    )
     api.add_resource(
         Results,
         api_base + "/result",
@@ -89,7 +98,14 @@ def setup(api: Api, api_base: str, services: dict) -> None:
 # Schemas
 run_schema = RunSchema()
 run_inc_schema = RunTaskIncludedSchema()
+# logs are not included when listing runs, they can be obtained per run instead
+run_list_schema = RunSchema(exclude=("log",))
+run_list_inc_schema = RunTaskIncludedSchema(exclude=("log",))
+# listings without the (possibly large) input or result, see `include_payload`
+run_list_no_payload_schema = RunSchema(exclude=("log", "input"))
+run_list_inc_no_payload_schema = RunTaskIncludedSchema(exclude=("log", "input"))
 result_schema = ResultSchema()
+result_no_payload_schema = ResultSchema(exclude=("result",))
 run_input_schema = RunInputSchema()
 
 
@@ -141,6 +157,22 @@ class RunBase(ServicesResources):
 class MultiRunBase(RunBase):
     """Base class for resources that return multiple runs or results"""
 
+    @staticmethod
+    def is_payload_included() -> bool:
+        """
+        Check whether the input or result of the runs should be returned
+
+        Returns
+        -------
+        bool
+            False if the request has `include_payload` set to false, True
+            otherwise
+        """
+        return request.args.get("include_payload", "true").lower() not in (
+            "false",
+            "0",
+        )
+
     def get_query_multiple_runs(self) -> sa.orm.query.Query | tuple:
         """
         Returns a query object that can be used to retrieve runs.
@@ -198,6 +230,9 @@ class MultiRunBase(RunBase):
         if "port" in args:
             q = q.filter(db_Run.port == args["port"])
 
+        if "id_from" in args:
+            q = q.filter(db_Run.id >= args["id_from"])
+
         # date selections
         for param in ["assigned", "started", "finished"]:
             if f"{param}_till" in args:
@@ -245,7 +280,8 @@ class Runs(MultiRunBase):
         ---
 
         description: >-
-            Returns a list of all runs you are allowed to see.\n
+            Returns a list of all runs you are allowed to see. The logs of the
+            runs are not included: use `/run/{id}/log` to obtain them.\n
 
             ### Permission Table\n
             |Rule name|Scope|Operation|Assigned to node|Assigned to container|
@@ -321,6 +357,11 @@ class Runs(MultiRunBase):
               schema:
                 type: integer
               description: Port number
+            - in: query
+              name: id_from
+              schema:
+                type: integer
+              description: Only show runs with at least this id
             - in: query
               name: include
               schema:
@@ -343,6 +384,37 @@ class Runs(MultiRunBase):
               description: >-
                 Sort by one or more fields, separated by a comma. Use a minus
                 sign (-) in front of the field to sort in descending order.
+            - in: query
+              name: cursor
+              schema:
+                type: string
+              description: >-
+                Use cursor pagination instead of page numbers, which is faster for
+                large numbers of items. Pass an empty cursor for the first page,
+                and follow the 'next' link for the next pages. Items are sorted
+                by id; use sort=-id to sort in descending order.
+            - in: query
+              name: total
+              schema:
+                type: boolean
+              description: >-
+                With cursor pagination, whether to count the total number of
+                items (default false)
+            - in: query
+              name: include_payload
+              schema:
+                type: boolean
+              description: >-
+                Whether to include the input of the runs (default true). Set to
+                false to list runs without their, possibly large, input.
+            - in: query
+              name: fields
+              schema:
+                type: string
+              description: >-
+                Fields to return, separated by a comma, e.g. `fields=id,status`.
+                Other fields are left out of the response. By default, all
+                fields are returned.
 
         responses:
           200:
@@ -363,13 +435,33 @@ class Runs(MultiRunBase):
         if not isinstance(query, sa.orm.query.Query):
             return query
 
+        # the input is deferred: load it with the runs if it is returned. Logs are
+        # never returned. Load the related objects that are serialized for all
+        # runs of the page at once, rather than per run
+        include_payload = self.is_payload_included()
+        if include_payload:
+            query = query.options(undefer(db_Run.input))
+        query = query.options(
+            selectinload(db_Run.node),
+            selectinload(db_Run.organization),
+            selectinload(db_Run.ports),
+            selectinload(db_Run.task),
+        )
+
         try:
             page = Pagination.from_query(query, request, db.Run)
         except (ValueError, AttributeError) as e:
-            return {"msg": str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR
+            return {"msg": str(e)}, HTTPStatus.BAD_REQUEST
 
         # serialization of the models
-        s = run_inc_schema if self.is_included("task") else run_schema
+        if self.is_included("task"):
+            s = (
+                run_list_inc_schema
+                if include_payload
+                else run_list_inc_no_payload_schema
+            )
+        else:
+            s = run_list_schema if include_payload else run_list_no_payload_schema
 
         return self.response(page, s)
 
@@ -457,6 +549,11 @@ class Results(MultiRunBase):
               schema:
                 type: integer
               description: Port number
+            - in: query
+              name: id_from
+              schema:
+                type: integer
+              description: Only show runs with at least this id
             - in: query
               name: page
               schema:
@@ -474,6 +571,37 @@ class Results(MultiRunBase):
               description: >-
                 Sort by one or more fields, separated by a comma. Use a minus
                 sign (-) in front of the field to sort in descending order.
+            - in: query
+              name: cursor
+              schema:
+                type: string
+              description: >-
+                Use cursor pagination instead of page numbers, which is faster for
+                large numbers of items. Pass an empty cursor for the first page,
+                and follow the 'next' link for the next pages. Items are sorted
+                by id; use sort=-id to sort in descending order.
+            - in: query
+              name: total
+              schema:
+                type: boolean
+              description: >-
+                With cursor pagination, whether to count the total number of
+                items (default false)
+            - in: query
+              name: include_payload
+              schema:
+                type: boolean
+              description: >-
+                Whether to include the result of the runs (default true). Set to
+                false to list results without their, possibly large, data.
+            - in: query
+              name: fields
+              schema:
+                type: string
+              description: >-
+                Fields to return, separated by a comma, e.g. `fields=id,status`.
+                Other fields are left out of the response. By default, all
+                fields are returned.
 
         responses:
             200:
@@ -492,12 +620,21 @@ class Results(MultiRunBase):
         if not isinstance(query, sa.orm.query.Query):
             return query
 
+        # the result is deferred: load it with the runs if it is returned. Load
+        # the tasks of all results of the page at once, rather than per result
+        include_payload = self.is_payload_included()
+        if include_payload:
+            query = query.options(undefer(db_Run.result))
+        query = query.options(selectinload(db_Run.task))
+
         try:
             page = Pagination.from_query(query, request, db.Run)
         except (ValueError, AttributeError) as e:
-            return {"msg": str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR
+            return {"msg": str(e)}, HTTPStatus.BAD_REQUEST
 
-        return self.response(page, result_schema)
+        return self.response(
+            page, result_schema if include_payload else result_no_payload_schema
+        )
 
 
 class SingleRunBase(RunBase):
@@ -568,6 +705,14 @@ class Run(SingleRunBase):
             schema:
               type: string
             description: what to include ('task')
+          - in: query
+            name: fields
+            schema:
+              type: string
+            description: >-
+              Fields to return, separated by a comma, e.g. `fields=id,status`.
+              Other fields are left out of the response. By default, all
+              fields are returned.
 
         responses:
           200:
@@ -590,7 +735,7 @@ class Run(SingleRunBase):
 
         s = run_inc_schema if request.args.get("include") == "task" else run_schema
 
-        return s.dump(run, many=False), HTTPStatus.OK
+        return self.select_fields(s).dump(run, many=False), HTTPStatus.OK
 
     @with_node
     def patch(self, id):
@@ -676,11 +821,12 @@ class Run(SingleRunBase):
             }, HTTPStatus.BAD_REQUEST
 
         # notify collaboration nodes/users that the task has an update
-        self.socketio.emit(
+        emit_logged_event(
+            self.socketio,
             "status_update",
             {"run_id": id},
-            namespace="/tasks",
-            room=f"collaboration_{run.task.collaboration.id}",
+            room=f"collaboration_{run.task.collaboration_id}",
+            collaboration_id=run.task.collaboration_id,
         )
 
         run.started_at = parse_datetime(data.get("started_at"), run.started_at)
@@ -717,6 +863,103 @@ class Run(SingleRunBase):
         return run_schema.dump(run, many=False), HTTPStatus.OK
 
 
+class RunLogEndpoint(SingleRunBase):
+    """Resource for /api/run/<id>/log"""
+
+    @only_for(("node", "user", "container"))
+    def get(self, id):
+        """Get the log of a run
+        ---
+
+        description: >-
+            Returns the algorithm log of a run, starting at a given offset. While the
+            algorithm is running, this returns the log lines that the node has sent
+            so far. To follow the log, pass the `next_offset` of the previous
+            response as `offset`, so that only new log lines are returned. \n
+
+            ### Permission Table\n
+            |Rule name|Scope|Operation|Assigned to node|Assigned to container|
+            Description|\n
+            |--|--|--|--|--|--|\n
+            |Run|Global|View|❌|❌|View any run|\n
+            |Run|Collaboration|View|✅|✅|View the runs of your
+            organization's collaborations|\n
+            |Run|Organization|View|❌|❌|View any run from a task created by
+            your organization|\n
+            |Run|Own|View|❌|❌|View any run from a task created by you|\n
+
+            Accessible to users.
+
+        parameters:
+          - in: path
+            name: id
+            schema:
+              type: integer
+            minimum: 1
+            description: Algorithm run id
+            required: true
+          - in: query
+            name: offset
+            schema:
+              type: integer
+            description: Offset (in characters) from which to return the log.
+              Default 0.
+
+        responses:
+          200:
+            description: Ok
+            content:
+              application/json:
+                schema:
+                  type: object
+                  properties:
+                    log:
+                      type: string
+                      description: The log from the offset onwards
+                    offset:
+                      type: integer
+                      description: Offset at which the returned log starts. This
+                        is larger than the requested offset if the oldest part of
+                        the log has been removed.
+                    next_offset:
+                      type: integer
+                      description: Offset to request the next log lines from
+                    complete:
+                      type: boolean
+                      description: Whether the run is finished, so that no more
+                        log lines will be added
+          400:
+            description: Invalid offset
+          401:
+            description: Unauthorized
+          404:
+            description: Run id not found
+
+        security:
+          - bearerAuth: []
+
+        tags: ["Algorithm"]
+        """
+        run = self.get_single_run(id)
+
+        # return error code if run is not found
+        if not isinstance(run, db_Run):
+            return run
+
+        try:
+            offset = int(request.args.get("offset", 0))
+        except ValueError:
+            return {"msg": "Offset should be an integer"}, HTTPStatus.BAD_REQUEST
+
+        log_, start, next_offset = run.get_log(offset)
+        return {
+            "log": log_,
+            "offset": start,
+            "next_offset": next_offset,
+            "complete": run.finished_at is not None,
+        }, HTTPStatus.OK
+
+
 class Result(SingleRunBase):
     """Resource for /api/result/<id>"""
 
@@ -749,6 +992,14 @@ class Result(SingleRunBase):
             minimum: 1
             description: Algorithm run id
             required: true
+          - in: query
+            name: fields
+            schema:
+              type: string
+            description: >-
+              Fields to return, separated by a comma, e.g. `fields=id,status`.
+              Other fields are left out of the response. By default, all
+              fields are returned.
 
         responses:
           200:
@@ -769,4 +1020,4 @@ class Result(SingleRunBase):
         if not isinstance(run, db_Run):
             return run
 
-        return result_schema.dump(run, many=False), HTTPStatus.OK
+        return self.select_fields(result_schema).dump(run, many=False), HTTPStatus.OK
@@ -332,7 +332,7 @@ class Studies(StudyBase):
         try:
             page = Pagination.from_query(q, request, db.Study)
         except (ValueError, AttributeError) as e:
-            return {"msg": str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR
+            return {"msg": str(e)}, HTTPStatus.BAD_REQUEST
 
         schema = self._select_schema()
 
@@ -8,13 +8,20 @@ from flask_restful import Api
 from flask_socketio import SocketIO
 from http import HTTPStatus
 from sqlalchemy import desc
+from sqlalchemy.orm import selectinload, undefer
 from sqlalchemy.sql import visitors
 
-from vantage6.common.globals import STRING_ENCODING, NodePolicy
+from vantage6.common.globals import (
+    LOCAL_SUBTASK_INPUT_PREFIX,
+    STRING_ENCODING,
+    NodePolicy,
+)
 from vantage6.common.task_status import TaskStatus, has_task_finished
 from vantage6.common.encryption import DummyCryptor
 from vantage6.backend.common import get_server_url
 from vantage6.server import db
+from vantage6.server.globals import NEW_TASK_EVENT_MAX_INPUT_SIZE
+from vantage6.server.websockets import LoggedEvent, emit_logged_events
 from vantage6.server.algo_store_communication import request_algo_store
 from vantage6.server.permission import (
     RuleCollection,
@@ -24,6 +31,7 @@ from vantage6.server.permission import (
 )
 from vantage6.server.resource import only_for, ServicesResources, with_user
 from vantage6.server.resource.common.output_schema import (
+    RunTaskIncludedSchema,
     TaskSchema,
     TaskWithResultSchema,
     TaskWithRunSchema,
@@ -140,6 +148,7 @@ task_schema = TaskSchema()
 task_run_schema = TaskWithRunSchema()
 task_result_schema = TaskWithResultSchema()
 task_result_run_schema = TaskWithRunAndResultSchema()
+run_inc_schema = RunTaskIncludedSchema()
 
 task_input_schema = TaskInputSchema()
 
@@ -170,6 +179,33 @@ class TaskBase(ServicesResources):
         else:
             return task_schema
 
+    def _run_load_options(self) -> list:
+        """
+        Get the query options that load the runs and results that are included
+        in the response, together with their input, log or result.
+
+        The input, log and result of runs are only loaded when they are accessed,
+        which would take a query per run. These options load them for all tasks
+        at once.
+
+        Returns
+        -------
+        list
+            Options to pass to a query on tasks
+        """
+        options = []
+        if self.is_included("runs"):
+            options.append(
+                selectinload(db.Task.runs).options(
+                    undefer(db.Run.input), undefer(db.Run.log)
+                )
+            )
+        if self.is_included("results"):
+            options.append(
+                selectinload(db.Task.results).options(undefer(db.Run.result))
+            )
+        return options
+
 
 class Tasks(TaskBase):
     @only_for(("user", "node", "container"))
@@ -310,6 +346,14 @@ class Tasks(TaskBase):
             description: >-
               Sort by one or more fields, separated by a comma. Use a minus
               sign (-) in front of the field to sort in descending order.
+          - in: query
+            name: fields
+            schema:
+              type: string
+            description: >-
+              Fields to return, separated by a comma, e.g. `fields=id,status`.
+              Other fields are left out of the response. By default, all
+              fields are returned.
 
         responses:
           200:
@@ -497,13 +541,13 @@ class Tasks(TaskBase):
                 }, HTTPStatus.BAD_REQUEST
 
         # order to get latest task first
-        q = q.order_by(desc(db.Task.id))
+        q = q.order_by(desc(db.Task.id)).options(*self._run_load_options())
 
         # paginate tasks
         try:
             page = Pagination.from_query(q, request, db.Task)
         except (ValueError, AttributeError) as e:
-            return {"msg": str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR
+            return {"msg": str(e)}, HTTPStatus.BAD_REQUEST
 
         # serialization schema
         schema = self._select_schema()
@@ -763,8 +807,13 @@ class Tasks(TaskBase):
         # send encrypted input.
         blob_storage_used = bool(config.get("large_result_store", {}))
 
+        # nodes may keep the input of subtasks for their own organization locally,
+        # and send only a reference to it
         is_valid_input, error_msg = Tasks._check_input(
-            organizations_json_list, collaboration, blob_storage_used
+            organizations_json_list,
+            collaboration,
+            blob_storage_used,
+            local_input_org_id=init_org.id if g.container else None,
         )
         if not is_valid_input:
             return {"msg": error_msg}, HTTPStatus.BAD_REQUEST
@@ -812,51 +861,74 @@ class Tasks(TaskBase):
             # may only contain some optional parameters . Save optional
             # parameters as JSON without spaces to database
             label = database.pop("label")
-            # TODO task.id is only set here because in between creating the
-            # task and using the ID here, there are other database operations
-            # that silently update the task.id (i.e. next_job_id() and
-            # db.Task.get()). Task.id should be updated explicitly instead.
             db_records.append(
                 db.TaskDatabase(
-                    task_id=task.id,
+                    task=task,
                     database=label,
                     parameters=json.dumps(database, separators=(",", ":")),
                 )
             )
 
-        # All checks completed, save task to database
-        task.save()
-        [db_record.save() for db_record in db_records]  # pylint: disable=W0106
-
         # now we need to create results for the nodes to fill. Each node
-        # receives their instructions from a result, not from the task itself
+        # receives their instructions from a result, not from the task itself.
+        # The organizations are retrieved in a single query.
         log.debug(f"Assigning task to {len(organizations_json_list)} nodes.")
+        organizations = {
+            organization.id: organization
+            for organization in g.session.query(db.Organization)
+            .filter(db.Organization.id.in_(org_ids))
+            .all()
+        }
+        runs = []
         for org in organizations_json_list:
-            organization = db.Organization.get(org["id"])
-            log.debug(f"Assigning task to '{organization.name}'.")
             input_ = org.get("input")
             # FIXME: legacy input from the client, could be removed at some
             # point
             if isinstance(input_, dict):
                 input_ = json.dumps(input_).encode(STRING_ENCODING)
-            # Create run
-            run = db.Run(
-                task=task,
-                organization=organization,
-                input=input_,
-                status=TaskStatus.PENDING,
-                blob_storage_used=blob_storage_used,
+            runs.append(
+                db.Run(
+                    task=task,
+                    organization=organizations[org["id"]],
+                    input=input_,
+                    status=TaskStatus.PENDING,
+                    blob_storage_used=blob_storage_used,
+                )
             )
-            run.save()
 
-        # notify nodes a new task available (only to online nodes), nodes that
-        # are offline will receive this task on sign in.
-        socketio.emit(
+        # All checks completed, save the task, its database records and its runs
+        # to the database in a single transaction
+        g.session.add(task)
+        g.session.add_all(db_records)
+        g.session.add_all(runs)
+        g.session.commit()
+        # the committed objects are expired: load the runs, including their input
+        # that is sent to the nodes, and their nodes again in a single query each,
+        # rather than one query per run or node
+        g.session.query(db.Run).filter(db.Run.task_id == task.id).options(
+            undefer(db.Run.input), selectinload(db.Run.node)
+        ).all()
+        nodes = [run.node for run in runs if run.node]
+
+        # notify users and nodes that a new task is available (only to online
+        # nodes), nodes that are offline will receive this task on sign in. The
+        # organization ids tell nodes whether they have to act on the task.
+        # The runs are sent directly to the nodes that execute them. All events
+        # are stored in the event log in a single transaction.
+        collaboration_event = LoggedEvent(
             "new_task",
-            {"id": task.id, "parent_id": task.parent_id},
-            namespace="/tasks",
+            {
+                "id": task.id,
+                "parent_id": task.parent_id,
+                "organization_ids": [run.organization_id for run in runs],
+            },
             room=f"collaboration_{task.collaboration_id}",
         )
+        emit_logged_events(
+            socketio,
+            [collaboration_event] + Tasks._get_node_events(task, runs, nodes),
+            collaboration_id=task.collaboration_id,
+        )
 
         # add some logging
         log.info(f"New task for collaboration '{task.collaboration.name}'")
@@ -945,11 +1017,57 @@ class Tasks(TaskBase):
                         return False
         return has_limitations
 
+    @staticmethod
+    def _get_node_events(
+        task: db.Task, runs: list[db.Run], nodes: list[db.Node]
+    ) -> list[LoggedEvent]:
+        """
+        Create the events that send the new runs of a task to the nodes that
+        should execute them, so that they do not have to request them from the
+        server.
+
+        Parameters
+        ----------
+        task : db.Task
+            Task that was created
+        runs : list[db.Run]
+            Runs of the task
+        nodes : list[db.Node]
+            Nodes of the organizations that participate in the task
+
+        Returns
+        -------
+        list[LoggedEvent]
+            One `new_task` event for each node
+        """
+        runs_by_org = {run.organization_id: run for run in runs}
+        events = []
+        for node in nodes:
+            if node.organization_id not in runs_by_org:
+                continue
+            run = run_inc_schema.dump(runs_by_org[node.organization_id], many=False)
+            # large inputs are left out: the node retrieves them when it starts
+            # the run. The input is never stored in the event log.
+            if run.get("input") and len(run["input"]) > NEW_TASK_EVENT_MAX_INPUT_SIZE:
+                del run["input"]
+            run_without_input = {k: v for k, v in run.items() if k != "input"}
+            event = {"id": task.id, "parent_id": task.parent_id, "runs": [run]}
+            events.append(
+                LoggedEvent(
+                    "new_task",
+                    event,
+                    room=f"node_{node.id}",
+                    log_data={**event, "runs": [run_without_input]},
+                )
+            )
+        return events
+
     @staticmethod
     def _check_input(
         organizations_json_list: list[dict],
         collaboration: db.Collaboration,
         blob_storage_used: bool,
+        local_input_org_id: int | None = None,
     ) -> tuple[bool, str]:
         """
         Check if the input is valid for the collaboration. If the collaboration
@@ -964,6 +1082,10 @@ class Tasks(TaskBase):
             Collaboration object.
         blob_storage_used : bool
             Whether or not blob storage is used for storing data.
+        local_input_org_id : int | None
+            ID of the organization whose input may be a reference to input that
+            its node keeps locally. This is the organization of the node whose
+            algorithm creates the subtask.
 
         Returns
         -------
@@ -977,7 +1099,9 @@ class Tasks(TaskBase):
         if blob_storage_used:
             return Tasks.check_input_uuid(organizations_json_list)
         else:
-            return Tasks._check_input_encryption(organizations_json_list, collaboration)
+            return Tasks._check_input_encryption(
+                organizations_json_list, collaboration, local_input_org_id
+            )
 
     @staticmethod
     def check_input_uuid(organizations_json_list: list[dict]) -> tuple[bool, str]:
@@ -1016,7 +1140,9 @@ class Tasks(TaskBase):
 
     @staticmethod
     def _check_input_encryption(
-        organizations_json_list: list[dict], collaboration: db.Collaboration
+        organizations_json_list: list[dict],
+        collaboration: db.Collaboration,
+        local_input_org_id: int | None = None,
     ) -> tuple[bool, str]:
         """
         Check if the input encryption status matches the expected status for
@@ -1029,6 +1155,9 @@ class Tasks(TaskBase):
             List of organizations which contains the input per organization.
         collaboration : db.Collaboration
             Collaboration object.
+        local_input_org_id : int | None
+            ID of the organization whose input may be a reference to input that
+            its node keeps locally. Such references are not checked.
 
         Returns
         -------
@@ -1040,7 +1169,21 @@ class Tasks(TaskBase):
         dummy_cryptor = DummyCryptor()
         for org in organizations_json_list:
             input_ = org.get("input")
-            decrypted_input = dummy_cryptor.decrypt(input_)
+            if (
+                local_input_org_id is not None
+                and org.get("id") == local_input_org_id
+                and isinstance(input_, str)
+                and input_.startswith(LOCAL_SUBTASK_INPUT_PREFIX)
+            ):
+                continue
+            try:
+                decrypted_input = dummy_cryptor.decrypt(input_)
+            except ValueError:
+                return False, (
+                    "Your task's input cannot be parsed. Your input should be "
+                    "base64 encoded. Note that if you are using the user "
+                    "interface or Python client, this should be done for you."
+                )
             is_input_readable = False
             try:
                 decrypted_input.decode(STRING_ENCODING)
@@ -1170,6 +1313,14 @@ class Task(TaskBase):
             description: Include 'results' to include the task's results,
               'runs' to include details on algorithm runs. For including
               multiple, do either `include=x,y` or `include=x&include=y`.
+          - in: query
+            name: fields
+            schema:
+              type: string
+            description: >-
+              Fields to return, separated by a comma, e.g. `fields=id,status`.
+              Other fields are left out of the response. By default, all
+              fields are returned.
 
         responses:
           200:
@@ -1184,7 +1335,12 @@ class Task(TaskBase):
 
         tags: ["Task"]
         """
-        task = db.Task.get(id)
+        task = (
+            g.session.query(db.Task)
+            .filter(db.Task.id == id)
+            .options(*self._run_load_options())
+            .one_or_none()
+        )
         if not task:
             return {"msg": f"task id={id} is not found"}, HTTPStatus.NOT_FOUND
 
@@ -1208,7 +1364,7 @@ class Task(TaskBase):
                 "msg": "You lack the permission to view results for this " "task!"
             }, HTTPStatus.UNAUTHORIZED
 
-        return schema.dump(task, many=False), HTTPStatus.OK
+        return self.select_fields(schema).dump(task, many=False), HTTPStatus.OK
 
     @with_user
     def delete(self, id):
@@ -324,7 +324,7 @@ class Users(UserBase):
         try:
             page = Pagination.from_query(q, request, db.User)
         except (ValueError, AttributeError) as e:
-            return {"msg": str(e)}, HTTPStatus.INTERNAL_SERVER_ERROR
+            return {"msg": str(e)}, HTTPStatus.BAD_REQUEST
 
         # model serialization
         return self.response(page, user_schema)
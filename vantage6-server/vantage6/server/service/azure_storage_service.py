@@ -63,6 +63,7 @@ class AzureStorageService:
         self.container_client = self.blob_service_client.get_container_client(
             container_name
         )
+        event.listen(Run, "before_delete", self.load_blob_names_before_run_delete)
         event.listen(Run, "after_delete", self.delete_blob_after_run_delete)
 
     def get_blob(self, blob_name: str) -> bytes:
@@ -144,6 +145,18 @@ class AzureStorageService:
         )
         return blob_client.download_blob()
 
+    def load_blob_names_before_run_delete(self, mapper, connection, target):
+        """
+        SQLAlchemy event listener to load the names of the blobs of a Run
+        instance before it is deleted. The input and result of runs are only
+        loaded when accessed, which is no longer possible after the delete.
+        """
+        if target.blob_storage_used:
+            # accessing the attributes loads them
+            log.debug(
+                f"Deleting run {target.id} with blobs {target.result}, {target.input}"
+            )
+
     def delete_blob_after_run_delete(self, mapper, connection, target):
         """
         SQLAlchemy event listener to delete the associated blob when a Run
@@ -1,10 +1,11 @@
 import logging
 import jwt
 import datetime as dt
+from typing import NamedTuple
 
 from flask import request, session
 from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
-from flask_socketio import Namespace, emit, join_room, leave_room
+from flask_socketio import Namespace, SocketIO, emit, join_room, leave_room
 
 from vantage6.common import logger_name
 from vantage6.common.globals import AuthStatus
@@ -19,6 +20,111 @@ from vantage6.server.model.base import DatabaseSessionManager
 ALL_NODES_ROOM = "all_nodes"
 
 
+class LoggedEvent(NamedTuple):
+    """
+    Websocket event that is stored in the event log when it is emitted
+
+    Attributes
+    ----------
+    event: str
+        Name of the event
+    data: dict
+        Data of the event
+    room: str
+        Room to which the event is emitted
+    log_data: dict | None
+        Data that is stored in the event log instead of `data`, e.g. without
+        large fields that can be retrieved from the server when needed
+    """
+
+    event: str
+    data: dict
+    room: str
+    log_data: dict | None = None
+
+
+def emit_logged_event(
+    socketio: SocketIO,
+    event: str,
+    data: dict,
+    room: str,
+    collaboration_id: int,
+    namespace: str = "/tasks",
+    log_data: dict | None = None,
+) -> None:
+    """
+    Store an event in the event log and emit it, including its sequence number.
+
+    Nodes and users that were disconnected when the event was emitted can request
+    it later with the `replay_events` event.
+
+    Parameters
+    ----------
+    socketio: SocketIO
+        SocketIO server instance
+    event: str
+        Name of the event
+    data: dict
+        Data of the event
+    room: str
+        Room to which the event is emitted
+    collaboration_id: int
+        ID of the collaboration to which the event belongs
+    namespace: str
+        Namespace in which the event is emitted
+    log_data: dict | None
+        Data that is stored in the event log instead of `data`, e.g. without
+        large fields that can be retrieved from the server when needed
+    """
+    emit_logged_events(
+        socketio,
+        [LoggedEvent(event, data, room, log_data)],
+        collaboration_id,
+        namespace=namespace,
+    )
+
+
+def emit_logged_events(
+    socketio: SocketIO,
+    events: list[LoggedEvent],
+    collaboration_id: int,
+    namespace: str = "/tasks",
+) -> None:
+    """
+    Store several events of a collaboration in the event log in a single
+    transaction, and emit them including their sequence numbers.
+
+    Parameters
+    ----------
+    socketio: SocketIO
+        SocketIO server instance
+    events: list[LoggedEvent]
+        Events to store and emit
+    collaboration_id: int
+        ID of the collaboration to which the events belong
+    namespace: str
+        Namespace in which the events are emitted
+    """
+    entries = db.EventLog.add_many(
+        collaboration_id,
+        [
+            {
+                "room": event.room,
+                "event": event.event,
+                "data": event.data if event.log_data is None else event.log_data,
+            }
+            for event in events
+        ],
+    )
+    for event, entry in zip(events, entries):
+        socketio.emit(
+            event.event,
+            {**event.data, "sequence": entry.id},
+            namespace=namespace,
+            room=event.room,
+        )
+
+
 class DefaultSocketNamespace(Namespace):
     """
     This is the default SocketIO namespace. It is used for all the long-running
@@ -128,6 +234,7 @@ class DefaultSocketNamespace(Namespace):
         """
         # node join rooms for all nodes and rooms for their collaboration
         session.rooms.append(ALL_NODES_ROOM)
+        session.rooms.append(f"node_{node.id}")
         session.rooms.append(f"collaboration_{node.collaboration_id}")
         session.rooms.append(
             f"collaboration_{node.collaboration_id}_organization_"
@@ -272,7 +379,8 @@ class DefaultSocketNamespace(Namespace):
             self.log.info(f"{msg} has a new status={status}.")
 
         # emit task status change to other nodes/users in the collaboration
-        emit(
+        emit_logged_event(
+            self.socketio,
             "algorithm_status_change",
             {
                 "status": status,
@@ -285,10 +393,69 @@ class DefaultSocketNamespace(Namespace):
                 "parent_id": parent_id,
             },
             room=f"collaboration_{collaboration_id}",
+            collaboration_id=collaboration_id,
+            namespace=self.namespace,
+        )
+
+        # cleanup (e.g. database session)
+        self.__cleanup()
+
+    def on_replay_events(self, data: dict) -> dict | None:
+        """
+        A node or user that reconnects requests the events that it missed while
+        it was disconnected. The events are sent to the client in the order in
+        which they were emitted.
+
+        Parameters
+        ----------
+        data: dict
+            Dictionary with the sequence number of the last event that the client
+            received:
+
+            .. code:: python
+
+                {
+                    "since": 123
+                }
+
+        Returns
+        -------
+        dict | None
+            Acknowledgement with the sequence number of the last event that was
+            replayed, and whether all missed events could be replayed. If events
+            have been removed from the event log, the client should fully
+            synchronize instead.
+        """
+        if not self.__is_identified_client():
+            return None
+
+        try:
+            since = int(data.get("since", 0))
+        except (AttributeError, TypeError, ValueError):
+            self.log.warning(f"Invalid replay request from {session.name}: {data}")
+            return None
+
+        events = db.EventLog.get_since(since, session.rooms)
+        for event in events:
+            emit(event.event, {**event.payload, "replayed": True}, room=request.sid)
+
+        collaboration_ids = {
+            int(room.split("_")[1])
+            for room in session.rooms
+            if room.startswith("collaboration_")
+        }
+        complete = not any(
+            db.EventLog.is_truncated(collaboration_id, since)
+            for collaboration_id in collaboration_ids
+        )
+        self.log.info(
+            f"Replayed {len(events)} events since sequence {since} to {session.name}"
         )
+        last_sequence = events[-1].id if events else since
 
         # cleanup (e.g. database session)
         self.__cleanup()
+        return {"complete": complete, "last_sequence": last_sequence}
 
     def on_node_info_update(self, node_config: dict) -> None:
         """
@@ -415,7 +582,10 @@ class DefaultSocketNamespace(Namespace):
 
     def on_algorithm_log(self, data: dict) -> None:
         """
-        Handle log messages from algorithm containers and log them in the server logs.
+        Handle log messages from algorithm containers and store them with the run.
+
+        Nodes send the log lines of an algorithm in batches. Each batch is appended
+        to the log of the run in a single database write.
 
         Parameters
         ----------
@@ -431,6 +601,8 @@ class DefaultSocketNamespace(Namespace):
                     "task_id": 1,
                     "log": "Log message"
                 }
+
+            where "log" may contain multiple lines.
         """
         if not self._is_node():
             return
@@ -441,7 +613,10 @@ class DefaultSocketNamespace(Namespace):
         log_message = data.get("log")
 
         run = db.Run.get(run_id)
-        self._append_log(log_message, run)
+        if not run or not log_message:
+            self.__cleanup()
+            return
+        run.append_log(log_message)
         run.save()
 
         emit(
@@ -452,14 +627,6 @@ class DefaultSocketNamespace(Namespace):
 
         self.__cleanup()
 
-    def _append_log(self, log_message, run):
-        if run.log:
-            if not run.log.endswith("\n"):
-                run.log += "\n"
-            run.log += log_message
-        else:
-            run.log = log_message
-
     def on_node_metrics_update(self, data: dict) -> None:
         """
         Handle metrics sent by nodes and update Prometheus metrics.
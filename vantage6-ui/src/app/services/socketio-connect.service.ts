@@ -15,6 +15,9 @@ export class SocketioConnectService {
   taskCreated$: BehaviorSubject<NewTaskMsg | null> = new BehaviorSubject<NewTaskMsg | null>(null);
   algoLogUpdate$: BehaviorSubject<AlgorithmLogMsg | null> = new BehaviorSubject<AlgorithmLogMsg | null>(null);
   socket: Socket | null = null;
+  // sequence number of the last event received from the server, used to request
+  // the events that were missed while disconnected
+  lastEventSequence = 0;
 
   constructor(private tokenStorageService: TokenStorageService) {}
 
@@ -40,6 +43,21 @@ export class SocketioConnectService {
   }
 
   subscribe() {
+    // keep track of the sequence number of the events received
+    // eslint-disable-next-line @typescript-eslint/no-explicit-any
+    this.socket?.onAny((_event: string, data?: any) => {
+      if (typeof data?.sequence === 'number' && data.sequence > this.lastEventSequence) {
+        this.lastEventSequence = data.sequence;
+      }
+    });
+
+    // on reconnect, request the events that were missed while disconnected
+    this.socket?.on('connect', () => {
+      if (this.lastEventSequence > 0) {
+        this.socket?.emit('replay_events', { since: this.lastEventSequence });
+      }
+    });
+
     // subscribe to various socket events
 
     // update observable (generate status messages downstream) when node comes